@@ -1,8 +1,18 @@
 # batch_yahoo_scraper.py
 
+import argparse
 import asyncio
+import time
+from datetime import datetime, timedelta
+from functools import partial
 import pandas as pd
-import subprocess
+
+from scraper.yahoo import run_batch
+from scraper.cache import PageCache
+from scraper.scheduler import JobState, prioritize
+from scraper.store import DataIndex
+from simcore.validation import validate_folder
+from playwright_yahoo_scraper import fetch_full_history, OUTPUT_FOLDER
 
 CSV_FILE = "tracked_symbols.csv"
 
@@ -10,17 +20,48 @@ def read_symbols():
     df = pd.read_csv(CSV_FILE)
     return df["symbol"].dropna().unique().tolist()
 
-async def run_scraper_for(symbol):
-    print(f"\n🔄 Fetching data for {symbol}")
-    process = await asyncio.create_subprocess_exec(
-        "python", "yahoo_html_scraper_logged_in.py", symbol
-    )
-    await process.communicate()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape full Yahoo history for all tracked symbols")
+    parser.add_argument('--concurrency', type=int, default=4, help='Pages (symbols) in flight at once')
+    parser.add_argument('--timeout', type=float, default=120, help='Seconds allowed per symbol attempt')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per symbol after a failure')
+    parser.add_argument('--no-cache', action='store_true', help='Always fetch pages, ignoring cache/pages')
+    parser.add_argument('--full-page', action='store_true', help='Load images, fonts, styles and trackers too')
+    parser.add_argument('--rate', type=float, default=0.5, help='Page loads per second across all workers (0 = unlimited)')
+    parser.add_argument('--burst', type=int, default=2, help='Page loads allowed back to back')
+    parser.add_argument('--fresh', action='store_true', help='Ignore the saved progress of an interrupted batch')
+    return parser.parse_args()
 
-async def main():
+async def main(concurrency=4, timeout=120, retries=3, use_cache=True, block_resources=True,
+               rate=0.5, burst=2, resume=True):
     symbols = read_symbols()
-    for symbol in symbols:
-        await run_scraper_for(symbol)
+    cache = PageCache(enabled=use_cache)
+    index = DataIndex(OUTPUT_FOLDER)
+    last_dates = {s: index.last_date(s) for s in symbols}
+    yesterday = datetime.today().date() - timedelta(days=1)
+    priority = prioritize(symbols, last_dates, stale_before=yesterday)
+    print(f"🔄 Fetching data for {len(symbols)} symbols ({concurrency} concurrent, {rate or 'unlimited'} req/s)")
+    started = time.perf_counter()
+    results = await run_batch(symbols, partial(fetch_full_history, cache=cache),
+                              concurrency=concurrency, timeout=timeout, retries=retries,
+                              block_resources=block_resources, rate=rate, burst=burst,
+                              priority=priority, state=JobState("batch_full", resume=resume))
+    failed = [s for s, r in results.items() if r is None]
+    print(f"[batch] Done in {time.perf_counter() - started:.1f}s: "
+          f"{len(symbols) - len(failed)} saved, {len(failed)} failed")
+    if failed:
+        print(f"[batch] Failed: {', '.join(failed)}")
+    saved = [s for s in symbols if results.get(s) is not None]
+    coverage = validate_folder(OUTPUT_FOLDER, saved)
+    for symbol in saved:
+        entry = coverage.get(symbol, {})
+        if entry.get("status") in ("bad", "warn"):
+            print(f"[validate] {symbol}: {entry['status']} - {'; '.join(entry.get('issues', []))}")
+    if cache.enabled:
+        print(f"[cache] {cache.stats()}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(main(concurrency=args.concurrency, timeout=args.timeout, retries=args.retries,
+                     use_cache=not args.no_cache, block_resources=not args.full_page,
+                     rate=args.rate, burst=args.burst, resume=not args.fresh))
@@ -12,6 +12,7 @@ TRANSACTION_FILE = INPUT_FOLDER / 'transactions.csv'
 INVESTMENT_PLAN_FILE = INPUT_FOLDER / 'investment_plan.csv'
 DIVIDEND_TARGET_FILE = INPUT_FOLDER / 'dividend_reinvestment_targets.csv'
 SYMBOL_METADATA_FILE = INPUT_FOLDER / 'symbol_metadata.csv'
+CORPORATE_ACTIONS_FILE = INPUT_FOLDER / 'corporate_actions.csv'  # symbol,date,type,ratio (type 'split')
 
 START_DATE = '2020-07-20'
 END_DATE   = '2025-08-14'
@@ -22,6 +23,20 @@ ENABLE_MONTHLY_REINVESTMENT = True
 BROKER_FEE = Decimal("5.00")  # fallback default
 DIVIDEND_REINVESTMENT_MODE = 'custom'
 
+# Dividend ledger persistence: 'rewrite' writes dividends_events.csv once at the end,
+# 'append' streams events in batches and only appends days not persisted by a previous run
+DIVIDEND_LEDGER_PERSISTENCE = 'rewrite'
+DIVIDEND_LEDGER_BATCH_SIZE = 256
+
+# Price series checks (simcore/validation.py, index in data/_coverage.json): 'off' skips them,
+# 'warn' logs flagged series, 'skip' also leaves series marked 'bad' out of the simulation
+PRICE_VALIDATION = 'warn'
+
+# Splits come from CORPORATE_ACTIONS_FILE and, when enabled, from n:1 / 1:n jumps left
+# unadjusted in the stored Close series (simcore/corporate_actions.py). Off by default:
+# a real one-day -50% / +100% move looks the same and would rescale history and trades.
+DERIVE_SPLITS = False
+
 TAX_RATES = {
     'Germany': Decimal("0.374"),
     'Portugal': Decimal("0.39"),
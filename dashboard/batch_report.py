@@ -0,0 +1,106 @@
+# dashboard/batch_report.py
+# Headless PDF reports for many simulation runs, without a Panel server:
+#
+#   python -m dashboard.batch_report output/ runs/ --out reports/ --workers 4
+#
+# Each argument is a run's output folder (daily_portfolio.csv, monthly_dividends.csv, ...)
+# or a folder of such folders. Runs are loaded and reported in a process pool, one run per
+# task, with the same chart factories as the dashboard (layout.chart_specs). Rasterized
+# charts go through the content-hash PNG cache of export_pdf (cache/charts/), so a chart
+# that is identical across runs, or unchanged since the last batch, is rendered once.
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from dashboard.cache import load_snapshot
+from dashboard.config import KPI_GROUPS, RASTER_CACHE_DIR
+from dashboard.export_pdf import render_report
+from dashboard.layout import chart_specs
+from dashboard.state import DashboardState
+
+MARKER_FILE = "daily_portfolio.csv"     # a folder holding this is a run's output folder
+
+
+def find_runs(paths):
+    """Output folders among `paths` and their direct subfolders, in order, without duplicates."""
+    runs = []
+    for path in map(Path, paths):
+        candidates = [path] if (path / MARKER_FILE).exists() else sorted(p for p in path.glob("*") if p.is_dir())
+        for folder in candidates:
+            if (folder / MARKER_FILE).exists() and folder.resolve() not in {r.resolve() for r in runs}:
+                runs.append(folder)
+    return runs
+
+
+def report_names(runs):
+    """One PDF file name per run: the folder name, prefixed by its parent where names repeat."""
+    names = [run.resolve().name for run in runs]
+    return [f"{run.resolve().parent.name}_{name}.pdf" if names.count(name) > 1 else f"{name}.pdf"
+            for run, name in zip(runs, names)]
+
+
+def _all_symbols(state):
+    mdbs = getattr(state, "monthly_div_by_symbol", None)
+    if mdbs is not None and not mdbs.empty:
+        return [str(s).upper() for s in mdbs.columns]
+    return list(state.param["symbols"].objects)
+
+
+def report_state(output):
+    """DashboardState of one run as the dashboard opens it: full period, every symbol selected."""
+    state = DashboardState.from_snapshot(load_snapshot(output))
+    state.selected_symbols = _all_symbols(state)
+    return state
+
+
+def render_run(output, target, mode="daily", palette="Viridis", cache_dir=RASTER_CACHE_DIR):
+    """
+    Write the PDF report of one run to `target`; returns the seconds it took.
+    A chart that fails to build or render fails the run (no PDF is written).
+    """
+    started = time.perf_counter()
+    state = report_state(output)
+    buffer = render_report(chart_specs(state, mode=mode, palette=palette), KPI_GROUPS, state.kpis,
+                           state.date_range, state.symbols, strict=True, workers=1, cache_dir=cache_dir)
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(buffer.getvalue())
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render dashboard PDF reports for simulation output folders.")
+    parser.add_argument("paths", nargs="+", help="run output folders, or folders containing them")
+    parser.add_argument("--out", default="reports", help="folder for the PDFs (default: reports)")
+    parser.add_argument("--workers", type=int, default=None, help="report processes (default: one per CPU)")
+    parser.add_argument("--mode", choices=["daily", "monthly"], default="daily", help="overview chart resolution")
+    parser.add_argument("--palette", default="Viridis", help="heatmap palette")
+    args = parser.parse_args(argv)
+
+    runs = find_runs(args.paths)
+    if not runs:
+        print("[batch] No output folders found")
+        return 1
+    out = Path(args.out)
+    print(f"[batch] {len(runs)} report(s) -> {out}/")
+
+    started, failed = time.perf_counter(), 0
+    # one run per process: loading and figure building are Python-bound, the rasters are shared on disk
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(render_run, run, out / name, args.mode, args.palette): (run, name)
+                   for run, name in zip(runs, report_names(runs))}
+        for future in as_completed(futures):
+            run, name = futures[future]
+            try:
+                print(f"[batch] {run} -> {name} ({future.result():.1f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"[batch] {run} failed: {e}")
+    print(f"[batch] Done in {time.perf_counter() - started:.1f}s ({len(runs) - failed} ok, {failed} failed)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,278 @@
+# dashboard/cache.py
+# Process-wide snapshot of the simulation outputs, shared by every dashboard session.
+# The snapshot is keyed on the (mtime, size) of the files it was built from and is
+# rebuilt on the first session after the simulation rewrites any of them. The monthly
+# and calendar tables come ready-made from the simulation's dashboard bundle when it is
+# current, and are derived from the CSVs otherwise.
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard import io_data, data_access
+from dashboard.io_data import load_data, load_kpis
+from dashboard.data_access import load_monthly_dividends_tables
+from simcore.dashboard_bundle import BUNDLE_FILE, load_bundle, value_calendar
+
+MONTHLY_TABLES = ["monthly_total_tidy", "monthly_by_symbol_wide", "monthly_by_symbol_tidy",
+                  "calendar_wide", "calendar_tidy"]
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """
+    Parsed outputs as loaded once for all sessions. Treat the frames as
+    read-only: sessions assign filtered copies to their own state instead of
+    modifying these in place.
+    """
+    stamp: tuple
+    loaded_at: float
+    daily_df: pd.DataFrame
+    monthly_df: pd.DataFrame
+    dividends_df: pd.DataFrame
+    metadata_df: pd.DataFrame
+    kpis: dict
+    monthly_total_tidy: pd.DataFrame          # [month, value]
+    monthly_by_symbol_wide: pd.DataFrame      # index=month, columns=symbols
+    monthly_by_symbol_tidy: pd.DataFrame      # [month, symbol, value]
+    calendar_wide: pd.DataFrame               # index=year, columns=1..12
+    calendar_tidy: pd.DataFrame               # [year, month, value, month_name]
+    value_calendar: pd.DataFrame              # month-end total value, index=year, columns=1..12
+
+
+_lock = threading.Lock()
+_snapshot = None
+_stats = {"hits": 0, "loads": 0}
+
+
+def _outputs(output=None):
+    """(io_data folder, data_access folder): the dashboard's defaults, or one given run folder for both."""
+    if output is None:
+        return io_data.OUTPUT, data_access.OUTPUT
+    return Path(output), Path(output)
+
+
+def source_files(output=None):
+    """Every file a snapshot is built from (a missing file is part of the key too)."""
+    out, monthly_out = _outputs(output)
+    return [
+        out / "daily_portfolio.csv",
+        out / "monthly_stats.csv",
+        out / "dividends_events.csv",
+        out / "output_kpis.txt",
+        out / BUNDLE_FILE,
+        monthly_out / "monthly_dividends.csv",
+        Path("input") / "symbol_metadata.csv",
+        out / "symbol_metadata.csv",
+        Path("symbol_metadata.csv"),
+    ]
+
+
+def _stamp(output=None):
+    stamp = []
+    for path in source_files(output):
+        try:
+            st = path.stat()
+            stamp.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((str(path), None, None))
+    return tuple(stamp)
+
+
+# -------- normalisation (once per snapshot, not per session) --------
+def _ensure_datetime_index(df: pd.DataFrame, date_col: str = "date") -> pd.DataFrame:
+    """
+    Ensure df has a DatetimeIndex. If date_col exists, set it as index.
+    """
+    if df is None or df.empty:
+        return df
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        if date_col in df.columns:
+            df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+            df = df.set_index(date_col).sort_index()
+        else:
+            # last resort: try to coerce current index
+            try:
+                df.index = pd.to_datetime(df.index, errors="coerce")
+                df = df.sort_index()
+            except Exception:
+                pass
+    # hard assert so we fail fast if something is off
+    assert isinstance(df.index, pd.DatetimeIndex), "Index is not datetime!"
+    return df
+
+
+def _month_name_map():
+    return {
+        1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr",
+        5: "May", 6: "Jun", 7: "Jul", 8: "Aug",
+        9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"
+    }
+
+
+def _prepare_monthly_structures(output=None):
+    """
+    Use dashboard.data_access.load_monthly_dividends_tables() as the single source of truth.
+    Returns:
+      - monthly_total_tidy: columns [month (timestamp), value]
+      - monthly_by_symbol_wide: index month (timestamp), columns = symbols, values = dividend_net
+      - monthly_by_symbol_tidy: columns [month (timestamp), symbol, value]
+      - calendar_wide: index=year, columns=1..12 (months), values = dividend totals (float)
+      - calendar_tidy: columns [year, month, value, month_name]
+    """
+    monthly_total, monthly_by_symbol, calendar_df = load_monthly_dividends_tables(output=output)
+
+    # ------- monthly_total (tidy: month, value) -------
+    # Expect columns ["year","month","dividend_net"]
+    if not monthly_total.empty:
+        mt = monthly_total.copy()
+        mt["month_ts"] = pd.to_datetime(
+            mt["year"].astype(int).astype(str) + "-" + mt["month"].astype(int).astype(str) + "-01",
+            errors="coerce"
+        )
+        monthly_total_tidy = mt[["month_ts", "dividend_net"]].rename(
+            columns={"month_ts": "month", "dividend_net": "value"}
+        ).sort_values("month")
+    else:
+        monthly_total_tidy = pd.DataFrame(columns=["month", "value"])
+
+    # ------- monthly_by_symbol (wide + tidy) -------
+    # Expect columns ["year","month","symbol","dividend_net"] (may be empty if no symbol info)
+    if isinstance(monthly_by_symbol, pd.DataFrame) and not monthly_by_symbol.empty:
+        mbs = monthly_by_symbol.copy()
+        mbs["month_ts"] = pd.to_datetime(
+            mbs["year"].astype(int).astype(str) + "-" + mbs["month"].astype(int).astype(str) + "-01",
+            errors="coerce"
+        )
+        monthly_by_symbol_tidy = mbs[["month_ts", "symbol", "dividend_net"]].rename(
+            columns={"month_ts": "month", "dividend_net": "value"}
+        ).dropna(subset=["month"]).sort_values(["month", "symbol"])
+
+        monthly_by_symbol_wide = monthly_by_symbol_tidy.pivot_table(
+            index="month", columns="symbol", values="value", aggfunc="sum", fill_value=0.0
+        ).sort_index()
+    else:
+        monthly_by_symbol_tidy = pd.DataFrame(columns=["month", "symbol", "value"])
+        monthly_by_symbol_wide = pd.DataFrame()
+
+    # ------- calendar (wide + tidy) -------
+    # load_monthly_dividends_tables() returns calendar_df with Year×Month already laid out
+    if isinstance(calendar_df, pd.DataFrame) and not calendar_df.empty:
+        # calendar_df is returned as tidy with columns: ["year", 1..12] OR already wide.
+        # We normalize to: index=year, columns=1..12
+        if "year" in calendar_df.columns:
+            cal_wide = calendar_df.set_index("year")
+        else:
+            cal_wide = calendar_df.copy()
+
+        # Ensure months 1..12 exist
+        for m in range(1, 13):
+            if m not in cal_wide.columns:
+                cal_wide[m] = 0.0
+        cal_wide = cal_wide.reindex(columns=sorted(cal_wide.columns)).sort_index()
+
+        # Tidy version for some heatmap factories
+        cal_tidy = cal_wide.copy()
+        cal_tidy = cal_tidy.reset_index().melt(id_vars="year", var_name="month", value_name="value")
+        cal_tidy["month_name"] = cal_tidy["month"].map(_month_name_map())
+    else:
+        cal_wide = pd.DataFrame()
+        cal_tidy = pd.DataFrame(columns=["year", "month", "value", "month_name"])
+
+    return monthly_total_tidy, monthly_by_symbol_wide, monthly_by_symbol_tidy, cal_wide, cal_tidy
+
+
+def _bundle_tables(output=None):
+    """
+    The simulation's pre-aggregated tables (simcore/dashboard_bundle.py) when the
+    bundle is at least as new as the CSVs it summarizes, else None.
+    """
+    out, monthly_out = _outputs(output)
+    path = out / BUNDLE_FILE
+    sources = [out / "daily_portfolio.csv", monthly_out / "monthly_dividends.csv"]
+    try:
+        if path.stat().st_mtime_ns < max(p.stat().st_mtime_ns for p in sources if p.exists()):
+            logging.info("[cache] Dashboard bundle is older than the outputs; deriving tables instead")
+            return None
+    except (OSError, ValueError):
+        return None
+    tables = load_bundle(path)
+    if tables is None or not set(MONTHLY_TABLES + ["value_calendar"]) <= set(tables):
+        logging.warning(f"[cache] Unusable dashboard bundle {path}; deriving tables instead")
+        return None
+    return tables
+
+
+def _load(stamp, output=None) -> DataSnapshot:
+    daily_df, monthly_df, dividends_df, metadata_df = load_data(output)
+    kpis = load_kpis(output)
+
+    # Enforce datetime index on the main timeseries you chart from
+    if isinstance(daily_df, pd.DataFrame) and not daily_df.empty:
+        daily_df = _ensure_datetime_index(daily_df, "date")
+    if isinstance(monthly_df, pd.DataFrame) and not monthly_df.empty:
+        # Monthly df may or may not be indexed by date; keep as is if not needed for charts
+        try:
+            monthly_df = _ensure_datetime_index(monthly_df, "date")
+        except Exception:
+            pass
+    if isinstance(dividends_df, pd.DataFrame) and not dividends_df.empty:
+        try:
+            dividends_df = _ensure_datetime_index(dividends_df, "date")
+        except Exception:
+            pass
+
+    tables = _bundle_tables(output)
+    if tables is None:
+        tables = dict(zip(MONTHLY_TABLES, _prepare_monthly_structures(output)))
+        has_value = isinstance(daily_df, pd.DataFrame) and "total_value" in daily_df.columns
+        tables["value_calendar"] = value_calendar(daily_df["total_value"] if has_value
+                                                  else pd.Series(dtype=float, index=pd.DatetimeIndex([])))
+
+    return DataSnapshot(stamp, time.time(), daily_df, monthly_df, dividends_df, metadata_df, kpis,
+                        **{name: tables[name] for name in MONTHLY_TABLES + ["value_calendar"]})
+
+
+def get_snapshot() -> DataSnapshot:
+    """
+    The current snapshot: reused while no source file changed, reloaded otherwise.
+    A load during which the files changed again (simulation still writing) is
+    served but not kept, so the next session retries.
+    """
+    global _snapshot
+    stamp = _stamp()
+    with _lock:
+        if _snapshot is not None and _snapshot.stamp == stamp:
+            _stats["hits"] += 1
+            logging.info(f"[cache] Dashboard data cache hit ({_stats['hits']} hits, {_stats['loads']} loads)")
+            return _snapshot
+
+        started = time.perf_counter()
+        snapshot = _load(stamp)
+        _stats["loads"] += 1
+        reason = "initial load" if _snapshot is None else "outputs changed"
+        if _stamp() == stamp:
+            _snapshot = snapshot
+        else:
+            logging.warning("[cache] Outputs changed while loading; snapshot not kept")
+        logging.info(f"[cache] Dashboard data loaded in {time.perf_counter() - started:.2f}s ({reason})")
+        return snapshot
+
+
+def load_snapshot(output) -> DataSnapshot:
+    """
+    A snapshot of another run's output folder (same files as output/), loaded
+    directly and not kept: for headless jobs that go through many portfolios once.
+    """
+    return _load(_stamp(output), output)
+
+
+def clear():
+    global _snapshot
+    with _lock:
+        _snapshot = None
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 import colorcet as cc
 
@@ -6,6 +7,24 @@ DATA_DIR  = Path("output")
 INPUT_DIR = Path("input")
 KPI_FILE  = DATA_DIR / "output_kpis.txt"
 
+# Long line traces are thinned to about this many points (dashboard/plots/downsample.py):
+# ~2 per pixel of a full-width chart, and of the 1000px-wide (scale 2) PDF images.
+DOWNSAMPLE_POINTS     = 2000
+PDF_DOWNSAMPLE_POINTS = 2000
+DOWNSAMPLE_METHOD     = "auto"   # "lttb", "minmax" or "auto" (LTTB for a few traces, min/max for many)
+
+# Browser payload of line charts (dashboard/plots/ranges.py). Views with more points than
+# WEBGL_POINTS are drawn with WebGL; kept high enough that only the many-symbol charts use
+# it, as browsers allow a limited number of WebGL contexts per page.
+WEBGL_POINTS   = 10000
+COMPACT_SERIES = True     # x as epoch ms, y as float32: binary buffers instead of JSON date strings
+
+# PDF export: concurrent chart rendering and PNG cache keyed on figure content (dashboard/export_pdf.py)
+RASTER_WORKERS         = min(4, os.cpu_count() or 1)
+RASTER_CACHE_SIZE      = 64                        # PNGs kept in memory
+RASTER_CACHE_DIR       = Path("cache") / "charts"  # shared between processes; None disables
+RASTER_CACHE_MAX_FILES = 500
+
 # Palette registry (robust across colorcet versions)
 try:
     PALETTE_REGISTRY = dict(getattr(cc, "palette", {}))
@@ -52,7 +71,9 @@ KPI_GROUPS = {
         "[PY] YTD gain/loss absolute",
         "[PQ] Last quarter gain/loss absolute",
         "[PM] Last month gain/loss absolute",
-        "[PD] Max Drawdown"
+        "[PD] Max Drawdown",
+        "[PL] Longest drawdown",
+        "[PU] Time underwater"
     ]
 }
 
@@ -90,5 +111,7 @@ KPI_EXPLANATIONS = {
     "[PY] YTD gain/loss absolute": "Year-to-date absolute P/L (net of external contributions).",
     "[PQ] Last quarter gain/loss absolute": "Absolute P/L over the last 3 full months (net of external contributions).",
     "[PM] Last month gain/loss absolute": "Absolute P/L over the last full month (net of external contributions).",
-    "[PD] Max Drawdown": "Largest peak-to-trough drop over the period."
+    "[PD] Max Drawdown": "Largest peak-to-trough drop over the period.",
+    "[PL] Longest drawdown": "Longest peak-to-recovery episode in calendar days (ongoing episodes count to the last date).",
+    "[PU] Time underwater": "Share of trading days on which the portfolio was below its running peak."
 }
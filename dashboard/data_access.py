@@ -14,10 +14,14 @@ def _read_csv_if_exists(path: Path, parse_dates=None):
         logging.warning(f"Failed reading {path}: {e}")
     return None
 
-def load_monthly_dividends_tables():
+def load_monthly_dividends_tables(monthly_wide: pd.DataFrame = None, output: Path = None):
     """
     Single source of truth for monthly dividend data used by heatmaps.
 
+    monthly_wide: optional in-memory month × symbol matrix (e.g.
+    simcore.aggregators.MonthlyDividends.to_frame()); when given, no file is read.
+    output: folder of another simulation run (default: output/).
+
     Returns a tuple:
       (monthly_total, monthly_by_symbol, calendar_df)
 
@@ -28,8 +32,13 @@ def load_monthly_dividends_tables():
     Falls back to dividends_events.csv, then to daily_portfolio.csv if necessary.
     """
 
-    # 0) Preferred: single-file monthly wide
-    monthly_wide = _read_csv_if_exists(OUTPUT / "monthly_dividends.csv")
+    output = OUTPUT if output is None else Path(output)
+
+    # 0) Preferred: in-memory matrix, else single-file monthly wide
+    if monthly_wide is not None and "month" not in monthly_wide.columns and monthly_wide.index.name == "month":
+        monthly_wide = monthly_wide.reset_index()
+    if monthly_wide is None:
+        monthly_wide = _read_csv_if_exists(output / "monthly_dividends.csv")
     if isinstance(monthly_wide, pd.DataFrame) and not monthly_wide.empty and "month" in monthly_wide.columns:
         # monthly_wide columns: month,total,<SYMBOLS...>, month = "YYYY-MM"
         mw = monthly_wide.copy()
@@ -61,7 +70,7 @@ def load_monthly_dividends_tables():
         return monthly_total, monthly_by_symbol, calendar_df
 
     # 1) Fallback: atomic events
-    events = _read_csv_if_exists(OUTPUT / "dividends_events.csv", parse_dates=["date"])
+    events = _read_csv_if_exists(output / "dividends_events.csv", parse_dates=["date"])
     if isinstance(events, pd.DataFrame) and not events.empty and "date" in events.columns:
         e = events.copy()
         e["date"] = pd.to_datetime(e["date"], errors="coerce")
@@ -89,7 +98,7 @@ def load_monthly_dividends_tables():
         return monthly_total, monthly_by_symbol, calendar_df
 
     # 2) Last resort: daily_portfolio
-    daily = _read_csv_if_exists(OUTPUT / "daily_portfolio.csv", parse_dates=["date"])
+    daily = _read_csv_if_exists(output / "daily_portfolio.csv", parse_dates=["date"])
     if isinstance(daily, pd.DataFrame) and not daily.empty:
         d = daily.copy()
         d["date"] = pd.to_datetime(d["date"], errors="coerce")
@@ -1,64 +1,273 @@
+# dashboard/export_pdf.py
+# PDF report: chart figures are rasterized concurrently in a worker pool, PNGs are cached
+# by figure content (memory + cache/charts/, shared by processes), and the Panel controls at the bottom build
+# the report off the UI thread with a progress bar before offering the download.
+
+import asyncio
+import hashlib
 import io
-import tempfile
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Image, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly.io as pio
+from dashboard.config import PDF_DOWNSAMPLE_POINTS, RASTER_CACHE_DIR, RASTER_CACHE_SIZE, RASTER_CACHE_MAX_FILES, RASTER_WORKERS
+from dashboard.plots.ranges import slice_figure
+
+IMAGE_SIZE = dict(width=1000, height=600, scale=2)
+RENDER_WAIT = 60.0     # seconds to wait for another process rendering the same figure
+
+_png_cache = OrderedDict()     # content hash -> PNG bytes (most recently used last)
+_png_lock = threading.Lock()
+
+
+def figure_hash(fig, width, height, scale) -> str:
+    """Content hash of a figure (object or dict) at an output size: equal figures render equal PNGs."""
+    payload = pio.to_json(fig, validate=False, remove_uids=True)
+    return hashlib.sha1(f"{width}x{height}@{scale}:{payload}".encode("utf-8")).hexdigest()
+
+
+def _cached_png(key, cache_dir):
+    with _png_lock:
+        if key in _png_cache:
+            _png_cache.move_to_end(key)
+            return _png_cache[key]
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"{key}.png"
+        try:
+            png = path.read_bytes()
+        except OSError:
+            return None
+        _remember(key, png)
+        return png
+    return None
+
+
+def _remember(key, png):
+    with _png_lock:
+        _png_cache[key] = png
+        _png_cache.move_to_end(key)
+        while len(_png_cache) > RASTER_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+
+
+def _store(key, png, cache_dir):
+    _remember(key, png)
+    if cache_dir is None:
+        return
+    folder = Path(cache_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp = folder / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_bytes(png)
+    os.replace(tmp, folder / f"{key}.png")
 
-def generate_dashboard_pdf(state, chart_specs, kpi_groups, kpi_data):
+
+def _render_once(key, render, cache_dir):
     """
-    chart_specs: list of tuples (name, fig_factory)
-                 where fig_factory is a callable returning a plotly.graph_objects.Figure
+    render() the PNG for `key`, unless another process sharing cache_dir is
+    rendering the same figure right now: then its result is awaited instead.
+    A claim file marks the render in progress; claims older than RENDER_WAIT
+    (a crashed process) are taken over.
     """
-    with tempfile.TemporaryDirectory() as tmpdir:
-        images = []
-        for name, fig_fn in chart_specs:
+    if cache_dir is None:
+        return render()
+    folder = Path(cache_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    claim = folder / f"{key}.rendering"
+    while True:
+        try:
+            os.close(os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            png = _cached_png(key, cache_dir)
+            if png is not None:
+                return png
+            try:
+                if time.time() - claim.stat().st_mtime > RENDER_WAIT:
+                    claim.unlink(missing_ok=True)
+            except OSError:
+                pass    # released meanwhile
+            time.sleep(0.1)
+    try:
+        # stored while this process was waiting to claim it
+        png = _cached_png(key, cache_dir)
+        return png if png is not None else render()
+    finally:
+        claim.unlink(missing_ok=True)
+
+
+def prune_cache(cache_dir=RASTER_CACHE_DIR, max_files=RASTER_CACHE_MAX_FILES):
+    """Drop the least recently written PNGs beyond max_files."""
+    folder = Path(cache_dir)
+    if not folder.exists():
+        return
+    def _mtime(path):
+        try:
+            return path.stat().st_mtime
+        except OSError:     # pruned meanwhile by another process sharing the folder
+            return 0.0
+
+    files = sorted(folder.glob("*.png"), key=_mtime, reverse=True)
+    for path in files[max_files:]:
+        path.unlink(missing_ok=True)
+
+
+def rasterize(figures, width=1000, height=600, scale=2, workers=RASTER_WORKERS,
+              cache_dir=RASTER_CACHE_DIR, progress=None, names=None):
+    """
+    PNG bytes for each figure (None where rendering failed), in order. Figures
+    already rendered at this size come from the cache; identical figures in one
+    call (or being rendered by another process using cache_dir) are rendered once;
+    the rest are rendered concurrently. `progress(done, total)`
+    is called from the worker threads as figures complete. `names` label failures.
+    """
+    keys = [figure_hash(fig, width, height, scale) if fig is not None else None for fig in figures]
+    labels = {}
+    for key, name in zip(keys, names or keys):
+        labels.setdefault(key, name)
+    pngs = {k: _cached_png(k, cache_dir) for k in set(keys) if k is not None}
+    todo = {k: fig for k, fig in zip(keys, figures) if k is not None and pngs[k] is None}
+    total, done = len(figures), len(figures) - sum(1 for k in keys if k in todo)
+    if progress:
+        progress(done, total)
+
+    def _render(key):
+        def _draw():
+            png = pio.to_image(todo[key], format="png", width=width, height=height, scale=scale)
+            _store(key, png, cache_dir)
+            return png
+        return _render_once(key, _draw, cache_dir)
+
+    # kaleido renders out of process, so threads overlap the renders without fighting over the GIL
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo) or 1))) as pool:
+        futures = {pool.submit(_render, key): key for key in todo}
+        for future in as_completed(futures):
+            key = futures[future]
             try:
-                fig = fig_fn()
-                image_path = f"{tmpdir}/{name.replace(' ', '_')}.png"
-                fig.write_image(image_path, width=1000, height=600, scale=2)
-                images.append((name, image_path))
+                pngs[key] = future.result()
             except Exception as e:
-                print(f"[PDF Export] Failed to render {name}: {e}")
+                print(f"[PDF Export] Failed to render {labels[key]}: {e}")
+            done += sum(1 for k in keys if k == key)
+            if progress:
+                progress(done, total)
+    if todo and cache_dir is not None:
+        prune_cache(cache_dir)
+    return [pngs.get(k) if k is not None else None for k in keys]
+
+
+def build_pdf(images, kpi_groups, kpi_data, date_range, symbols):
+    """The report document from [(name, PNG bytes)]; returns a BytesIO positioned at 0."""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Image, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4),
+                            rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    start = kpi_data.get("Start date", "N/A")
+    end = kpi_data.get("End date", "N/A")
+
+    elements.append(Paragraph("<b>Market Simulation Dashboard Report</b>", styles['Title']))
+    elements.append(Spacer(1, 0.2 * inch))
+    elements.append(Paragraph(f"Simulation Period: {start} → {end}", styles['Normal']))
+    elements.append(Paragraph(f"Filtered Range: {date_range[0]:%Y-%m-%d} → {date_range[1]:%Y-%m-%d}", styles['Normal']))
+    elements.append(Paragraph(f"Symbols: {', '.join(symbols)}", styles['Normal']))
+    elements.append(Spacer(1, 0.3 * inch))
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(A4),
-                                rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-        styles = getSampleStyleSheet()
-        elements = []
+    kpi_rows = []
+    for group_name, labels in kpi_groups.items():
+        kpi_rows.append([Paragraph(f"<b>{group_name}</b>", styles['Heading4']), ""])
+        for label in labels:
+            val = kpi_data.get(label, "N/A")
+            kpi_rows.append([label, val])
 
-        start = kpi_data.get("Start date", "N/A")
-        end = kpi_data.get("End date", "N/A")
+    kpi_table = Table(kpi_rows, hAlign='LEFT')
+    kpi_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), '#CCCCCC'),
+        ('GRID', (0, 0), (-1, -1), 0.5, 'black'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    elements.append(kpi_table)
+    elements.append(Spacer(1, 0.4 * inch))
 
-        elements.append(Paragraph("<b>Market Simulation Dashboard Report</b>", styles['Title']))
+    for name, png in images:
+        elements.append(Paragraph(f"<b>{name}</b>", styles['Heading3']))
         elements.append(Spacer(1, 0.2 * inch))
-        elements.append(Paragraph(f"Simulation Period: {start} → {end}", styles['Normal']))
-        elements.append(Paragraph(f"Filtered Range: {state.date_range[0]:%Y-%m-%d} → {state.date_range[1]:%Y-%m-%d}", styles['Normal']))
-        elements.append(Paragraph(f"Symbols: {', '.join(state.symbols)}", styles['Normal']))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        kpi_rows = []
-        for group_name, labels in kpi_groups.items():
-            kpi_rows.append([Paragraph(f"<b>{group_name}</b>", styles['Heading4']), ""])
-            for label in labels:
-                val = kpi_data.get(label, "N/A")
-                kpi_rows.append([label, val])
-
-        kpi_table = Table(kpi_rows, hAlign='LEFT')
-        kpi_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), '#CCCCCC'),
-            ('GRID', (0, 0), (-1, -1), 0.5, 'black'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        elements.append(kpi_table)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        for name, path in images:
-            elements.append(Paragraph(f"<b>{name}</b>", styles['Heading3']))
-            elements.append(Spacer(1, 0.2 * inch))
-            elements.append(Image(path, width=10.5 * inch, height=6.5 * inch))
-            elements.append(PageBreak())
-
-        doc.build(elements)
-        buffer.seek(0)
-        return buffer
\ No newline at end of file
+        elements.append(Image(io.BytesIO(png), width=10.5 * inch, height=6.5 * inch))
+        elements.append(PageBreak())
+
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer
+
+
+def render_report(chart_specs, kpi_groups, kpi_data, date_range, symbols, progress=None, strict=False,
+                  **raster_options):
+    """
+    chart_specs: list of tuples (name, fig_factory)
+                 where fig_factory is a callable returning a plotly figure
+    Charts that fail to build or render are left out of the report; with
+    strict=True they raise RuntimeError instead (unattended batch runs).
+    """
+    names, figures, missing = [], [], []
+    for name, fig_fn in chart_specs:
+        try:
+            # long line traces are thinned as on screen: the image cannot show more points
+            figures.append(slice_figure(fig_fn(), max_points=PDF_DOWNSAMPLE_POINTS))
+            names.append(name)
+        except Exception as e:
+            missing.append(name)
+            print(f"[PDF Export] Failed to build {name}: {e}")
+    pngs = rasterize(figures, **{**IMAGE_SIZE, **raster_options}, progress=progress, names=names)
+    images = [(name, png) for name, png in zip(names, pngs) if png is not None]
+    missing += [name for name, png in zip(names, pngs) if png is None]
+    if strict and missing:
+        raise RuntimeError(f"{len(missing)} of {len(chart_specs)} charts missing: {', '.join(missing)}")
+    return build_pdf(images, kpi_groups, kpi_data, date_range, symbols)
+
+
+def generate_dashboard_pdf(state, chart_specs, kpi_groups, kpi_data, progress=None):
+    return render_report(chart_specs, kpi_groups, kpi_data, state.date_range, state.symbols, progress)
+
+
+# ---------------- Panel controls ----------------
+def pdf_export_controls(state, chart_specs, kpi_groups, filename="market_dashboard.pdf"):
+    """
+    "Prepare PDF Report" button, progress bar and download button. The report is
+    built in a worker thread; the UI stays responsive and the download button is
+    enabled with the finished file.
+    """
+    import panel as pn
+
+    prepare = pn.widgets.Button(name="Prepare PDF Report", button_type="primary")
+    progress = pn.indicators.Progress(value=0, max=100, visible=False, sizing_mode="stretch_width")
+    download = pn.widgets.FileDownload(label="Download PDF Report", filename=filename,
+                                       button_type="success", disabled=True, visible=False)
+
+    async def _on_prepare(event):
+        prepare.disabled, download.disabled = True, True
+        progress.value, progress.visible = 0, True
+        loop = asyncio.get_running_loop()
+
+        def _progress(done, total):
+            # called from worker threads: hand the update to the server's event loop
+            loop.call_soon_threadsafe(setattr, progress, "value", int(100 * done / max(total, 1)))
+
+        try:
+            buffer = await asyncio.to_thread(generate_dashboard_pdf, state, chart_specs, kpi_groups,
+                                             state.kpis, _progress)
+            download.file, download.disabled, download.visible = buffer, False, True
+        except Exception as e:
+            print(f"[PDF Export] Report failed: {e}")
+        finally:
+            prepare.disabled, progress.visible = False, False
+
+    prepare.on_click(_on_prepare)
+    return pn.Column(prepare, progress, download, sizing_mode="stretch_width")
@@ -18,15 +18,17 @@ def _first_existing(paths):
             return p
     return None
 
-def load_data():
+def load_data(output: Path = None):
     """
     Returns: (daily_df, monthly_df, dividends_df, metadata_df)
       - daily_df: output/daily_portfolio.csv (index=date)
       - monthly_df: output/monthly_stats.csv (index=month)
       - dividends_df: output/dividends_events.csv (for inspection / tables)
       - metadata_df: symbol metadata if available (optional)
+    output: folder of another simulation run (default: output/)
     """
-    daily_df = _read_csv_if_exists(OUTPUT / "daily_portfolio.csv", parse_dates=["date"])
+    output = OUTPUT if output is None else Path(output)
+    daily_df = _read_csv_if_exists(output / "daily_portfolio.csv", parse_dates=["date"])
     if not daily_df.empty:
         if "date" in daily_df.columns:
             daily_df["date"] = pd.to_datetime(daily_df["date"], errors="coerce")
@@ -35,19 +37,19 @@ def load_data():
             daily_df.index = pd.to_datetime(daily_df.index, errors="coerce")
             daily_df = daily_df.sort_index()
 
-    monthly_df = _read_csv_if_exists(OUTPUT / "monthly_stats.csv", parse_dates=["month"])
+    monthly_df = _read_csv_if_exists(output / "monthly_stats.csv", parse_dates=["month"])
     if not monthly_df.empty:
         if "month" in monthly_df.columns:
             monthly_df["month"] = pd.to_datetime(monthly_df["month"], errors="coerce")
             monthly_df = monthly_df.set_index("month").sort_index()
 
-    dividends_df = _read_csv_if_exists(OUTPUT / "dividends_events.csv", parse_dates=["date"])
+    dividends_df = _read_csv_if_exists(output / "dividends_events.csv", parse_dates=["date"])
     # keep dividends_df WITHOUT setting index; many tables like a flat df
 
     # Try to find metadata (optional)
     candidate_meta = _first_existing([
         Path("input") / "symbol_metadata.csv",
-        OUTPUT / "symbol_metadata.csv",
+        output / "symbol_metadata.csv",
         Path("symbol_metadata.csv"),
     ])
     metadata_df = pd.read_csv(candidate_meta) if candidate_meta else pd.DataFrame()
@@ -55,12 +57,12 @@ def load_data():
     return daily_df, monthly_df, dividends_df, metadata_df
 
 
-def load_kpis():
+def load_kpis(output: Path = None):
     """
     Reads output_kpis.txt if present. Returns dict[str, str].
     Accepts 'Key: Value' per line.
     """
-    path = OUTPUT / "output_kpis.txt"
+    path = (OUTPUT if output is None else Path(output)) / "output_kpis.txt"
     if not path.exists():
         return {}
     data = {}
@@ -3,6 +3,7 @@ import panel as pn
 import pandas as pd
 import numpy as np
 from dashboard.config import KPI_EXPLANATIONS
+from simcore.drawdown import analyze_drawdowns
 
 # ---------- formatting & parsing helpers ----------
 def _num(x):
@@ -65,22 +66,6 @@ def _net_gain_months(monthly_df, start_idx, end_idx):
     delta_contrib = contrib[start_idx:end_idx + 1].sum()
     return float(delta_val - delta_contrib)
 
-def _max_drawdown(series):
-    """Return max drawdown as percent (negative or zero)."""
-    x = np.asarray(series, dtype=float)
-    if x.size == 0 or np.all(~np.isfinite(x)):
-        return None
-    peak = -np.inf
-    mdd = 0.0
-    for v in x:
-        if not np.isfinite(v):
-            continue
-        peak = max(peak, v)
-        if peak > 0:
-            dd = v / peak - 1.0
-            mdd = min(mdd, dd)
-    return mdd * 100.0
-
 # ---------- KPI computations ----------
 def compute_custom_kpis(state, original_kpis: dict):
     # [A] External cash invested
@@ -152,11 +137,19 @@ def compute_custom_kpis(state, original_kpis: dict):
     last_month_abs = _num(original_kpis.get("Last month gain/loss absolute"))
     # Max Drawdown
     mdd = _num(original_kpis.get("Max Drawdown"))
-    if mdd is None:
+    longest_dd = _num(original_kpis.get("Longest drawdown (days)"))
+    underwater = _num(original_kpis.get("Time underwater"))
+    if mdd is None or longest_dd is None or underwater is None:
         try:
-            mdd = _max_drawdown(state.daily_df["total_value"])
+            dd_stats = analyze_drawdowns(state.daily_df["total_value"]).stats
         except Exception:
-            mdd = None
+            dd_stats = {}
+        if mdd is None and dd_stats.get("max_drawdown") is not None:
+            mdd = dd_stats["max_drawdown"] * 100.0
+        if longest_dd is None:
+            longest_dd = dd_stats.get("longest_duration_days")
+        if underwater is None:
+            underwater = dd_stats.get("time_underwater_pct")
 
     # Compute last quarter absolute (and fallbacks) from monthly_df if needed
     try:
@@ -190,6 +183,8 @@ def compute_custom_kpis(state, original_kpis: dict):
         "[PQ] Last quarter gain/loss absolute": _eur(pq),
         "[PM] Last month gain/loss absolute": _eur(last_month_abs),
         "[PD] Max Drawdown": _pct(mdd),
+        "[PL] Longest drawdown": "N/A" if longest_dd is None else f"{_int_str(longest_dd)} days",
+        "[PU] Time underwater": _pct(underwater),
     }
 
     # Assemble all
@@ -1,71 +1,170 @@
 # dashboard/layout.py
 import panel as pn
 from dashboard.kpi import kpi_group_panel, kpi_date_panel, compute_custom_kpis
-from dashboard.config import KPI_GROUPS
+from dashboard.config import KPI_GROUPS, DOWNSAMPLE_POINTS, WEBGL_POINTS, COMPACT_SERIES
 from dashboard.plots import lines, bars, heatmaps, radars
 from dashboard.plots.lines import portfolio_value_with_symbols
+from dashboard.plots.ranges import slice_figure
 
 def build_layout(state, widgets):
     # Unpack widgets (widgets is a tuple)
     date_range, heatmap_palette, symbol_selector, view_mode_toggle = widgets
 
-    # ---------------- Overview ----------------
-    total_value_pane, _ = lines.total_portfolio_value(state, mode=view_mode_toggle.value)
-    inv_vs_val_pane, _  = lines.invested_vs_value(state, mode=view_mode_toggle.value)
-    pv_sym_pane, _      = portfolio_value_with_symbols(state)
-
-    # Toggle daily/monthly for overview charts
-    def _on_mode_change(event):
-        _, fig1 = lines.total_portfolio_value(state, mode=event.new)
-        total_value_pane.object = fig1
-        _, fig2 = lines.invested_vs_value(state, mode=event.new)
-        inv_vs_val_pane.object = fig2
-    view_mode_toggle.param.watch(_on_mode_change, "value")
+    # ---------------- Sections ----------------
+    # The main area is a set of dynamic tabs. Each section's panes (and the figures and
+    # KPIs behind them) are built the first time its tab is shown, then kept; filter
+    # changes only refresh sections that have been built.
+    panes = {}    # pane name -> pane, filled in by the section builders
 
-    # ---------------- Bars ----------------
-    monthly_irr_pane, _   = bars.monthly_irr(state)
-    ltm_total_div_pane, _ = bars.dividends_last_12m_total(state)
-    ltm_by_symbol_pane, _ = bars.dividends_by_symbol_last_12m(state)
+    def _section(build):
+        layout = []
+        def _get():
+            if not layout:
+                layout.append(build())
+            return layout[0]
+        return pn.param.ParamFunction(_get, lazy=True, sizing_mode="stretch_width")
 
-    # ---------------- Heatmaps (palette-bound) ----------------
-    # monthly_dividends_calendar returns a single go.Figure
-    calendar_div_view = pn.bind(
-        lambda palette: heatmaps.monthly_dividends_calendar(state, palette),
-        palette=heatmap_palette
-    )
-    # If your total_portfolio_value_calendar still returns (title, fig), keep [1]
-    calendar_val_view = pn.bind(
-        lambda palette: heatmaps.total_portfolio_value_calendar(state, palette),
-        palette=heatmap_palette
-    )
+    # ---------------- KPIs ----------------
+    def _build_kpis():
+        custom_kpis = compute_custom_kpis(state, state.kpis)
+        return pn.Column(
+            kpi_date_panel(state.kpis),
+            kpi_group_panel(custom_kpis, "General KPIs",     KPI_GROUPS["General KPIs"]),
+            kpi_group_panel(custom_kpis, "Capital KPIs",     KPI_GROUPS["Capital KPIs"]),
+            kpi_group_panel(custom_kpis, "Dividend KPIs",    KPI_GROUPS["Dividend KPIs"]),
+            kpi_group_panel(custom_kpis, "Taxes/Fees KPIs",  KPI_GROUPS["Taxes/Fees KPIs"]),
+            kpi_group_panel(custom_kpis, "Performance KPIs", KPI_GROUPS["Performance KPIs"]),
+            sizing_mode="stretch_width",
+        )
 
-    calendar_div_pane = pn.pane.Plotly(calendar_div_view, config={"responsive": True}, sizing_mode="stretch_width")
-    calendar_val_pane = pn.pane.Plotly(calendar_val_view, config={"responsive": True}, sizing_mode="stretch_width")
+    # ---------------- Overview ----------------
+    # Built once over the full history (memoized per mode); a new date range or zoom only
+    # slices the precomputed traces and thins them to DOWNSAMPLE_POINTS (dashboard/plots/ranges.py);
+    # dense views are drawn with WebGL and sent in the compact encoding.
+    full_range = (state.daily_df.index.min(), state.daily_df.index.max())
+
+    def _total_value_fig():
+        return lines.total_portfolio_value(state, mode=view_mode_toggle.value, date_range=full_range)[1]
+
+    def _inv_vs_val_fig():
+        return lines.invested_vs_value(state, mode=view_mode_toggle.value, date_range=full_range)[1]
+
+    def _view(fig, start=None, end=None):
+        return slice_figure(fig, start, end, max_points=DOWNSAMPLE_POINTS,
+                            webgl_points=WEBGL_POINTS, compact=COMPACT_SERIES)
+
+    def _overview_views():
+        return _view(_total_value_fig(), *state.date_range), _view(_inv_vs_val_fig(), *state.date_range)
+
+    # Zooming re-slices the full figure at the new x-range, so detail comes back
+    # as the visible span shrinks; a reset (double click) goes back to the default span.
+    def _follow_zoom(pane, full_fig, default_range):
+        def _on_relayout(event):
+            data = event.new or {}
+            if "xaxis.range[0]" in data:
+                start, end = data["xaxis.range[0]"], data["xaxis.range[1]"]
+            elif "xaxis.range" in data:
+                start, end = data["xaxis.range"]
+            elif data.get("xaxis.autorange"):
+                start, end = default_range()
+            else:
+                return
+            pane.object = _view(full_fig(), start, end)
+        pane.param.watch(_on_relayout, "relayout_data")
+
+    shown = {}   # thinned panes: the figure their view was cut from
+
+    def _build_overview():
+        total_value_view, inv_vs_val_view = _overview_views()
+        pv_sym_fig = portfolio_value_with_symbols(state)[1]
+        panes["total_value"] = pn.pane.Plotly(total_value_view, config={"responsive": True}, sizing_mode="stretch_width")
+        panes["inv_vs_val"]  = pn.pane.Plotly(inv_vs_val_view, config={"responsive": True}, sizing_mode="stretch_width")
+        panes["pv_sym"]      = pn.pane.Plotly(_view(pv_sym_fig), config={"responsive": True}, sizing_mode="stretch_width")
+        shown[id(panes["pv_sym"])] = pv_sym_fig
+
+        _follow_zoom(panes["total_value"], _total_value_fig, lambda: state.date_range)
+        _follow_zoom(panes["inv_vs_val"], _inv_vs_val_fig, lambda: state.date_range)
+        _follow_zoom(panes["pv_sym"], lambda: portfolio_value_with_symbols(state)[1], lambda: (None, None))
+        return pn.Column(
+            pn.pane.Markdown("### Portfolio Overview"),
+            panes["total_value"],
+            panes["inv_vs_val"],
+            panes["pv_sym"],
+            sizing_mode="stretch_width",
+        )
+
+    # ---------------- Dividends (bars + palette-bound heatmaps) ----------------
+    def _build_dividends():
+        panes["monthly_irr"], _   = bars.monthly_irr(state)
+        panes["ltm_total_div"], _ = bars.dividends_last_12m_total(state)
+        panes["ltm_by_symbol"], _ = bars.dividends_by_symbol_last_12m(state)
+
+        # monthly_dividends_calendar returns a single go.Figure
+        calendar_div_view = pn.bind(
+            lambda palette: heatmaps.monthly_dividends_calendar(state, palette),
+            palette=heatmap_palette
+        )
+        # If your total_portfolio_value_calendar still returns (title, fig), keep [1]
+        calendar_val_view = pn.bind(
+            lambda palette: heatmaps.total_portfolio_value_calendar(state, palette),
+            palette=heatmap_palette
+        )
+        # the calendars are memoized figures shared between sessions: not linked back (plots/memo.py)
+        panes["calendar_div"] = pn.pane.Plotly(calendar_div_view, config={"responsive": True},
+                                               sizing_mode="stretch_width", link_figure=False)
+        panes["calendar_val"] = pn.pane.Plotly(calendar_val_view, config={"responsive": True},
+                                               sizing_mode="stretch_width", link_figure=False)
+        return pn.Column(
+            pn.pane.Markdown("### Dividend Metrics"),
+            panes["monthly_irr"],
+            panes["ltm_total_div"],
+            panes["ltm_by_symbol"],
+            panes["calendar_div"],
+            panes["calendar_val"],
+            sizing_mode="stretch_width",
+        )
 
     # ---------------- Radars ----------------
-    sector_alloc_pane, sector_alloc_fig   = radars.sector_allocation(state)
-    country_alloc_pane, country_alloc_fig = radars.country_allocation(state)
+    def _build_allocations():
+        sector_alloc_pane, _  = radars.sector_allocation(state)
+        country_alloc_pane, _ = radars.country_allocation(state)
+        return pn.Column(
+            pn.pane.Markdown("### Allocation Charts"),
+            pn.Row(sector_alloc_pane, country_alloc_pane),
+            sizing_mode="stretch_width",
+        )
 
-    # ---------------- KPIs ----------------
-    custom_kpis = compute_custom_kpis(state, state.kpis)
+    # Toggle daily/monthly for overview charts
+    def _on_mode_change(event):
+        if "total_value" in panes:
+            panes["total_value"].object, panes["inv_vs_val"].object = _overview_views()
+    view_mode_toggle.param.watch(_on_mode_change, "value")
 
     # --------- Unified rebuild for symbol/date dependent charts ----------
+    # The factories are memoized on their inputs (dashboard/plots/memo.py): charts whose
+    # inputs did not change return the figure they already show and are left alone.
+    def _show(pane, fig, view=None):
+        if view is None:
+            if pane.object is not fig:
+                pane.object = fig
+        elif shown.get(id(pane)) is not fig:
+            shown[id(pane)] = fig
+            pane.object = view(fig)
+
     def _rebuild_symbol_dependent():
         # Portfolio value + individual symbols
-        _, fig_comp = portfolio_value_with_symbols(state)
-        pv_sym_pane.object = fig_comp
+        if "pv_sym" in panes:
+            _show(panes["pv_sym"], portfolio_value_with_symbols(state)[1], _view)
 
-        # Dividends by Symbol – Last 12 Months
-        _, fig_ltm_sym = bars.dividends_by_symbol_last_12m(state)
-        ltm_by_symbol_pane.object = fig_ltm_sym
+        if "ltm_by_symbol" in panes:
+            # Dividends by Symbol – Last 12 Months
+            _show(panes["ltm_by_symbol"], bars.dividends_by_symbol_last_12m(state)[1])
 
-        # Monthly Dividends (Full Period) calendar (returns a single Figure)
-        fig_div_cal = heatmaps.monthly_dividends_calendar(state, palette=heatmap_palette.value)
-        calendar_div_pane.object = fig_div_cal
+            # Monthly Dividends (Full Period) calendar (returns a single Figure)
+            _show(panes["calendar_div"], heatmaps.monthly_dividends_calendar(state, palette=heatmap_palette.value))
 
-        # Total Portfolio Value (Full Period) calendar (keep [1] if function returns (title, fig))
-        fig_val_cal = heatmaps.total_portfolio_value_calendar(state, palette=heatmap_palette.value)
-        calendar_val_pane.object = fig_val_cal
+            # Total Portfolio Value (Full Period) calendar
+            _show(panes["calendar_val"], heatmaps.total_portfolio_value_calendar(state, palette=heatmap_palette.value))
 
     # Watch symbol selection — update state THEN rebuild
     raw_checkbox = getattr(symbol_selector, "_checkbox", None) or symbol_selector
@@ -74,10 +173,33 @@ def build_layout(state, widgets):
         _rebuild_symbol_dependent()
     raw_checkbox.param.watch(_on_symbols_change, "value")
 
-    # Watch date range (these charts read state and should honor the range)
-    date_range.param.watch(lambda e: _rebuild_symbol_dependent(), "value")
+    # Watch date range on released/throttled values only. A newer range supersedes a
+    # rebuild still in progress (threaded servers): each step checks its generation.
+    range_generation = [0]
+
+    def _on_range_change(event):
+        range_generation[0] += 1
+        generation = range_generation[0]
+        if "total_value" in panes:
+            views = _overview_views()
+            if generation != range_generation[0]:
+                return
+            panes["total_value"].object, panes["inv_vs_val"].object = views
+        if generation != range_generation[0]:
+            return
+        _rebuild_symbol_dependent()
+    date_range.param.watch(_on_range_change, "value_throttled")
 
     # ---------------- Template ----------------
+    sections = pn.Tabs(
+        ("KPIs",        _section(_build_kpis)),
+        ("Overview",    _section(_build_overview)),
+        ("Dividends",   _section(_build_dividends)),
+        ("Allocations", _section(_build_allocations)),
+        dynamic=True,           # only the active tab is rendered
+        sizing_mode="stretch_width",
+    )
+
     template = pn.template.FastListTemplate(
         title="Market Simulation Dashboard",
         sidebar=[
@@ -86,60 +208,40 @@ def build_layout(state, widgets):
             pn.Spacer(height=32),
             heatmap_palette,
             pn.Spacer(height=32),
-            pn.pane.Markdown(""),    # placeholder for FileDownload (set in app.py)
+            pn.pane.Markdown(""),    # placeholder for the PDF export controls (set in app.py)
             pn.Spacer(height=32),
             view_mode_toggle,
             pn.Spacer(height=16),
             symbol_selector,         # panel with checkbox + buttons
         ],
-        main=[
-            # KPIs
-            lambda: kpi_date_panel(state.kpis),
-            lambda: kpi_group_panel(custom_kpis, "General KPIs",     KPI_GROUPS["General KPIs"]),
-            lambda: kpi_group_panel(custom_kpis, "Capital KPIs",     KPI_GROUPS["Capital KPIs"]),
-            lambda: kpi_group_panel(custom_kpis, "Dividend KPIs",    KPI_GROUPS["Dividend KPIs"]),
-            lambda: kpi_group_panel(custom_kpis, "Taxes/Fees KPIs",  KPI_GROUPS["Taxes/Fees KPIs"]),
-            lambda: kpi_group_panel(custom_kpis, "Performance KPIs", KPI_GROUPS["Performance KPIs"]),
-
-            # Overview
-            pn.Column(
-                pn.pane.Markdown("### Portfolio Overview"),
-                total_value_pane,
-                inv_vs_val_pane,
-                pv_sym_pane,
-            ),
-
-            # Dividends
-            pn.Column(
-                pn.pane.Markdown("### Dividend Metrics"),
-                monthly_irr_pane,
-                ltm_total_div_pane,
-                ltm_by_symbol_pane,
-                calendar_div_pane,
-                calendar_val_pane,
-            ),
-
-            # Allocations
-            pn.Column(
-                pn.pane.Markdown("### Allocation Charts"),
-                pn.Row(sector_alloc_pane, country_alloc_pane),
-            ),
-        ],
+        main=[sections],
     )
 
     # ---------------- Export (PDF, etc.) ----------------
-    chart_specs = [
+    # mode and palette are read when the report is built, so it follows the widgets
+    specs = chart_specs(state, mode=lambda: view_mode_toggle.value, palette=lambda: heatmap_palette.value)
+
+    return template, specs
+
+
+def chart_specs(state, mode="daily", palette="Viridis"):
+    """
+    [(name, figure factory)] for the report charts of `state`. Needs no widgets or
+    server (see dashboard/batch_report.py); `mode` and `palette` are values or
+    callables returning them at build time.
+    """
+    _mode = mode if callable(mode) else (lambda: mode)
+    _palette = palette if callable(palette) else (lambda: palette)
+    return [
         ("Symbol Value Over Time",               lambda: lines.symbol_values(state)[1]),
-        ("Total Portfolio Value",                lambda: lines.total_portfolio_value(state, mode=view_mode_toggle.value)[1]),
-        ("Invested vs Portfolio Value",          lambda: lines.invested_vs_value(state, mode=view_mode_toggle.value)[1]),
+        ("Total Portfolio Value",                lambda: lines.total_portfolio_value(state, mode=_mode())[1]),
+        ("Invested vs Portfolio Value",          lambda: lines.invested_vs_value(state, mode=_mode())[1]),
         ("Portfolio Value + Individual Symbols", lambda: portfolio_value_with_symbols(state)[1]),
         ("Monthly IRR",                          lambda: bars.monthly_irr(state)[1]),
         ("Total Dividends - Last 12 Months",     lambda: bars.dividends_last_12m_total(state)[1]),
         ("Dividends by Symbol - Last 12 Months", lambda: bars.dividends_by_symbol_last_12m(state)[1]),
-        ("Monthly Dividends (Full Period)",      lambda: heatmaps.monthly_dividends_calendar(state, palette=heatmap_palette.value)),
-        ("Total Portfolio Value (Full Period)",  lambda: heatmaps.total_portfolio_value_calendar(state, palette=heatmap_palette.value)),
-        ("Sector Allocation",                    lambda: sector_alloc_fig),
-        ("Country Allocation",                   lambda: country_alloc_fig),
+        ("Monthly Dividends (Full Period)",      lambda: heatmaps.monthly_dividends_calendar(state, palette=_palette())),
+        ("Total Portfolio Value (Full Period)",  lambda: heatmaps.total_portfolio_value_calendar(state, palette=_palette())),
+        ("Sector Allocation",                    lambda: radars.sector_allocation(state)[1]),
+        ("Country Allocation",                   lambda: radars.country_allocation(state)[1]),
     ]
-
-    return template, chart_specs
@@ -4,7 +4,9 @@ import plotly.graph_objects as go
 import plotly.colors as pc
 import pandas as pd
 import colorcet as cc
+from dashboard.plots.memo import memoize_figure
 
+@memoize_figure("monthly_df")
 def monthly_irr(state):
     irr_approx = (state.monthly_df["perf_pct"] / 100 + 1) ** 12 - 1
     fig = go.Figure()
@@ -30,18 +32,29 @@ def monthly_irr(state):
     )
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width"), fig
 
-def dividends_last_12m_total(state):
-    df = state.dividends_df[state.dividends_df.index >= (state.dividends_df.index.max() - pd.DateOffset(months=12))].copy()
-    df = df.fillna(0.0)
+def _last_12m_by_symbol(state):
+    """
+    Month × symbol net dividends of the last 12 months, from the precomputed
+    matrix (state.monthly_div_by_symbol, index=month, columns=symbols).
+    """
+    df = getattr(state, "monthly_div_by_symbol", None)
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="month"))
+    df = df[df.index > (df.index.max() - pd.DateOffset(months=12))].fillna(0.0)
 
-    # NEW: apply symbol selection if present
+    # apply symbol selection if present
     selected = getattr(state, "selected_symbols", None)
     if selected is not None:  # <-- accept empty list
         sel = {str(s).upper() for s in selected}
         keep = [c for c in df.columns if isinstance(c, str) and c.upper() in sel]
         df = df[keep] if keep else df.iloc[:, 0:0]
+    return df
+
+@memoize_figure("monthly_div_by_symbol", "selected_symbols")
+def dividends_last_12m_total(state):
+    df = _last_12m_by_symbol(state)
 
-    monthly = df.groupby(df.index.to_period("M")).sum().sum(axis=1).to_timestamp()
+    monthly = df.sum(axis=1)
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -66,18 +79,11 @@ def dividends_last_12m_total(state):
     )
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width"), fig
 
+@memoize_figure("monthly_div_by_symbol", "selected_symbols")
 def dividends_by_symbol_last_12m(state):
-    df = state.dividends_df[state.dividends_df.index >= (state.dividends_df.index.max() - pd.DateOffset(months=12))].copy()
-    df = df.fillna(0.0)
-
-    # NEW: apply symbol selection if present
-    selected = getattr(state, "selected_symbols", None)
-    if selected is not None:  # <-- accept empty list
-        sel = {str(s).upper() for s in selected}
-        keep = [c for c in df.columns if isinstance(c, str) and c.upper() in sel]
-        df = df[keep] if keep else df.iloc[:, 0:0]
+    df = _last_12m_by_symbol(state)
 
-    monthly_symbol = df.groupby(df.index.to_period("M")).sum().to_timestamp()
+    monthly_symbol = df
 
     fig = go.Figure()
     palette = cc.glasbey[:max(1, len(monthly_symbol.columns))]
@@ -0,0 +1,74 @@
+# dashboard/plots/downsample.py
+# Point reduction for long line traces.
+#
+# A trace is reduced to at most `n` points before it is sent to the browser or
+# rasterized for the PDF: LTTB (largest triangle three buckets) keeps the visual
+# shape best, min/max bucketing keeps every bucket's extremes and is fully
+# vectorized, so it is used for figures with many traces. Both return indices,
+# so x, y and any per-point arrays are taken with the same selection.
+
+import numpy as np
+
+LTTB_MAX_TRACES = 4     # "auto": LTTB up to this many reduced traces per figure, min/max above
+
+
+def lttb_indices(x, y, n):
+    """Indices of the `n` points LTTB keeps (first and last always included)."""
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+    # n - 2 buckets between the first and the last point
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.r_[np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1]]
+    mean_y = np.r_[np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1]]
+
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xs, ys = x[lo:hi], y[lo:hi]
+        # triangle (previous pick, candidate, mean of the next bucket); the 1/2 is irrelevant
+        area = np.abs((x[a] - mean_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (mean_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n):
+    """Indices of the minimum and maximum of each of n/2 equal buckets, plus the end points."""
+    size = len(y)
+    if n >= size or n < 4:
+        return np.arange(size)
+    buckets = n // 2
+    bucket = np.arange(size) * buckets // size
+    # sorted by bucket, then by value: each bucket's first row is its min, its last row its max
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(buckets))
+    ends = np.r_[starts[1:], size] - 1
+    return np.unique(np.r_[0, order[starts], order[ends], size - 1])
+
+
+def downsample_indices(x, y, n, method="lttb"):
+    """
+    Indices (sorted) of at most ~n points of a trace to keep. `x` is numeric
+    (e.g. int64 nanoseconds). Missing values are left out of the selection,
+    but the first missing point of each run is kept so line gaps survive.
+    """
+    y = np.asarray(y, dtype=float)
+    if n is None or len(y) <= n:
+        return np.arange(len(y))
+    x = np.asarray(x, dtype=float)
+    x = x - x[0]    # keeps the triangle areas in a sane range for ns timestamps
+    finite = np.isfinite(y)
+    keep = np.arange(len(y)) if finite.all() else np.flatnonzero(finite)
+    if method == "minmax":
+        picked = minmax_indices(y[keep], n)
+    else:
+        picked = lttb_indices(x[keep], y[keep], n)
+    picked = keep[picked]
+    if len(keep) < len(y):
+        gap_starts = np.flatnonzero(~finite & np.r_[True, finite[:-1]])
+        picked = np.union1d(picked, gap_starts)
+    return picked
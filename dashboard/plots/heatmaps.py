@@ -5,6 +5,8 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+from dashboard.plots.memo import memoize_figure
+
 # ---------- Palette registry (used by widgets.py) ----------
 try:
     import colorcet as cc
@@ -127,6 +129,7 @@ def _apply_heatmap_layout(fig, *, title, ncols, nrows, cbar_title):
 
 # ---------------- Heatmaps ----------------
 
+@memoize_figure("monthly_div_by_symbol")
 def dividends_by_month_symbol(state, palette=None):
     """
     Heatmap: X = months, Y = symbols, Z = dividend_net
@@ -160,6 +163,7 @@ def dividends_by_month_symbol(state, palette=None):
     fig.update_layout(yaxis_title="Symbol")
     return fig
 
+@memoize_figure("monthly_dividends_total")
 def dividends_by_month_total(state, palette=None):
     """
     Heatmap with a single row 'Total' across months.
@@ -194,6 +198,7 @@ def dividends_by_month_total(state, palette=None):
     fig.update_layout(yaxis_title="")
     return fig
 
+@memoize_figure("monthly_dividends_calendar_wide")
 def monthly_dividends_calendar(state, palette=None):
     """
     Calendar heatmap: X=Jan..Dec, Y=years. Consumes:
@@ -228,14 +233,10 @@ def monthly_dividends_calendar(state, palette=None):
     fig.update_layout(yaxis_title="Year")
     return fig
 
-def total_portfolio_value_calendar(state, palette=None):
-    """
-    Calendar heatmap for month-end portfolio value: X=Jan..Dec, Y=years.
-    Consumes: state.daily_df (index DatetimeIndex, column 'total_value')
-    """
-    df = getattr(state, "daily_df", pd.DataFrame())
+def _month_end_value_matrix(df):
+    """year × 1..12 month-end total value from a daily frame, or a message string if it cannot be built."""
     if not isinstance(df, pd.DataFrame) or df.empty:
-        return _empty_fig("No portfolio value data")
+        return "No portfolio value data"
 
     if "date" in df.columns and not isinstance(df.index, (pd.DatetimeIndex, pd.PeriodIndex)):
         try:
@@ -247,7 +248,7 @@ def total_portfolio_value_calendar(state, palette=None):
             df.index = pd.to_datetime(df.index, errors="coerce")
             df = df.sort_index()
         except Exception:
-            return _empty_fig("Invalid date index")
+            return "Invalid date index"
 
     col = "total_value"
     if col not in df.columns:
@@ -255,7 +256,7 @@ def total_portfolio_value_calendar(state, palette=None):
         if candidates:
             col = candidates[0]
         else:
-            return _empty_fig("No 'total_value' column")
+            return "No 'total_value' column"
 
     try:
         month_end = df[[col]].resample("M").last().dropna()
@@ -265,7 +266,7 @@ def total_portfolio_value_calendar(state, palette=None):
         month_end = g
 
     if month_end.empty:
-        return _empty_fig("No month-end values")
+        return "No month-end values"
 
     month_end["year"] = month_end.index.year
     month_end["m"] = month_end.index.month
@@ -273,7 +274,20 @@ def total_portfolio_value_calendar(state, palette=None):
     for mth in range(1, 13):
         if mth not in mat.columns:
             mat[mth] = 0.0
-    mat = mat.reindex(columns=sorted(mat.columns)).sort_index()
+    return mat.reindex(columns=sorted(mat.columns)).sort_index()
+
+@memoize_figure("value_calendar", "daily_df")
+def total_portfolio_value_calendar(state, palette=None):
+    """
+    Calendar heatmap for month-end portfolio value: X=Jan..Dec, Y=years.
+    Consumes: state.value_calendar (index=year, columns=1..12, from the simulation's
+    dashboard bundle), else state.daily_df (index DatetimeIndex, column 'total_value')
+    """
+    mat = getattr(state, "value_calendar", None)
+    if not isinstance(mat, pd.DataFrame) or mat.empty:
+        mat = _month_end_value_matrix(getattr(state, "daily_df", pd.DataFrame()))
+        if isinstance(mat, str):
+            return _empty_fig(mat)
 
     x = MONTH_ABBR
     y = mat.index.astype(int).tolist()
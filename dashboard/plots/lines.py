@@ -5,21 +5,25 @@ import numpy as np
 import plotly.graph_objects as go
 import colorcet as cc
 from dashboard.theming import styled_plotly_figure
+from dashboard.plots.memo import memoize_figure
 
-def symbol_values(state):
-    start, end = state.date_range
+@memoize_figure("daily_df", "date_range", "symbols")
+def symbol_values(state, date_range=None):
+    start, end = date_range or state.date_range
     df = state.daily_df.loc[start:end]
     series = {s: df[f"val_{s}"] for s in state.symbols if f"val_{s}" in df.columns}
     fig = styled_plotly_figure("<b>Symbol Value Over Time</b>", df.index, series)
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width"), fig
 
-def total_portfolio_value(state, mode: str = "daily"):
+@memoize_figure("daily_df", "date_range")
+def total_portfolio_value(state, mode: str = "daily", date_range=None):
     """
     Plot total portfolio value over time.
     mode: "daily" or "monthly"
+    date_range: (start, end) to plot instead of state.date_range
     """
     mode = (mode or "daily").lower()
-    start, end = state.date_range
+    start, end = date_range or state.date_range
 
     if mode == "monthly":
         # Resample daily values to month-end, then clip to selected range
@@ -44,13 +48,15 @@ def total_portfolio_value(state, mode: str = "daily"):
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width"), fig
 
 
-def invested_vs_value(state, mode: str = "daily"):
+@memoize_figure("daily_df", "monthly_df", "date_range")
+def invested_vs_value(state, mode: str = "daily", date_range=None):
     """
     Plot portfolio value vs. invested capital (external cash).
     mode: "daily" or "monthly"
+    date_range: (start, end) to plot instead of state.date_range
     """
     mode = (mode or "daily").lower()
-    start, end = state.date_range
+    start, end = date_range or state.date_range
 
     if mode == "monthly":
         # Value: one point per month (month-end)
@@ -119,6 +125,7 @@ def invested_vs_value(state, mode: str = "daily"):
     )
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width"), fig
 
+@memoize_figure("daily_df", "selected_symbols")
 def portfolio_value_with_symbols(state, palette: str = "glasbey"):
     """
     Line chart: Total portfolio value + each symbol's value over time.
@@ -0,0 +1,108 @@
+# dashboard/plots/memo.py
+# Bounded LRU memoization for the figure factories in dashboard/plots/*.
+#
+# Each factory declares the state attributes it reads; the cache key is those
+# values plus the call arguments. DataFrames are keyed by identity: the frames
+# come from the shared snapshot (dashboard/cache.py) and are never modified in
+# place, so the same object means the same data. Entries hold a reference to
+# the frames they were built from, so an id cannot be reused while cached.
+# Cached figures are shared between sessions and must not be mutated: panes around
+# them are built with link_figure=False, so client zoom/legend events stay in the
+# session's pane instead of being written back into the shared figure.
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import panel as pn
+
+FIGURE_CACHE_SIZE = 32   # entries per factory
+
+
+def _key_part(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", id(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _key_part(v)) for k, v in value.items()))
+    return value
+
+
+class _LRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, pinned):
+        with self.lock:
+            self.entries[key] = (value, pinned)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+def _pane(fig):
+    return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width", link_figure=False)
+
+
+def memoize_figure(*state_attrs, maxsize=FIGURE_CACHE_SIZE):
+    """
+    Memoize a factory `fn(state, *args, **kwargs)` on the listed state
+    attributes and its arguments. An argument named like a listed attribute
+    (e.g. date_range=...) replaces that attribute when it is not None.
+    Factories returning (pane, fig) get a fresh unlinked pane around the cached
+    figure on every call, the first one included (panes belong to one session);
+    factories returning a bare figure get the cached figure itself.
+    """
+    def decorate(fn):
+        cache = _LRU(maxsize)
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            # positional, keyword and defaulted arguments all map to the same key
+            bound = signature.bind(state, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(tuple(bound.arguments.items())[1:])
+            deps = tuple(arguments.pop(attr) if arguments.get(attr) is not None else getattr(state, attr, None)
+                         for attr in state_attrs)
+            call = tuple(arguments.items())
+            key = (_key_part(deps), _key_part(call))
+            try:
+                hash(key)
+            except TypeError:
+                return fn(state, *args, **kwargs)
+
+            cached = cache.get(key)
+            if cached is not None:
+                fig, with_pane = cached
+                return (_pane(fig), fig) if with_pane else fig
+
+            result = fn(state, *args, **kwargs)
+            with_pane = isinstance(result, tuple)
+            fig = result[1] if with_pane else result
+            if fig is not None:   # "no data" placeholders are cheap and not cached
+                cache.put(key, (fig, with_pane), deps)
+                if with_pane:
+                    return _pane(fig), fig
+            return result
+
+        wrapper.cache_info = lambda: {"hits": cache.hits, "misses": cache.misses,
+                                      "size": len(cache.entries), "maxsize": cache.maxsize}
+        wrapper.cache_clear = cache.entries.clear
+        return wrapper
+    return decorate
@@ -2,20 +2,19 @@ import panel as pn
 import plotly.graph_objects as go
 import numpy as np
 from plotly.colors import qualitative as q
+from simcore.allocation import category_values
+from dashboard.plots.memo import memoize_figure
 
 def _allocation_series(state, field, categories=None, min_categories=None):
-    latest_values = state.daily_df.iloc[-1]
-    mapper = dict(zip(state.metadata_df.symbol, state.metadata_df[field]))
-    current = {}
-    avg = {}
+    # daily value per category in one matrix product (values × one-hot metadata)
     all_symbols = sorted([c.replace("val_", "") for c in state.daily_df.columns if c.startswith("val_")])
-
-    for sym in all_symbols:
-        col = f"val_{sym}"
-        if col in state.daily_df.columns:
-            key = mapper.get(sym, "Unknown")
-            current[key] = current.get(key, 0.0) + latest_values[col]
-            avg[key] = avg.get(key, 0.0) + state.daily_df[col].mean()
+    values = state.daily_df[[f"val_{s}" for s in all_symbols]].set_axis(all_symbols, axis=1)
+    meta = state.metadata_df
+    if "symbol" in meta.columns:
+        meta = meta.drop_duplicates("symbol").set_index("symbol")
+    by_cat = category_values(values, meta, field)
+    current = by_cat.iloc[-1].to_dict()
+    avg = by_cat.mean().to_dict()
 
     if categories:
         cats = categories
@@ -80,11 +79,13 @@ def _radar_figure(title_text, categories, current_vals, avg_vals):
     )
     return fig
 
+@memoize_figure("daily_df", "metadata_df")
 def sector_allocation(state, fixed_categories=None, min_categories=None):
     cats, cur, avg = _allocation_series(state, "sector", categories=fixed_categories, min_categories=min_categories)
     fig = _radar_figure("Sector Allocation", cats, cur, avg)
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width"), fig
 
+@memoize_figure("daily_df", "metadata_df")
 def country_allocation(state, fixed_categories=None, min_categories=None):
     cats, cur, avg = _allocation_series(state, "country", categories=fixed_categories, min_categories=min_categories)
     fig = _radar_figure("Country Allocation", cats, cur, avg)
@@ -0,0 +1,112 @@
+# dashboard/plots/ranges.py
+# Date-range views of full-history figures.
+#
+# A time-series figure is built once over the whole history (memoized in
+# dashboard/plots/memo.py); moving the date slider or zooming then only slices
+# each trace's x/y arrays with a binary search, thins them to the point budget
+# (dashboard/plots/downsample.py) and returns a plain-dict figure for the pane,
+# instead of resampling and rebuilding the figure for every range.
+#
+# For the browser, dense views are also re-encoded: above a total point count the
+# line traces become WebGL (scattergl) traces, and series are sent as epoch-ms x /
+# float32 y arrays, which Panel ships as binary buffers instead of JSON date strings.
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from dashboard.config import DOWNSAMPLE_METHOD
+from dashboard.plots.downsample import downsample_indices, LTTB_MAX_TRACES
+
+# id(figure) -> (layout dict, [(trace dict without x/y, x as int64 ns, x, y)]); figures are
+# unhashable, so entries are keyed by id and dropped when their figure is collected
+_prepared = {}
+
+# per-point attributes that slicing would misalign: traces carrying them are left whole
+_PER_POINT = ("customdata", "text", "hovertext", "ids")
+
+
+def _is_time_line(obj):
+    if getattr(obj, "type", None) not in ("scatter", "scattergl"):
+        return False
+    if any(np.ndim(getattr(obj, k, None)) >= 1 for k in _PER_POINT):
+        return False
+    x = getattr(obj, "x", None)
+    return x is not None and getattr(obj, "y", None) is not None \
+        and pd.api.types.is_datetime64_any_dtype(pd.Index(x))
+
+
+def _prepare(fig):
+    cached = _prepared.get(id(fig))
+    if cached is not None:
+        return cached
+    as_json = fig.to_plotly_json()
+    traces = []
+    # x/y are read from the trace objects: the JSON form may hold them base64-encoded
+    for obj, trace in zip(fig.data, as_json["data"]):
+        if not _is_time_line(obj):
+            traces.append((trace, None, None, None))
+            continue
+        x = pd.DatetimeIndex(obj.x).values
+        traces.append(({k: v for k, v in trace.items() if k not in ("x", "y")},
+                       x.astype("int64"), x, np.asarray(obj.y)))
+    cached = (as_json["layout"], traces)
+    _prepared[id(fig)] = cached
+    weakref.finalize(fig, _prepared.pop, id(fig), None)
+    return cached
+
+
+def _gl_capable(trace):
+    # scattergl has no stacking or smoothed lines
+    return "stackgroup" not in trace and (trace.get("line") or {}).get("shape") in (None, "linear")
+
+
+def slice_figure(fig, start=None, end=None, max_points=None, method=DOWNSAMPLE_METHOD,
+                 webgl_points=None, compact=False):
+    """
+    `fig` restricted to [start, end] (either may be None for unbounded): a
+    figure dict whose time-series traces hold only the points in range, plus
+    one neighbour on each side so lines reach the plot edges, thinned to
+    `max_points` per trace when given. With both bounds, the x-axis spans them.
+    Other traces are passed through. `fig` itself is not modified.
+
+    Browser payload options: with more than `webgl_points` time-series points in
+    total, those traces are drawn with WebGL; `compact` sends their x as epoch
+    milliseconds (on a date axis) and y as float32.
+    """
+    if fig is None or isinstance(fig, dict):
+        return fig
+    layout, traces = _prepare(fig)
+    if method == "auto":
+        method = "lttb" if sum(x_ns is not None for _, x_ns, _, _ in traces) <= LTTB_MAX_TRACES else "minmax"
+    data, lines, points = [], [], 0
+    for trace, x_ns, x, y in traces:
+        if x_ns is None:
+            data.append(trace)
+            continue
+        lo = 0 if start is None else max(np.searchsorted(x_ns, pd.Timestamp(start).value, side="left") - 1, 0)
+        hi = len(x_ns) if end is None else np.searchsorted(x_ns, pd.Timestamp(end).value, side="right") + 1
+        xs, ys = (x_ns if compact else x)[lo:hi], y[lo:hi]
+        if max_points is not None and len(ys) > max_points:
+            keep = downsample_indices(x_ns[lo:hi], ys, max_points, method)
+            xs, ys = xs[keep], ys[keep]
+        if compact:
+            # plotly.js reads numbers on a date axis as ms since the epoch
+            xs, ys = xs / 1e6, np.asarray(ys, dtype=np.float32)
+        lines.append(len(data))
+        points += len(ys)
+        data.append({**trace, "x": xs, "y": ys})
+
+    axes = {}
+    if compact:
+        axes = {f"xaxis{data[i].get('xaxis', 'x')[1:]}": {"type": "date"} for i in lines}
+    if webgl_points is not None and points > webgl_points:
+        for i in lines:
+            if data[i].get("type", "scatter") == "scatter" and _gl_capable(data[i]):
+                data[i]["type"] = "scattergl"
+    if start is not None and end is not None:
+        axes.setdefault("xaxis", {})["range"] = [pd.Timestamp(start).isoformat(), pd.Timestamp(end).isoformat()]
+    if not axes:
+        return {"data": data, "layout": layout}
+    return {"data": data, "layout": {**layout, **{k: {**layout.get(k, {}), **v} for k, v in axes.items()}}}
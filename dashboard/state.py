@@ -26,3 +26,30 @@ class DashboardState(param.Parameterized):
         if not self.param['heatmap_palette'].objects:
             self.param['heatmap_palette'].objects = ["imola"]
             self.heatmap_palette = "imola"
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """
+        A state over a loaded DataSnapshot (dashboard/cache.py), with defaults set and
+        the prepared monthly/calendar tables attached. Needs no widgets or server.
+        """
+        state = cls(
+            daily_df=data.daily_df,
+            monthly_df=data.monthly_df,
+            dividends_df=data.dividends_df,
+            metadata_df=data.metadata_df,
+            kpis=dict(data.kpis)
+        )
+        state.set_defaults()
+
+        # Attach the prepared monthly/calc artifacts so plots can consume them
+        # Wide matrix (index=month, columns=symbol) for symbol heatmaps
+        state.monthly_div_by_symbol = data.monthly_by_symbol_wide
+
+        # Tidy variants if your plot factories expect long format
+        state.monthly_div_by_symbol_tidy = data.monthly_by_symbol_tidy      # [month, symbol, value]
+        state.monthly_dividends_total = data.monthly_total_tidy              # [month, value]
+        state.monthly_dividends_calendar_wide = data.calendar_wide          # index=year, cols=1..12
+        state.monthly_dividends_calendar_tidy = data.calendar_tidy          # [year, month, value, month_name]
+        state.value_calendar = data.value_calendar                          # month-end value, index=year, cols=1..12
+        return state
@@ -1,35 +1,20 @@
 # Unified and complete visualization_panel.py with improved layout and chart grouping
+#
+# Importing this module reads no files and loads no heavy libraries: every chart takes
+# a PanelData (built from the main dashboard's shared snapshot, dashboard/cache.py),
+# colorcet/matplotlib are imported when a palette is first needed and the PDF pipeline
+# (dashboard/export_pdf.py, reportlab) when a PDF is first exported.
+# `panel serve dashboard/visualization_panel.py` builds the dashboard on demand
+# (see the bottom of the file).
+
+from dataclasses import dataclass
+from functools import lru_cache
 
 import pandas as pd
 import panel as pn
 import plotly.graph_objects as go
 import plotly.colors as pc
-from pathlib import Path
-import param
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from plotly.colors import qualitative
-import colorcet as cc
-import io
-import tempfile
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Image, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from panel.widgets import FileDownload
-from reportlab.platypus import PageBreak
-
-pn.extension('plotly', 'tabulator')
-
-# ---------------- CONFIG ----------------
-DATA_DIR = Path("output")
-daily_df = pd.read_csv(DATA_DIR / "daily_portfolio.csv", parse_dates=["date"], index_col="date")
-monthly_df = pd.read_csv(DATA_DIR / "monthly_stats.csv", parse_dates=["month"], index_col="month")
-dividends_df = pd.read_csv(DATA_DIR / "monthly_dividends.csv", index_col=0)
-dividends_df.index = pd.to_datetime(dividends_df.index)
-assert isinstance(dividends_df.index, pd.DatetimeIndex), "Index is not datetime!"
-metadata_df = pd.read_csv(Path("input") / "symbol_metadata.csv")
-kpi_file = DATA_DIR / "output_kpis.txt"
 
 # ---------------- KPI GROUPING AND DESCRIPTIONS ----------------
 KPI_GROUPS = {
@@ -75,7 +60,7 @@ KPI_EXPLANATIONS = {
     "Capital gain (net)": "Gain after taxes if realized.",
     "Total broker fees paid": "Sum of all broker commissions.",
     "Max Drawdown": "Largest observed portfolio value drop.",
-    
+
     "Total dividends generated (gross)": "Total dividends before tax.",
     "Total dividends generated (net)": "Total dividends after tax.",
     "Total dividends reinvested": "Portion of dividends reinvested.",
@@ -90,51 +75,50 @@ KPI_EXPLANATIONS = {
     "Last month gain/loss absolute": "Net profit/loss of the last month."
 }
 
+fixed_sectors = ["Energy", "Materials", "Industrials", "Consumer-Discretionary", "Consumer-Staples", "HealthCare", "Financials", "Information-Technology", "Communication-Services", "Utilities"]
+fixed_countries = ["Italy", "Germany", "Spain", "France", "Portugal", "United Kingdom", "USA", "Belgium", "Switzerland", "Austria"]
 
-# ---------------- Color Palette Setup ----------------
-all_colorcet_palettes = {
-    name: getattr(cc.cm, name) for name in dir(cc.cm)
-    if not name.startswith('_') and callable(getattr(cc.cm, name))
-}
-
-crameri_palettes = sorted([
-    name for name in all_colorcet_palettes
-    if 'glasbey' not in name and 'rainbow' not in name
-])
-
-# ---------------- Load KPI Data ----------------
-def load_kpis():
-    lines = kpi_file.read_text(encoding="utf-8").splitlines()
-    kpis = {}
-    for line in lines:
-        if ':' in line:
-            key, val = line.split(':', 1)
-            kpis[key.strip()] = val.strip()
-    return kpis
-
-kpi_data = load_kpis()
-
-# ---------------- Widgets ----------------
-all_symbols = sorted([col.replace("val_", "") for col in daily_df.columns if col.startswith("val_")])
-symbol_selector = pn.widgets.CheckBoxGroup(name="Select Symbols", options=all_symbols, value=all_symbols[:5])
-
-date_range = pn.widgets.DateRangeSlider(
-    name='Date Range', start=daily_df.index.min(), end=daily_df.index.max(),
-    value=(daily_df.index.min(), daily_df.index.max())
-)
-
-# Create label → value mapping (capitalize names for display)
-palette_label_map = {name.capitalize(): name for name in crameri_palettes}
-
-heatmap_palette = pn.widgets.Select(
-    name="Heatmap Palette (Scientific - Crameri)",
-    options=palette_label_map,
-    value="imola"
-)
 
-def get_colorscale():
-    selected_key = heatmap_palette.value
+# ---------------- Data ----------------
+@dataclass(frozen=True)
+class PanelData:
+    """The frames the charts below read; shared and read-only, like the snapshot they come from."""
+    daily_df: pd.DataFrame        # index=date, total_value, val_<SYMBOL>...
+    monthly_df: pd.DataFrame      # index=month, contributions, last_value, perf_pct...
+    dividends_df: pd.DataFrame    # index=month, columns=symbols, net dividends
+    metadata_df: pd.DataFrame     # symbol, sector, country...
+    kpis: dict
+
+    @classmethod
+    def from_snapshot(cls, snapshot=None):
+        if snapshot is None:
+            from dashboard.cache import get_snapshot
+            snapshot = get_snapshot()
+        return cls(snapshot.daily_df, snapshot.monthly_df, snapshot.monthly_by_symbol_wide,
+                   snapshot.metadata_df, snapshot.kpis)
+
+    @property
+    def all_symbols(self):
+        return sorted([col.replace("val_", "") for col in self.daily_df.columns if col.startswith("val_")])
+
+
+# ---------------- Color Palette Setup (colorcet/matplotlib on first use) ----------------
+@lru_cache(maxsize=1)
+def crameri_palettes():
+    import colorcet as cc
+    all_colorcet_palettes = {
+        name: getattr(cc.cm, name) for name in dir(cc.cm)
+        if not name.startswith('_') and callable(getattr(cc.cm, name))
+    }
+    return sorted([
+        name for name in all_colorcet_palettes
+        if 'glasbey' not in name and 'rainbow' not in name
+    ])
+
+@lru_cache(maxsize=None)
+def get_colorscale(selected_key):
     try:
+        import colorcet as cc
         cmap = cc.cm[selected_key]  # This is a callable (matplotlib colormap)
         if callable(cmap):
             # Sample 256 evenly spaced points and convert to Plotly-compatible rgb strings
@@ -149,8 +133,32 @@ def get_colorscale():
         print(f"[ColorScale Error] {e}")
         return [[0, 'rgb(0,0,0)'], [1, 'rgb(255,255,255)']]  # Fallback
 
+def glasbey(n):
+    import colorcet as cc
+    return cc.glasbey[:max(1, n)]
+
+# ---------------- Widgets ----------------
+def make_widgets(data):
+    all_symbols = data.all_symbols
+    symbol_selector = pn.widgets.CheckBoxGroup(name="Select Symbols", options=all_symbols, value=all_symbols[:5])
+
+    date_range = pn.widgets.DateRangeSlider(
+        name='Date Range', start=data.daily_df.index.min(), end=data.daily_df.index.max(),
+        value=(data.daily_df.index.min(), data.daily_df.index.max())
+    )
+
+    # Create label → value mapping (capitalize names for display)
+    palette_label_map = {name.capitalize(): name for name in crameri_palettes()}
+
+    heatmap_palette = pn.widgets.Select(
+        name="Heatmap Palette (Scientific - Crameri)",
+        options=palette_label_map,
+        value="imola"
+    )
+    return symbol_selector, date_range, heatmap_palette
+
 # ---------------- KPI Panels ----------------
-def make_kpi_group_panel(group_name, kpi_labels):
+def make_kpi_group_panel(kpi_data, group_name, kpi_labels):
     cards = []
     for label in kpi_labels:
         val = kpi_data.get(label, None)
@@ -181,7 +189,7 @@ def make_kpi_group_panel(group_name, kpi_labels):
         cards.append(card)
     return pn.Column(pn.pane.Markdown(f"### {group_name}"), pn.GridBox(*cards, ncols=6))
 
-def kpi_date_panel():
+def kpi_date_panel(kpi_data):
     start = kpi_data.get("Start date", "N/A")
     end = kpi_data.get("End date", "N/A")
     return pn.pane.Markdown(f"### Simulation period: **{start} → {end}**")
@@ -208,17 +216,17 @@ def styled_plotly_figure(title, x, y_series_dict, yaxis_title="€"):
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
 # ---------------- Plot Functions ----------------
-@pn.depends(symbol_selector, date_range)
-def plot_symbol_values(symbols, date_range):
+def plot_symbol_values(data, symbols, date_range):
     start, end = date_range
-    df = daily_df.loc[start:end]
+    df = data.daily_df.loc[start:end]
     series = {sym: df[f"val_{sym}"] for sym in symbols if f"val_{sym}" in df.columns}
     return styled_plotly_figure("<b>Symbol Value Over Time</b>", df.index, series)
 
-def plot_total_portfolio_value():
-    return styled_plotly_figure("<b>Total Portfolio Value Over Time</b>", daily_df.index, {"Total Portfolio": daily_df["total_value"]})
+def plot_total_portfolio_value(data):
+    return styled_plotly_figure("<b>Total Portfolio Value Over Time</b>", data.daily_df.index, {"Total Portfolio": data.daily_df["total_value"]})
 
-def plot_capital_vs_value():
+def plot_capital_vs_value(data):
+    monthly_df = data.monthly_df
     invested = monthly_df["contributions"].cumsum()
     value = monthly_df["last_value"]
     return styled_plotly_figure("<b>Total Invested vs Portfolio Value</b>", monthly_df.index, {
@@ -226,11 +234,11 @@ def plot_capital_vs_value():
         "Portfolio Value": value
     })
 
-def plot_monthly_irr():
-    irr_approx = (monthly_df["perf_pct"] / 100 + 1) ** 12 - 1
+def plot_monthly_irr(data):
+    irr_approx = (data.monthly_df["perf_pct"] / 100 + 1) ** 12 - 1
     fig = go.Figure()
     fig.add_trace(go.Bar(
-        x=monthly_df.index,
+        x=data.monthly_df.index,
         y=irr_approx,
         name="Monthly IRR",
         marker_color=pc.qualitative.Dark24[1],
@@ -251,16 +259,17 @@ def plot_monthly_irr():
     )
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
-def plot_cumulative_dividends():
-    total = dividends_df.sum(axis=1).cumsum()
+def plot_cumulative_dividends(data):
+    total = data.dividends_df.sum(axis=1).cumsum()
     return styled_plotly_figure("<b>Cumulative Dividends Over Time</b>", total.index, {"Cumulative Dividends": total})
 
-def make_radar_allocation(title_text, field, fixed_categories=None, min_categories=None):
+def make_radar_allocation(data, title_text, field, fixed_categories=None, min_categories=None):
+    daily_df, metadata_df = data.daily_df, data.metadata_df
     latest_values = daily_df.iloc[-1]
-    mapper = dict(zip(metadata_df.symbol, metadata_df[field]))
+    mapper = dict(zip(metadata_df.symbol, metadata_df[field])) if field in metadata_df.columns else {}
     current = {}
     avg = {}
-    for sym in all_symbols:
+    for sym in data.all_symbols:
         col = f"val_{sym}"
         if col in daily_df.columns:
             key = mapper.get(sym, "Unknown")
@@ -326,10 +335,9 @@ def make_radar_allocation(title_text, field, fixed_categories=None, min_categori
 
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
-@pn.depends(heatmap_palette)
-def plot_dividend_heatmap_full(palette):
-    colorscale = get_colorscale()
-    df = dividends_df.copy()
+def plot_dividend_heatmap_full(data, palette):
+    colorscale = get_colorscale(palette)
+    df = data.dividends_df.copy()
     df["Year"] = df.index.year
     df["Month"] = df.index.strftime("%b")
     pivot = df.groupby(["Year", "Month"]).sum().sum(axis=1).unstack(fill_value=0)
@@ -356,11 +364,12 @@ def plot_dividend_heatmap_full(palette):
     )
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
-@pn.depends(heatmap_palette)
-def plot_dividend_heatmap_recent(palette):
-    colorscale = get_colorscale()
-    df = dividends_df[dividends_df.index >= (dividends_df.index.max() - pd.DateOffset(months=12))].copy()
-    df = df.fillna(0.0)
+def _last_12_months(dividends_df):
+    return dividends_df[dividends_df.index >= (dividends_df.index.max() - pd.DateOffset(months=12))].fillna(0.0)
+
+def plot_dividend_heatmap_recent(data, palette):
+    colorscale = get_colorscale(palette)
+    df = _last_12_months(data.dividends_df)
     monthly = df.groupby(df.index.to_period("M")).sum().sum(axis=1).to_timestamp()
     fig = go.Figure(data=go.Heatmap(z=[monthly.values], x=monthly.index.strftime("%b %y"), y=["Total"], colorscale=colorscale))
     fig.update_layout(
@@ -373,14 +382,13 @@ def plot_dividend_heatmap_recent(palette):
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
 # ---------------- Additional Bar Plots ----------------
-def plot_dividends_by_symbol_last_12_months():
-    df = dividends_df[dividends_df.index >= (dividends_df.index.max() - pd.DateOffset(months=12))].copy()
-    df = df.fillna(0.0)
+def plot_dividends_by_symbol_last_12_months(data):
+    df = _last_12_months(data.dividends_df)
     monthly_symbol = df.groupby(df.index.to_period("M")).sum().to_timestamp()
 
     fig = go.Figure()
     #palette = pc.qualitative.Safe
-    palette = cc.glasbey[:len(monthly_symbol.columns)]
+    palette = glasbey(len(monthly_symbol.columns))
     for i, sym in enumerate(monthly_symbol.columns):
         fig.add_trace(go.Bar(
             x=monthly_symbol.index,
@@ -405,9 +413,8 @@ def plot_dividends_by_symbol_last_12_months():
     )
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
-def plot_dividends_last_12_months():
-    df = dividends_df[dividends_df.index >= (dividends_df.index.max() - pd.DateOffset(months=12))].copy()
-    df = df.fillna(0.0)
+def plot_dividends_last_12_months(data):
+    df = _last_12_months(data.dividends_df)
     monthly = df.groupby(df.index.to_period("M")).sum().sum(axis=1).to_timestamp()
 
     fig = go.Figure()
@@ -436,167 +443,91 @@ def plot_dividends_last_12_months():
     return pn.pane.Plotly(fig, config={"responsive": True}, sizing_mode="stretch_width")
 
 
-# ---------------- Raw Chart Accessors ----------------
-def raw_symbol_value_over_time(symbols, date_range):
-    return plot_symbol_values(symbols, date_range).object
-
-def raw_total_portfolio_value():
-    return plot_total_portfolio_value().object
-
-def raw_capital_vs_value():
-    return plot_capital_vs_value().object
-
-def raw_cumulative_dividends():
-    return plot_cumulative_dividends().object
-
-def raw_monthly_irr():
-    return plot_monthly_irr().object
-
-def raw_dividends_last_12_months():
-    return plot_dividends_last_12_months().object
-
-def raw_dividends_by_symbol_last_12_months():
-    return plot_dividends_by_symbol_last_12_months().object
-
-def raw_dividend_heatmap_full():
-    return plot_dividend_heatmap_full().object
-
-def raw_dividend_heatmap_recent():
-    return plot_dividend_heatmap_recent().object
-
-def raw_sector_allocation():
-    return make_radar_allocation("Sector Allocation", "sector", fixed_categories=fixed_sectors).object
-
-def raw_country_allocation():
-    return make_radar_allocation("Country Allocation", "country", fixed_categories=fixed_countries).object
-
 # ---------------- PDF Export Function ----------------
-def generate_dashboard_pdf():
-    selected_symbols = symbol_selector.value
-    start_date, end_date = date_range.value
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        chart_fns = [
-            ("Symbol Value Over Time", lambda: raw_symbol_value_over_time(selected_symbols, (start_date, end_date))),
-            ("Total Portfolio Value", raw_total_portfolio_value),
-            ("Invested vs Portfolio Value", raw_capital_vs_value),
-            ("Cumulative Dividends", raw_cumulative_dividends),
-            ("Monthly IRR", raw_monthly_irr),
-            ("Total Dividends - Last 12 Months", raw_dividends_last_12_months),
-            ("Dividends by Symbol - Last 12 Months", raw_dividends_by_symbol_last_12_months),
-            ("Dividend Heatmap - Full Period", raw_dividend_heatmap_full),
-            ("Dividend Heatmap - Last 12 Months", raw_dividend_heatmap_recent),
-            ("Sector Allocation", raw_sector_allocation),
-            ("Country Allocation", raw_country_allocation),
-        ]
+def chart_specs(data, symbols, date_range, palette):
+    """(name, figure factory) for every chart of the report."""
+    return [
+        ("Symbol Value Over Time", lambda: plot_symbol_values(data, symbols, date_range).object),
+        ("Total Portfolio Value", lambda: plot_total_portfolio_value(data).object),
+        ("Invested vs Portfolio Value", lambda: plot_capital_vs_value(data).object),
+        ("Cumulative Dividends", lambda: plot_cumulative_dividends(data).object),
+        ("Monthly IRR", lambda: plot_monthly_irr(data).object),
+        ("Total Dividends - Last 12 Months", lambda: plot_dividends_last_12_months(data).object),
+        ("Dividends by Symbol - Last 12 Months", lambda: plot_dividends_by_symbol_last_12_months(data).object),
+        ("Dividend Heatmap - Full Period", lambda: plot_dividend_heatmap_full(data, palette).object),
+        ("Dividend Heatmap - Last 12 Months", lambda: plot_dividend_heatmap_recent(data, palette).object),
+        ("Sector Allocation", lambda: make_radar_allocation(data, "Sector Allocation", "sector", fixed_categories=fixed_sectors).object),
+        ("Country Allocation", lambda: make_radar_allocation(data, "Country Allocation", "country", fixed_categories=fixed_countries).object),
+    ]
 
-        images = []
-        for name, fn in chart_fns:
-            try:
-                fig = fn()
-                image_path = f"{tmpdir}/{name.replace(' ', '_')}.png"
-                fig.write_image(image_path, width=1000, height=600, scale=2)
-                images.append((name, image_path))
-            except Exception as e:
-                print(f"[PDF Export] Failed to render {name}: {e}")
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        start = kpi_data.get("Start date", "N/A")
-        end = kpi_data.get("End date", "N/A")
-
-        elements.append(Paragraph("<b>Market Simulation Dashboard Report</b>", styles['Title']))
-        elements.append(Spacer(1, 0.2 * inch))
-        elements.append(Paragraph(f"Simulation Period: {start} → {end}", styles['Normal']))
-        elements.append(Paragraph(f"Filtered Range: {start_date.strftime('%Y-%m-%d')} → {end_date.strftime('%Y-%m-%d')}", styles['Normal']))
-        elements.append(Paragraph(f"Symbols: {', '.join(selected_symbols)}", styles['Normal']))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        kpi_rows = []
-        for group_name, labels in KPI_GROUPS.items():
-            kpi_rows.append([Paragraph(f"<b>{group_name}</b>", styles['Heading4']), ""])
-            for label in labels:
-                val = kpi_data.get(label, "N/A")
-                kpi_rows.append([label, val])
-
-        kpi_table = Table(kpi_rows, hAlign='LEFT')
-        kpi_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), '#CCCCCC'),
-            ('GRID', (0, 0), (-1, -1), 0.5, 'black'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        elements.append(kpi_table)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        for name, path in images:
-            img = Image(path, width=10.5 * inch, height=6.5 * inch)  # ocupa ~100% da página útil em A4 paisagem
-            elements.append(Paragraph(f"<b>{name}</b>", styles['Heading3']))
-            elements.append(Spacer(1, 0.2 * inch))
-            elements.append(img)
-            elements.append(PageBreak())
-
-        doc.build(elements)
-        buffer.seek(0)
-        return buffer
-
-# ---------------- Export Button ----------------
-download_pdf_button = FileDownload(
-    label="📄 Download PDF Report",
-    filename="market_dashboard.pdf",
-    callback=generate_dashboard_pdf,
-    button_type="primary"
-)
+def generate_dashboard_pdf(data, selected_symbols, date_range, palette="imola"):
+    # same pipeline as the main dashboard: concurrent, cached rasterization (dashboard/export_pdf.py)
+    from dashboard.export_pdf import render_report
+    return render_report(chart_specs(data, selected_symbols, date_range, palette),
+                         KPI_GROUPS, data.kpis, date_range, selected_symbols)
 
 # ---------------- Layout ----------------
-fixed_sectors = ["Energy", "Materials", "Industrials", "Consumer-Discretionary", "Consumer-Staples", "HealthCare", "Financials", "Information-Technology", "Communication-Services", "Utilities"]
-fixed_countries = ["Italy", "Germany", "Spain", "France", "Portugal", "United Kingdom", "USA", "Belgium", "Switzerland", "Austria"]
-
-dashboard = pn.template.FastListTemplate(
-    
-    title="Market Simulation Dashboard",
-    
-    sidebar=[
-        "## Filters",
-        date_range,
-        pn.Spacer(height=32),
-        heatmap_palette,
-        pn.Spacer(height=32),
-        download_pdf_button,
-        pn.Spacer(height=32),
-        symbol_selector
-    ],
+def build_dashboard(data=None):
+    """The full template for `data` (default: the shared snapshot of the current outputs)."""
+    pn.extension('plotly', 'tabulator')
+    data = PanelData.from_snapshot() if data is None else data
+    symbol_selector, date_range, heatmap_palette = make_widgets(data)
+    kpi_data = data.kpis
+
+    # ---------------- Export Button ----------------
+    download_pdf_button = pn.widgets.FileDownload(
+        label="📄 Download PDF Report",
+        filename="market_dashboard.pdf",
+        callback=lambda: generate_dashboard_pdf(data, symbol_selector.value, date_range.value, heatmap_palette.value),
+        button_type="primary"
+    )
 
-    main=[
-        kpi_date_panel,
-        make_kpi_group_panel("Capital KPIs", KPI_GROUPS["Capital KPIs"]),
-        make_kpi_group_panel("Dividend KPIs", KPI_GROUPS["Dividend KPIs"]),
-        make_kpi_group_panel("Performance KPIs", KPI_GROUPS["Performance KPIs"]),
-        pn.Column(
-            pn.pane.Markdown("### Portfolio Overview"),
-            plot_total_portfolio_value(),
-            plot_capital_vs_value()
-        ),
-        pn.Column(
-            pn.pane.Markdown("### Dividend Metrics"),
-            plot_cumulative_dividends(),
-            plot_monthly_irr(),
-            plot_dividends_last_12_months(),
-            plot_dividends_by_symbol_last_12_months(),
-            plot_dividend_heatmap_full,
-            plot_dividend_heatmap_recent
-        ),
-        pn.Column(
-            pn.pane.Markdown("### Allocation Charts"),
-            pn.Row(
-                make_radar_allocation("Sector Allocation", "sector", fixed_categories=fixed_sectors),
-                make_radar_allocation("Country Allocation", "country", fixed_categories=fixed_countries)
-            )
-        ),
-        plot_symbol_values
-    ]
-)
+    return pn.template.FastListTemplate(
+
+        title="Market Simulation Dashboard",
+
+        sidebar=[
+            "## Filters",
+            date_range,
+            pn.Spacer(height=32),
+            heatmap_palette,
+            pn.Spacer(height=32),
+            download_pdf_button,
+            pn.Spacer(height=32),
+            symbol_selector
+        ],
+
+        main=[
+            kpi_date_panel(kpi_data),
+            make_kpi_group_panel(kpi_data, "Capital KPIs", KPI_GROUPS["Capital KPIs"]),
+            make_kpi_group_panel(kpi_data, "Dividend KPIs", KPI_GROUPS["Dividend KPIs"]),
+            make_kpi_group_panel(kpi_data, "Performance KPIs", KPI_GROUPS["Performance KPIs"]),
+            pn.Column(
+                pn.pane.Markdown("### Portfolio Overview"),
+                plot_total_portfolio_value(data),
+                plot_capital_vs_value(data)
+            ),
+            pn.Column(
+                pn.pane.Markdown("### Dividend Metrics"),
+                plot_cumulative_dividends(data),
+                plot_monthly_irr(data),
+                plot_dividends_last_12_months(data),
+                plot_dividends_by_symbol_last_12_months(data),
+                pn.bind(lambda palette: plot_dividend_heatmap_full(data, palette), heatmap_palette),
+                pn.bind(lambda palette: plot_dividend_heatmap_recent(data, palette), heatmap_palette)
+            ),
+            pn.Column(
+                pn.pane.Markdown("### Allocation Charts"),
+                pn.Row(
+                    make_radar_allocation(data, "Sector Allocation", "sector", fixed_categories=fixed_sectors),
+                    make_radar_allocation(data, "Country Allocation", "country", fixed_categories=fixed_countries)
+                )
+            ),
+            pn.bind(lambda symbols, dates: plot_symbol_values(data, symbols, dates), symbol_selector, date_range)
+        ]
+    )
 
-dashboard.servable()
\ No newline at end of file
+# `panel serve dashboard/visualization_panel.py` runs this file as a "bokeh_app_..." module;
+# a plain import builds nothing.
+if __name__.startswith("bokeh"):
+    build_dashboard().servable()
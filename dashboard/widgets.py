@@ -93,8 +93,9 @@ def make_widgets(state):
                                             value=(init_start, init_end), step=24*60*60*1000)
     if not hasattr(state, "date_range"):
         state.date_range = (init_start, init_end)
+    # value_throttled changes when a drag is released, not on every intermediate position
     date_range.param.watch(lambda e: setattr(state, "date_range",
-                                             (pd.to_datetime(e.new[0]), pd.to_datetime(e.new[1]))), "value")
+                                             (pd.to_datetime(e.new[0]), pd.to_datetime(e.new[1]))), "value_throttled")
 
     # --- Palette ---
     palette_options = list(heatmaps.PALETTES.keys())
@@ -1,28 +1,58 @@
 # data_loader.py
 import pandas as pd
 import os
-from config import DATA_FOLDER, SYMBOL_METADATA_FILE, DIVIDEND_TARGET_FILE, DIVIDEND_REINVESTMENT_MODE
+from config import (DATA_FOLDER, SYMBOL_METADATA_FILE, DIVIDEND_TARGET_FILE, DIVIDEND_REINVESTMENT_MODE, PRICE_VALIDATION,
+                    CORPORATE_ACTIONS_FILE, DERIVE_SPLITS)
 import logging
 from decimal import Decimal
 
+from simcore.price_cache import load_price_csv
+from simcore.validation import validate_folder
+from simcore.corporate_actions import load_actions, adjust_for_splits
+
 def load_price_data():
     files = [f for f in os.listdir(DATA_FOLDER) if f.endswith('.csv') and f not in {
         'transactions.csv', 'investment_plan.csv', 'dividend_reinvestment_targets.csv', 'symbol_metadata.csv'
     }]
+    coverage = {}
+    if PRICE_VALIDATION != 'off':
+        # only files changed since the last check are re-validated
+        coverage = validate_folder(DATA_FOLDER)
     data = {}
     for f in files:
         symbol = f.replace('.csv', '')
+        entry = coverage.get(symbol, {})
+        if entry.get('status') in ('bad', 'warn'):
+            issues = '; '.join(entry.get('issues', []))
+            if entry['status'] == 'bad' and PRICE_VALIDATION == 'skip':
+                logging.warning(f"Skipping {symbol}: {issues}")
+                continue
+            logging.warning(f"Price data for {symbol} flagged {entry['status']}: {issues}")
         try:
-            df = pd.read_csv(DATA_FOLDER / f, parse_dates=['Date'], index_col='Date').sort_index()
-            for col in ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume', 'Dividend']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            df = load_price_csv(DATA_FOLDER / f)
             data[symbol] = df
             logging.info(f"Loaded price data for {symbol} ({len(df)} rows)")
         except Exception as e:
             logging.warning(f"Could not load {f}: {e}")
     return data
 
+def apply_corporate_actions(price_data):
+    """
+    Split-adjust every loaded series once: returns ({symbol: continuous price frame},
+    {symbol: SplitAdjustment}) so the engine converts transactions with the
+    precomputed share factors instead of checking for splits day by day.
+    """
+    listed = load_actions(CORPORATE_ACTIONS_FILE)
+    adjusted, adjustments = {}, {}
+    for symbol, df in price_data.items():
+        adj = adjust_for_splits(df, listed.get(symbol), derive=DERIVE_SPLITS)
+        for ev in adj.events.itertuples():
+            state = 'already in prices' if ev.in_prices else 'rescaled earlier rows'
+            logging.info(f"Split {symbol} {ev.date.date()} x{ev.ratio:g} ({ev.source}, {state})")
+        adjusted[symbol] = adj.prices
+        adjustments[symbol] = adj
+    return adjusted, adjustments
+
 def load_symbol_metadata():
     if not SYMBOL_METADATA_FILE.exists():
         logging.warning("Symbol metadata file not found.")
@@ -2,15 +2,23 @@
 import pandas as pd
 from decimal import Decimal
 from config import OUTPUT_FOLDER, TAX_RATE_DEFAULT
-from utils import calculate_drawdown, calculate_xirr
+from utils import calculate_xirr
+from simcore.drawdown import analyze_drawdowns
 import logging
 
-def export_allocation(allocation_dict, name):
-    df = pd.DataFrame(allocation_dict).T.fillna(0.0)
+def export_allocation(allocation, name):
+    # month × category values: a DataFrame from simcore.allocation, or the legacy {month: {category: value}} dict
+    if isinstance(allocation, pd.DataFrame):
+        df = allocation.fillna(0.0)
+    else:
+        df = pd.DataFrame(allocation).T.fillna(0.0)
     df.index.name = 'month'
     df = df.sort_index()
     df.to_csv(OUTPUT_FOLDER / f"monthly_{name}_allocation.csv", float_format="%.4f")
 
+def export_attribution(attribution_df):
+    attribution_df.to_csv(OUTPUT_FOLDER / "performance_attribution.csv", index=False, float_format="%.4f")
+
 def generate_dividend_yield_by_symbol(daily_df, monthly_dividends_by_symbol):
     daily_df = daily_df.copy()
     daily_df['quarter'] = daily_df.index.to_period("Q")
@@ -76,7 +84,7 @@ def write_kpis_to_file(start_date, end_date, max_drawdown, xirr,
                         gross_dividends_dict, net_dividends_dict,
                         dividend_taxes_paid,
                         ytd_gain, last_month_gain,
-                        dividend_buffers):
+                        dividend_buffers, drawdown_stats=None):
     output_file = OUTPUT_FOLDER / "output_kpis.txt"
     start_date_str = str(start_date.date())
     end_date_str = str(end_date.date())
@@ -111,7 +119,10 @@ def write_kpis_to_file(start_date, end_date, max_drawdown, xirr,
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(f"Start date: {start_date_str}\n")
         f.write(f"End date: {end_date_str}\n")
-        f.write(f"Max Drawdown: {max_drawdown:.2%}\n")
+        f.write(f"Max Drawdown: {max_drawdown:.2%}\n" if max_drawdown is not None else "Max Drawdown: n/a\n")
+        if drawdown_stats:
+            f.write(f"Longest drawdown (days): {drawdown_stats['longest_duration_days']}\n")
+            f.write(f"Time underwater: {drawdown_stats['time_underwater_pct']:.2f}%\n")
         f.write(f"Portfolio XIRR: {xirr:.2%}\n" if xirr is not None else "Portfolio XIRR: Calculation failed\n")
 
         f.write(f"Total dividends generated (gross): €{total_gross_dividends:.2f}\n")
@@ -142,10 +153,13 @@ def write_kpis_to_file(start_date, end_date, max_drawdown, xirr,
     logging.info("Written updated KPIs to output_kpis.txt")
 
 def generate_additional_kpis(daily_df, monthly_df, start_date, end_date, gross_dividends, net_dividends, dividend_taxes_paid, dividend_buffers):
-    drawdowns = calculate_drawdown(daily_df['total_value'])
-    daily_df['drawdown'] = drawdowns
+    # series, episodes and underwater stats computed once for the whole run
+    report = analyze_drawdowns(daily_df['total_value'])
+    daily_df['drawdown'] = report.series
     daily_df['drawdown'].to_csv(OUTPUT_FOLDER / "daily_drawdown.csv", float_format="%.4f")
-    max_drawdown = drawdowns.min()
+    report.episodes.to_csv(OUTPUT_FOLDER / "drawdown_episodes.csv", index=False,
+                           float_format="%.4f", date_format="%Y-%m-%d")
+    max_drawdown = report.stats['max_drawdown']
 
     flows = []
     for idx, row in monthly_df.iterrows():
@@ -179,7 +193,7 @@ def generate_additional_kpis(daily_df, monthly_df, start_date, end_date, gross_d
         gross_dividends, net_dividends,
         dividend_taxes_paid,
         ytd_gain, last_month_gain,
-        dividend_buffers
+        dividend_buffers, report.stats
     )
 
     logging.info("KPIs generated and exported successfully")
\ No newline at end of file
@@ -2,112 +2,68 @@
 
 import asyncio
 from pathlib import Path
-import pandas as pd
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta, timezone
-from playwright.async_api import async_playwright
+from datetime import datetime
+
+from scraper.yahoo import BrowserPool, history_url, fetch_history_html
+from scraper.parsing import parse_history_html
+from scraper.replay import record_page
+from scraper.cache import PageCache
+from scraper.store import ACTIONS_FILE
+from simcore.corporate_actions import record_splits
 
 OUTPUT_FOLDER = Path("data")
 OUTPUT_FOLDER.mkdir(exist_ok=True)
 
-def parse_euro_float(txt):
-    """Parses numbers like '2,63' to 2.63, and '61.132.029' to 61132029"""
-    return float(txt.replace(",", "."))
-
-# Helper to convert datetime to UNIX timestamp
-def to_unix_timestamp(date_obj):
-    return int(datetime(date_obj.year, date_obj.month, date_obj.day, tzinfo=timezone.utc).timestamp())
-
-async def fetch_yahoo_table(symbol: str):
+async def fetch_full_history(pool, symbol: str, output_folder: Path = OUTPUT_FOLDER, cache: PageCache = None,
+                             actions_file: Path = None):
+    """
+    Scrape the full daily history of one symbol on a pooled page and save it. Returns the CSV path.
+    A page found in `cache` is parsed without opening the browser. Splits on the page are
+    recorded in `actions_file`, by default input/corporate_actions.csv when saving to data/
+    and nowhere when saving elsewhere (e.g. the replay benchmark's temporary folder).
+    """
+    cache = cache or PageCache(enabled=False)
+    if actions_file is None and Path(output_folder).resolve() == OUTPUT_FOLDER.resolve():
+        actions_file = ACTIONS_FILE
     # Set the full historical period range
     start_date = datetime(2000, 1, 1)  # adjust if needed
     end_date = datetime.today()
 
-    period1 = to_unix_timestamp(start_date)
-    period2 = to_unix_timestamp(end_date)
-
-    url = f"https://finance.yahoo.com/quote/{symbol}/history?frequency=1d&filter=history&period1={period1}&period2={period2}"
-    output_file = OUTPUT_FOLDER / f"{symbol}.csv"
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
-
-        print(f"[playwright] Opening page for {symbol}...")
-        print(f"[playwright] URL: {url}")
-        await page.goto(url)
-
-        # Accept cookies
-        try:
-            accept_button = page.locator("button:has-text('Accetta tutto')")
-            await accept_button.wait_for(timeout=5000)
-            await accept_button.click()
-            print("[playwright] Cookie consent accepted.")
-        except:
-            print("[playwright] No cookie popup detected or already accepted.")
-
-        # Wait for the table to load
-        try:
-            await page.wait_for_selector("table tr th:has-text('Date')", timeout=15000)
-            print("[playwright] Table loaded.")
-        except:
-            print("[playwright] Table did not load in time.")
-            return
-
-        html = await page.content()
-        await browser.close()
-
-        soup = BeautifulSoup(html, "html.parser")
-        table = soup.find("table")
-        if not table:
-            print(f"[playwright] No table found for {symbol}.")
-            return
-
-        rows = table.find_all("tr")
-        records = []
-
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols) == 2 and "Dividend" in cols[1].text:
-                # Dividend row
-                try:
-                    date = pd.to_datetime(cols[0].text.strip())
-                    dividend = parse_euro_float(cols[1].text.strip().replace("Dividend", "").strip())
-                    records.append({"Date": date, "Dividend": dividend})
-                except:
-                    continue
-            elif len(cols) >= 6:
-                try:
-                    date = pd.to_datetime(cols[0].text.strip())
-                    open_ = parse_euro_float(cols[1].text)
-                    high = parse_euro_float(cols[2].text)
-                    low = parse_euro_float(cols[3].text)
-                    close = parse_euro_float(cols[4].text)
-                    adj_close = parse_euro_float(cols[5].text)
-                    volume = int(cols[6].text.replace(".", "").replace(",", ""))
-                    records.append({
-                        "Date": date,
-                        "Open": open_, "High": high, "Low": low,
-                        "Close": close, "Adj Close": adj_close,
-                        "Volume": volume, "Dividend": 0.0
-                    })
-                except:
-                    continue
-
-        if not records:
-            print(f"[playwright] No usable data extracted for {symbol}.")
-            return
-
-        df = pd.DataFrame(records)
-        df = df.groupby("Date").first().sort_index()
-        df.to_csv(output_file)
-        print(f"[playwright] ✅ Saved data for {symbol} to {output_file}")
+    url = history_url(symbol, start_date, end_date)
+    output_file = Path(output_folder) / f"{symbol}.csv"
+
+    html = cache.get(symbol, start_date, end_date)
+    if html is None:
+        async with pool.page() as page:
+            print(f"[playwright] Opening page for {symbol}...")
+            print(f"[playwright] URL: {url}")
+            html = await fetch_history_html(page, url, symbol)
+        if html is None:
+            return None
+        record_page(symbol, html)
+        cache.put(symbol, start_date, end_date, html)
+
+    result = await asyncio.to_thread(parse_history_html, html)  # keep other pages moving
+    print(f"[parse] {symbol}: {result.summary()}")
+    if result.frame.empty:
+        print(f"[playwright] No usable data extracted for {symbol}.")
+        return None
+
+    result.frame.to_csv(output_file)
+    if actions_file is not None:
+        record_splits(actions_file, symbol, result.splits)
+    print(f"[playwright] ✅ Saved data for {symbol} to {output_file}")
+    return output_file
+
+async def fetch_yahoo_table(symbol: str, use_cache: bool = True):
+    async with BrowserPool(size=1) as pool:
+        return await fetch_full_history(pool, symbol, cache=PageCache(enabled=use_cache))
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 2:
-        print("Usage: python playwright_yahoo_scraper.py SYMBOL")
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    if len(args) != 1:
+        print("Usage: python playwright_yahoo_scraper.py SYMBOL [--no-cache]")
         print("Example: python playwright_yahoo_scraper.py ISP.MI")
     else:
-        asyncio.run(fetch_yahoo_table(sys.argv[1]))
+        asyncio.run(fetch_yahoo_table(args[0], use_cache="--no-cache" not in sys.argv))
@@ -1,134 +1,181 @@
 # pw_yahoo_scraper_update.py
 
+import argparse
 import asyncio
+import time
 from pathlib import Path
-import pandas as pd
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta, timezone
-from playwright.async_api import async_playwright
+from datetime import datetime, timedelta
 
-DATA_FOLDER = Path("data")
+from scraper.yahoo import BrowserPool, history_url, fetch_history_html, run_batch
+from scraper.store import DataIndex, update_csv, ACTIONS_FILE
+from scraper.parsing import parse_history_html
+from scraper.replay import record_page
+from scraper.cache import PageCache
+from scraper.scheduler import JobState, prioritize
+from simcore.validation import validate_folder
+from simcore.corporate_actions import record_splits
 
+DATA_FOLDER = Path("data")
+# days before the last stored date re-fetched to catch corrections (e.g. a provisional last close)
+OVERLAP_DAYS = 5
 
-def parse_euro_float(txt):
-    return float(txt.replace(",", "."))
 
 def get_yesterday_date():
     return datetime.today().date() - timedelta(days=1)
 
-# Helper: convert date to UNIX timestamp in seconds
-def to_unix_timestamp(date_obj):
-    return int(datetime(date_obj.year, date_obj.month, date_obj.day, tzinfo=timezone.utc).timestamp())
-
-async def fetch_updates(symbol: str, start_date: datetime):
-    period1 = to_unix_timestamp(start_date + timedelta(days=1))  # day after last available
-    period2 = to_unix_timestamp(datetime.today().date())         # today at 00:00
-
-    #url = f"https://finance.yahoo.com/quote/{symbol}/history?frequency=1d&filter=history"
-    url = f"https://finance.yahoo.com/quote/{symbol}/history?frequency=1d&filter=history&period1={period1}&period2={period2}"
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
-
-        print(f"[playwright] Opening Yahoo Finance page for {symbol}...")
-        print(f"url: {url}")
-        await page.goto(url)
-        await page.wait_for_timeout(1000)  # Extra wait after full page load
-        await page.mouse.wheel(0, 1000)
-        await page.wait_for_timeout(2000)  # Extra wait after full page load
-
-        try:
-            accept_button = page.locator("button:has-text('Accetta tutto')")
-            await accept_button.wait_for(timeout=5000)
-            await accept_button.click()
-            print("[playwright] Cookie popup accepted.")
-        except:
-            print("[playwright] Cookie popup not found or already handled.")
-
-        try:
-            await page.wait_for_selector("table", timeout=15000)
-        except:
-            print("[playwright] Table failed to load.")
-            return []
-
-        html = await page.content()
-        await browser.close()
-
-        soup = BeautifulSoup(html, "html.parser")
-        table = soup.find("table")
-        if not table:
-            print("[playwright] Table not found.")
-            return []
-
-        new_rows = []
-        for row in table.find_all("tr"):
-            cols = row.find_all("td")
-            if len(cols) == 2 and "Dividend" in cols[1].text:
-                try:
-                    date = pd.to_datetime(cols[0].text.strip())  # Don't convert to .date()
-                    if date <= start_date:
-                        continue
-                    dividend = parse_euro_float(cols[1].text.strip().replace("Dividend", "").strip())
-                    new_rows.append({"Date": date, "Dividend": dividend})
-                except:
-                    continue
-            elif len(cols) >= 6:
-                try:
-                    date = pd.to_datetime(cols[0].text.strip()).date()
-                    if date <= start_date:
-                        continue
-                    open_ = parse_euro_float(cols[1].text)
-                    high = parse_euro_float(cols[2].text)
-                    low = parse_euro_float(cols[3].text)
-                    close = parse_euro_float(cols[4].text)
-                    adj_close = parse_euro_float(cols[5].text)
-                    volume = int(cols[6].text.replace(".", "").replace(",", ""))
-                    new_rows.append({
-                        "Date": date,
-                        "Open": open_, "High": high, "Low": low,
-                        "Close": close, "Adj Close": adj_close,
-                        "Volume": volume, "Dividend": 0.0
-                    })
-                except:
-                    continue
-
-        return new_rows
-
-
-async def main(symbol: str):
-    file_path = DATA_FOLDER / f"{symbol}.csv"
+async def fetch_updates(page, symbol: str, start_date, end_date):
+    """HTML of the history page from start_date up to end_date (None if the table never loads)."""
+    url = history_url(symbol, start_date, end_date)
+
+    print(f"[playwright] Opening Yahoo Finance page for {symbol}...")
+    print(f"url: {url}")
+    html = await fetch_history_html(page, url, symbol)
+    if html is not None:
+        record_page(symbol, html, start_date, end_date)
+    return html
+
+async def parse_page(symbol: str, html: str):
+    result = await asyncio.to_thread(parse_history_html, html)  # keep other pages moving
+    print(f"[parse] {symbol}: {result.summary()}")
+    record_splits(ACTIONS_FILE, symbol, result.splits)
+    return result
+
+async def update_symbol(pool, symbol: str, index: DataIndex, cache: PageCache = None):
+    """
+    Fetch the missing window of one symbol and write it (append, or merge when
+    older rows changed). Returns the number of new/changed rows, None on failure.
+    A page for the same window found in `cache` is reused without opening the browser.
+    """
+    cache = cache or PageCache(enabled=False)
+    file_path = index.csv_path(symbol)
     if not file_path.exists():
         print(f"[error] CSV file for {symbol} not found in /data folder.")
-        return
+        return None
 
-    df_existing = pd.read_csv(file_path, parse_dates=["Date"])
-    last_date = df_existing["Date"].max().date()
+    last_date = index.last_date(symbol)
+    if last_date is None:
+        print(f"[error] No dated rows in {file_path}.")
+        return None
     print(f"[update] Last available date for {symbol}: {last_date}")
 
-    yesterday = get_yesterday_date()
-    if last_date >= yesterday:
-        print("[update] Data already up to date.")
-        return
-
-    new_data = await fetch_updates(symbol, last_date)
-    if not new_data:
-        print("[update] No new data found.")
-        return
+    if last_date >= get_yesterday_date():
+        print(f"[update] {symbol}: data already up to date.")
+        return 0
+
+    # a few days before the last available one, up to today at 00:00
+    window_start, window_end = last_date - timedelta(days=OVERLAP_DAYS), datetime.today().date()
+    html = cache.get(symbol, window_start, window_end)
+    if html is None:
+        async with pool.page() as page:
+            html = await fetch_updates(page, symbol, window_start, window_end)
+        if html is None:
+            return None
+        cache.put(symbol, window_start, window_end, html)
+
+    result = await parse_page(symbol, html)
+    fetched = result.frame
+    # a split inside the window: the stored rows before it are rescaled in the same merge
+    mode, written = update_csv(file_path, fetched, last_date, result.splits)
+    if mode == "none":
+        print(f"[update] {symbol}: no new data found.")
+        return 0
+
+    index.record(symbol, max(last_date, fetched.index.max().date()))
+    if mode == "merge":
+        print(f"[update] ✅ Merged {written} new or corrected rows into {file_path.name}.")
+    else:
+        print(f"[update] ✅ Appended {written} new rows to {file_path.name}.")
+    return written
 
-    df_new = pd.DataFrame(new_data)
-    df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-    df_combined["Date"] = pd.to_datetime(df_combined["Date"])  # <- Normalize here
-    df_combined = df_combined.drop_duplicates(subset="Date").sort_values("Date")
-    df_combined.to_csv(file_path, index=False)
-    print(f"[update] ✅ Updated CSV for {symbol} with {len(df_new)} new rows.")
+def report_flagged(coverage, symbols, when):
+    """Print the series of `symbols` the coverage index marks 'bad' or 'warn'."""
+    for symbol in symbols:
+        entry = coverage.get(symbol, {})
+        if entry.get("status") in ("bad", "warn"):
+            print(f"[validate] {symbol} {when}: {entry['status']} - {'; '.join(entry.get('issues', []))}")
 
+def stale_symbols(index: DataIndex, symbols):
+    yesterday = get_yesterday_date()
+    stale = []
+    for symbol in symbols:
+        last = index.last_date(symbol)
+        if last is None:
+            print(f"[update] Skipping {symbol}: no CSV or no dated rows in {DATA_FOLDER}.")
+        elif last < yesterday:
+            stale.append(symbol)
+    return stale
+
+async def update_all(symbols=None, concurrency=4, timeout=120, retries=3, use_cache=True, block_resources=True,
+                     rate=0.5, burst=2, resume=True):
+    """
+    Update every (or the given) symbol in data/ concurrently, oldest data and
+    watch-list symbols first; re-running it only fetches what is still missing.
+    """
+    index = DataIndex(DATA_FOLDER)
+    cache = PageCache(enabled=use_cache)
+    symbols = symbols or index.symbols()
+    stale = stale_symbols(index, symbols)
+    index.save()
+    print(f"[update] {len(stale)} of {len(symbols)} symbols need updating.")
+    if not stale:
+        return {}
+    report_flagged(validate_folder(DATA_FOLDER, stale), stale, "before update")
+
+    async def job(pool, symbol):
+        written = await update_symbol(pool, symbol, index, cache)
+        index.save()
+        # 0 new rows is a valid outcome (e.g. market holiday); only None is retried
+        return None if written is None else {"rows": written}
+
+    started = time.perf_counter()
+    priority = prioritize(stale, {s: index.last_date(s) for s in stale})
+    results = await run_batch(stale, job, concurrency=concurrency, timeout=timeout, retries=retries,
+                              block_resources=block_resources, rate=rate, burst=burst,
+                              priority=priority, state=JobState("update", resume=resume))
+    index.save()
+    failed = [s for s, r in results.items() if r is None]
+    added = sum(r["rows"] for r in results.values() if r)
+    written = [s for s, r in results.items() if r and r["rows"]]
+    if written:
+        report_flagged(validate_folder(DATA_FOLDER, written), written, "after update")
+    print(f"[update] Done in {time.perf_counter() - started:.1f}s: {added} rows written, "
+          f"{len(failed)} symbols failed{': ' + ', '.join(failed) if failed else ''}")
+    if cache.enabled:
+        print(f"[cache] {cache.stats()}")
+    return results
+
+async def main(symbol: str, use_cache=True, block_resources=True):
+    index = DataIndex(DATA_FOLDER)
+    async with BrowserPool(size=1, block_resources=block_resources) as pool:
+        await update_symbol(pool, symbol, index, PageCache(enabled=use_cache))
+    index.save()
+    report_flagged(validate_folder(DATA_FOLDER, [symbol]), [symbol], "after update")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Append missing daily rows to the CSVs in data/")
+    parser.add_argument('symbols', nargs='*', help='Symbols to update (default with --all: every CSV in data/)')
+    parser.add_argument('--all', action='store_true', help='Update all stale symbols concurrently')
+    parser.add_argument('--concurrency', type=int, default=4, help='Pages (symbols) in flight at once')
+    parser.add_argument('--timeout', type=float, default=120, help='Seconds allowed per symbol attempt')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per symbol after a failure')
+    parser.add_argument('--no-cache', action='store_true', help='Always fetch pages, ignoring cache/pages')
+    parser.add_argument('--full-page', action='store_true', help='Load images, fonts, styles and trackers too')
+    parser.add_argument('--rate', type=float, default=0.5, help='Page loads per second across all workers (0 = unlimited)')
+    parser.add_argument('--burst', type=int, default=2, help='Page loads allowed back to back')
+    parser.add_argument('--fresh', action='store_true', help='Ignore the saved progress of an interrupted batch')
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) != 2:
+    args = parse_args()
+    if args.all or len(args.symbols) > 1:
+        asyncio.run(update_all(args.symbols, concurrency=args.concurrency, timeout=args.timeout,
+                               retries=args.retries, use_cache=not args.no_cache,
+                               block_resources=not args.full_page, rate=args.rate, burst=args.burst,
+                               resume=not args.fresh))
+    elif len(args.symbols) == 1:
+        asyncio.run(main(args.symbols[0], not args.no_cache, not args.full_page))
+    else:
         print("Usage: python pw_yahoo_scraper_update.py SYMBOL")
+        print("       python pw_yahoo_scraper_update.py --all [--concurrency N]")
         print("Example: python pw_yahoo_scraper_update.py LDO.MI")
-    else:
-        asyncio.run(main(sys.argv[1]))
@@ -0,0 +1,108 @@
+# scraper/cache.py
+# On-disk cache of fetched history pages, so a re-parse (after a parser fix) or a
+# retry after a partial failure does not need another browser round-trip.
+
+import gzip
+import os
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_FOLDER = Path("cache") / "pages"
+DEFAULT_TTL_HOURS = 12
+DEFAULT_MAX_MB = 256
+
+class PageCache:
+    """
+    Raw HTML keyed by (symbol, period start, period end), stored gzip-compressed
+    as <folder>/<symbol>_<YYYYMMDD>_<YYYYMMDD>.html.gz.
+
+    Entries older than `ttl_hours` are treated as missing and removed; when the
+    folder grows past `max_mb` the least recently used entries (by mtime,
+    refreshed on every hit) are evicted. enabled=False turns every call into a
+    no-op, so callers never need to branch.
+    """
+
+    def __init__(self, folder=CACHE_FOLDER, ttl_hours=DEFAULT_TTL_HOURS, max_mb=DEFAULT_MAX_MB, enabled=True):
+        self.folder = Path(folder)
+        self.ttl = float(ttl_hours) * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, symbol, start, end) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+        return self.folder / f"{safe}_{pd.Timestamp(start):%Y%m%d}_{pd.Timestamp(end):%Y%m%d}.html.gz"
+
+    def get(self, symbol, start, end):
+        if not self.enabled:
+            return None
+        path = self.path(symbol, start, end)
+        if not path.exists():
+            self.misses += 1
+            return None
+        # mtime is refreshed on hits (LRU order), so expiry goes by the fetch time stored at put()
+        age = time.time() - (self._fetched_at(path) or path.stat().st_mtime)
+        if age > self.ttl:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        try:
+            html = gzip.decompress(path.read_bytes()).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        print(f"[cache] Reusing page for {symbol} ({age / 60:.0f} min old)")
+        return html
+
+    def put(self, symbol, start, end, html):
+        if not self.enabled or not html:
+            return
+        self.folder.mkdir(parents=True, exist_ok=True)
+        path = self.path(symbol, start, end)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(gzip.compress(html.encode("utf-8"), compresslevel=5, mtime=int(time.time())))
+        tmp.replace(path)
+        self.evict()
+
+    @staticmethod
+    def _fetched_at(path: Path):
+        # gzip header bytes 4..8: the mtime we stored at put()
+        try:
+            with path.open("rb") as f:
+                head = f.read(8)
+            return int.from_bytes(head[4:8], "little") or None
+        except OSError:
+            return None
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_mb."""
+        if not self.folder.exists():
+            return
+        now = time.time()
+        entries = []
+        for path in self.folder.glob("*.html.gz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            fetched = self._fetched_at(path) or st.st_mtime
+            if now - fetched > self.ttl:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
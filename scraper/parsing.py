@@ -0,0 +1,248 @@
+# scraper/parsing.py
+# Parser for Yahoo Finance history pages. Only the history <table> is cut out of
+# the page and tokenised (lxml when installed, the stdlib HTMLParser otherwise);
+# dates and numbers are then converted column-wise, and every row that cannot be
+# used is counted with a reason instead of being dropped silently.
+#
+#     python -m scraper.parsing saved_page.html [...]
+
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+import numpy as np
+import pandas as pd
+
+try:
+    import lxml.html as lxml_html
+except Exception:
+    lxml_html = None
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+COLUMNS = PRICE_COLUMNS + ["Volume", "Dividend"]
+MISSING = {"", "-", "—", "N/A", "null"}
+
+# Italian month abbreviations (the consent flow can leave the page in it-IT)
+_IT_MONTHS = {"gen": "Jan", "feb": "Feb", "mar": "Mar", "apr": "Apr", "mag": "May", "giu": "Jun",
+              "lug": "Jul", "ago": "Aug", "set": "Sep", "ott": "Oct", "nov": "Nov", "dic": "Dec"}
+_IT_MONTHS_RE = re.compile(r"\b(" + "|".join(_IT_MONTHS) + r")\b\.?", re.IGNORECASE)
+
+@dataclass
+class ParseResult:
+    frame: pd.DataFrame                            # one row per Date (index), COLUMNS, oldest first
+    splits: pd.DataFrame                           # Date, Split (new shares per old share)
+    accepted: int = 0                              # price + dividend rows that made it into frame
+    rejected: int = 0
+    dividends: int = 0
+    reasons: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        why = ", ".join(f"{k}={v}" for k, v in sorted(self.reasons.items()))
+        return (f"{self.accepted} rows accepted ({self.dividends} dividends), "
+                f"{self.rejected} rejected{' (' + why + ')' if why else ''}")
+
+# ---------------- table extraction ----------------
+def history_table_html(html: str):
+    """The first <table>...</table> fragment with a Date header, without parsing the rest of the page."""
+    start = html.find("<table")
+    while start != -1:
+        end = html.find("</table>", start)
+        if end == -1:
+            return None
+        fragment = html[start:end + len("</table>")]
+        if "Date" in fragment[:4000]:
+            return fragment
+        start = html.find("<table", end)
+    return None
+
+class _RowCollector(HTMLParser):
+    """Text of every <td> per <tr>; header (<th>) cells are ignored."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._row:
+                self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+def table_rows(html: str):
+    """Cell texts of the history table's body rows (list of lists of str)."""
+    fragment = history_table_html(html)
+    if fragment is None:
+        return []
+    if lxml_html is not None:
+        table = lxml_html.fragment_fromstring(fragment)
+        rows = []
+        for tr in table.iter("tr"):
+            # most cells are a bare text node; only fall back to text_content() for nested markup
+            cells = [(td.text or "") if len(td) == 0 else td.text_content() for td in tr.iterchildren("td")]
+            if cells:
+                rows.append(cells)
+        return rows
+    collector = _RowCollector()
+    collector.feed(fragment)
+    collector.close()
+    return collector.rows
+
+# ---------------- column conversion ----------------
+def to_dates(values) -> pd.Series:
+    """'Aug 14, 2025' (fast fixed format) with a per-element fallback for anything else, e.g. '14 ago 2025'."""
+    s = pd.Series(values, dtype=object).astype(str).str.strip().str.replace(r"\s+", " ", regex=True)
+    out = pd.to_datetime(s, format="%b %d, %Y", errors="coerce")
+    todo = out.isna()
+    if todo.any():
+        rest = s[todo].str.replace(_IT_MONTHS_RE, lambda m: _IT_MONTHS[m.group(1).lower()], regex=True)
+        out[todo] = pd.to_datetime(rest, format="mixed", errors="coerce")
+    return out
+
+def to_numbers(values, integer=False) -> pd.Series:
+    """
+    Locale-tolerant numbers: '2,63' -> 2.63, '1,234.56' / '1.234,56' -> 1234.56,
+    '61.132.029' -> 61132029. When both separators occur the last one is the
+    decimal mark; a lone separator repeated is a thousands mark. With
+    integer=True (volumes) every separator is a thousands mark.
+    Missing markers ('-', 'N/A', '') give NaN.
+    """
+    s = pd.Series(values, dtype=object).astype(str)
+    if integer:
+        # no fast path: '61.132' is 61132 shares, not a decimal
+        return _locale_numbers(s, integer)
+    # fast path: cells that already are plain decimals ('14.97', '6741750')
+    out = pd.to_numeric(s, errors="coerce")
+    todo = out.isna()
+    if not todo.any():
+        return out
+    out[todo] = _locale_numbers(s[todo], integer)
+    return out
+
+def _locale_numbers(s: pd.Series, integer: bool) -> pd.Series:
+    s = s.str.replace(r"[\s ]", "", regex=True)
+    s = s.mask(s.isin(MISSING))
+    plain = s.str.replace(r"[.,]", "", regex=True)
+    if integer:
+        return pd.to_numeric(plain, errors="coerce")
+
+    n_comma = s.str.count(",").fillna(0)
+    n_dot = s.str.count(r"\.").fillna(0)
+    comma_last = s.str.rfind(",") > s.str.rfind(".")
+    comma_decimal = np.where(n_dot > 0, (n_comma > 0) & comma_last, n_comma == 1)
+    dot_decimal = np.where(n_comma > 0, (n_dot > 0) & ~comma_last, n_dot == 1)
+
+    from_comma = s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    from_dot = s.str.replace(",", "", regex=False)
+    normalised = np.where(comma_decimal, from_comma, np.where(dot_decimal, from_dot, plain))
+    return pd.to_numeric(pd.Series(normalised, index=s.index), errors="coerce")
+
+def _split_factor(text: pd.Series) -> pd.Series:
+    ratio = text.str.extract(r"(\d+(?:[.,]\d+)?)\s*[:/]\s*(\d+(?:[.,]\d+)?)")
+    num = to_numbers(ratio[0])
+    den = to_numbers(ratio[1])
+    return num / den.where(den > 0)
+
+# ---------------- page → frame ----------------
+def parse_history_html(html: str) -> ParseResult:
+    """
+    Parse a Yahoo history page into one row per date.
+
+    Price rows (>= 7 cells) give OHLC/Adj Close/Volume with Dividend 0.0;
+    '<date> | <amount> Dividend' rows give the Dividend of that date (merged
+    onto the price row of the same day); '<date> | a:b Stock Splits' rows go
+    to `splits`. Anything else with cells is rejected and counted.
+    """
+    rows = table_rows(html)
+    reasons = Counter()
+
+    price_rows, div_rows, split_rows = [], [], []
+    for cells in rows:
+        if len(cells) == 2 and "Dividend" in cells[1]:
+            div_rows.append(cells)
+        elif len(cells) == 2 and "Split" in cells[1]:
+            split_rows.append(cells)
+        elif len(cells) >= 7:
+            price_rows.append(cells[:7])
+        else:
+            reasons["shape"] += 1
+
+    prices = pd.DataFrame(columns=["Date"] + COLUMNS)
+    if price_rows:
+        raw = pd.DataFrame(price_rows, columns=["Date"] + PRICE_COLUMNS + ["Volume"])
+        prices = pd.DataFrame({"Date": to_dates(raw["Date"])})
+        # all five price columns converted in one pass over the stacked cells
+        values = to_numbers(raw[PRICE_COLUMNS].to_numpy().ravel()).to_numpy()
+        prices[PRICE_COLUMNS] = values.reshape(len(raw), len(PRICE_COLUMNS))
+        prices["Volume"] = to_numbers(raw["Volume"], integer=True)
+        prices["Dividend"] = 0.0
+        bad_date = prices["Date"].isna()
+        bad_price = ~bad_date & prices[PRICE_COLUMNS].isna().any(axis=1)
+        reasons["price_date"] += int(bad_date.sum())
+        reasons["price_value"] += int(bad_price.sum())
+        prices = prices[~(bad_date | bad_price)]
+
+    divs = pd.DataFrame(columns=["Date", "Dividend"])
+    if div_rows:
+        raw = pd.DataFrame(div_rows, columns=["Date", "Text"])
+        divs = pd.DataFrame({
+            "Date": to_dates(raw["Date"]),
+            "Dividend": to_numbers(raw["Text"].str.replace("Dividend", "", regex=False)),
+        })
+        bad = divs.isna().any(axis=1)
+        reasons["dividend"] += int(bad.sum())
+        divs = divs[~bad]
+
+    splits = pd.DataFrame(columns=["Date", "Split"])
+    if split_rows:
+        raw = pd.DataFrame(split_rows, columns=["Date", "Text"])
+        splits = pd.DataFrame({"Date": to_dates(raw["Date"]), "Split": _split_factor(raw["Text"])})
+        bad = splits.isna().any(axis=1)
+        reasons["split"] += int(bad.sum())
+        splits = splits[~bad].sort_values("Date").reset_index(drop=True)
+
+    # one row per date (the first one wins): the dividend of a day lands on that day's price row
+    unique = prices.drop_duplicates(subset="Date")
+    reasons["duplicate_date"] += len(prices) - len(unique)
+    prices = unique
+    frame = prices.set_index("Date")[COLUMNS].astype(float).sort_index()
+    if not divs.empty:
+        per_day = divs.groupby("Date")["Dividend"].sum()
+        frame = frame.reindex(frame.index.union(per_day.index))
+        frame.loc[per_day.index, "Dividend"] = per_day
+    frame.index = pd.DatetimeIndex(frame.index, name="Date")
+
+    reasons = Counter({k: v for k, v in reasons.items() if v})
+    return ParseResult(frame=frame, splits=splits, accepted=len(prices) + len(divs),
+                       rejected=sum(reasons.values()), dividends=len(divs), reasons=reasons)
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+    if len(sys.argv) < 2:
+        print("Usage: python -m scraper.parsing PAGE.html [PAGE.html ...]")
+    for arg in sys.argv[1:]:
+        text = Path(arg).read_text(encoding="utf-8", errors="replace")
+        t0 = time.perf_counter()
+        result = parse_history_html(text)
+        ms = (time.perf_counter() - t0) * 1000
+        span = (f"{result.frame.index.min().date()} → {result.frame.index.max().date()}"
+                if not result.frame.empty else "no rows")
+        print(f"{arg}: {result.summary()}; {span}; {ms:.1f} ms "
+              f"({'lxml' if lxml_html is not None else 'html.parser'})")
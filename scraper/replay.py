@@ -0,0 +1,192 @@
+# scraper/replay.py
+# Offline replay of recorded Yahoo history pages.
+#
+#   Record while scraping live:   YAHOO_RECORD_DIR=fixtures python batch_yahoo_scraper.py
+#                                 (full histories as <SYMBOL>.html, update windows as <SYMBOL>_<period1>_<period2>.html)
+#   Serve a fixture directory:    python -m scraper.replay serve fixtures --port 8765
+#                                 YAHOO_BASE_URL=http://127.0.0.1:8765 python pw_yahoo_scraper_update.py --all
+#   Benchmark fetch + parse:      python -m scraper.replay bench fixtures --concurrency 8 --delay-ms 300 [--rate 2]
+#
+# GET /quote/<SYMBOL>/history?...period1=..&period2=.. serves <dir>/<SYMBOL>_<period1>_<period2>.html
+# when present, else <dir>/<SYMBOL>.html. A consent button is injected into every page
+# so the scrapers run the same consent → table → content sequence as against the live site.
+
+import argparse
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+RECORD_DIR = os.environ.get("YAHOO_RECORD_DIR")
+
+CONSENT_SNIPPET = (
+    '<div id="consent-overlay"><button onclick="document.getElementById(\'consent-overlay\').remove()">'
+    'Accetta tutto</button></div>'
+)
+
+_WINDOW_SUFFIX = re.compile(r"_\d+_\d+$")    # <SYMBOL>_<period1>_<period2>
+
+def record_page(symbol, html, start_date=None, end_date=None):
+    """
+    Save a fetched page under <RECORD_DIR> when YAHOO_RECORD_DIR is set: as
+    <symbol>_<period1>_<period2>.html for a window (start_date, end_date), which the
+    server serves for that exact URL only, else as <symbol>.html, the fallback for
+    any period (full histories, whose end date moves every day).
+    """
+    if not RECORD_DIR or not html:
+        return
+    folder = Path(RECORD_DIR)
+    folder.mkdir(parents=True, exist_ok=True)
+    name = symbol
+    if start_date is not None and end_date is not None:
+        from scraper.yahoo import to_unix_timestamp
+        name = f"{symbol}_{to_unix_timestamp(start_date)}_{to_unix_timestamp(end_date)}"
+    (folder / f"{name}.html").write_text(html, encoding="utf-8")
+
+def fixture_symbols(directory):
+    """Symbols with a full-history fixture (<SYMBOL>.html); window recordings are left out."""
+    return sorted(p.stem for p in Path(directory).glob("*.html") if not _WINDOW_SUFFIX.search(p.stem))
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    directory = None
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        if len(parts) != 3 or parts[0] != "quote" or parts[2] != "history":
+            self.send_error(404)
+            return
+        symbol = parts[1]
+        query = parse_qs(url.query)
+        candidates = [self.directory / f"{symbol}.html"]
+        if "period1" in query and "period2" in query:
+            exact = f"{symbol}_{query['period1'][0]}_{query['period2'][0]}.html"
+            candidates.insert(0, self.directory / exact)
+        page = next((c for c in candidates if c.exists()), None)
+        if page is None:
+            self.send_error(404, f"No fixture for {symbol}")
+            return
+
+        if self.delay:
+            time.sleep(self.delay)   # simulated network latency (one handler thread per request)
+        html = page.read_text(encoding="utf-8", errors="replace")
+        if "Accetta tutto" not in html:
+            at = html.find("<body")
+            at = html.find(">", at) + 1 if at != -1 else 0
+            html = html[:at] + CONSENT_SNIPPET + html[at:]
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Local HTTP server over a fixture directory, run in a background thread.
+
+        with FixtureServer("fixtures") as server:
+            set_base_url(server.base_url)
+    """
+
+    def __init__(self, directory, host="127.0.0.1", port=0, delay_ms=0):
+        handler = type("FixtureHandler", (_FixtureHandler,),
+                       {"directory": Path(directory), "delay": delay_ms / 1000.0})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def bench(directory, concurrency=4, delay_ms=0, repeat=3, rate=None):
+    """Full-history scrape of every fixture symbol through the replay server, then parser-only timings."""
+    import asyncio
+    from scraper.yahoo import run_batch, set_base_url
+    from scraper.parsing import parse_history_html
+    from playwright_yahoo_scraper import fetch_full_history
+
+    symbols = fixture_symbols(directory)
+    if not symbols:
+        print(f"[replay] No fixtures in {directory}")
+        return
+
+    with FixtureServer(directory, delay_ms=delay_ms) as server, tempfile.TemporaryDirectory() as out:
+        set_base_url(server.base_url)
+        job = partial(fetch_full_history, output_folder=Path(out))
+        started = time.perf_counter()
+        results = asyncio.run(run_batch(symbols, job, concurrency=concurrency, rate=rate))
+        wall = time.perf_counter() - started
+    ok = sum(1 for r in results.values() if r)
+    print(f"[replay] scrape: {ok}/{len(symbols)} symbols in {wall:.2f}s "
+          f"({len(symbols) / wall:.2f} symbols/s, concurrency {concurrency}, delay {delay_ms} ms, "
+          f"rate limit {rate or 'none'})")
+
+    total_ms, total_rows = 0.0, 0
+    for symbol in symbols:
+        html = (Path(directory) / f"{symbol}.html").read_text(encoding="utf-8", errors="replace")
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            result = parse_history_html(html)
+        total_ms += (time.perf_counter() - t0) * 1000 / repeat
+        total_rows += result.accepted
+    print(f"[replay] parse: {total_rows} rows in {total_ms:.1f} ms "
+          f"({total_ms / len(symbols):.1f} ms/page, {total_rows / max(total_ms, 1e-9) * 1000:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve or benchmark recorded Yahoo history pages")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_p = sub.add_parser("serve", help="Serve a fixture directory until interrupted")
+    serve_p.add_argument("directory")
+    serve_p.add_argument("--port", type=int, default=8765)
+    serve_p.add_argument("--delay-ms", type=int, default=0)
+    bench_p = sub.add_parser("bench", help="Measure scrape throughput and parser speed on fixtures")
+    bench_p.add_argument("directory")
+    bench_p.add_argument("--concurrency", type=int, default=4)
+    bench_p.add_argument("--delay-ms", type=int, default=0)
+    bench_p.add_argument("--rate", type=float, default=0, help="Page loads per second (0 = unlimited)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        with FixtureServer(args.directory, port=args.port, delay_ms=args.delay_ms) as server:
+            print(f"[replay] Serving {args.directory} at {server.base_url} (Ctrl+C to stop)")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+    else:
+        bench(args.directory, args.concurrency, args.delay_ms, rate=args.rate)
+
+if __name__ == "__main__":
+    main()
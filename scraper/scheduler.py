@@ -0,0 +1,228 @@
+# scraper/scheduler.py
+# Polite, resumable job scheduling for the scrapers: a token-bucket rate limit
+# shared by all workers (halved on failures, recovered on successes), per-symbol
+# exponential backoff with full jitter, priority ordering, and a JSON job state
+# so an interrupted batch picks up where it stopped.
+
+import asyncio
+import heapq
+import json
+import random
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+JOBS_FOLDER = Path("cache") / "jobs"
+WATCH_LIST_FILE = Path("input") / "watch_list.csv"
+RESUME_MAX_AGE_HOURS = 12
+
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `burst`; rate=None or 0 disables limiting."""
+
+    def __init__(self, rate=0.5, burst=2, min_rate=None):
+        self.max_rate = float(rate or 0)
+        self.rate = self.max_rate
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 8
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.max_rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def slow_down(self):
+        """Multiplicative decrease after a throttled/failed request."""
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        """Gentle recovery towards the configured rate after a success."""
+        self.rate = min(self.max_rate, self.rate * 1.1)
+
+def backoff_delay(attempt, base=5.0, cap=300.0):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**(attempt-1))]."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str, list, dict)):
+        return value
+    return str(value)
+
+class JobState:
+    """
+    Per-symbol status of one named batch, persisted to <JOBS_FOLDER>/<name>.json
+    after every change. Symbols already 'done' in a recent (< RESUME_MAX_AGE_HOURS)
+    state are skipped on the next run; a completed batch removes its file.
+    """
+
+    def __init__(self, name, folder=JOBS_FOLDER, resume=True):
+        self.path = Path(folder) / f"{name}.json"
+        self.jobs = {}
+        self.started = time.time()
+        if resume:
+            try:
+                saved = json.loads(self.path.read_text(encoding="utf-8"))
+                if time.time() - saved.get("started", 0) < RESUME_MAX_AGE_HOURS * 3600:
+                    self.jobs = saved.get("jobs", {})
+                    self.started = saved["started"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def done(self):
+        return {s: j.get("result") for s, j in self.jobs.items() if j.get("status") == "done"}
+
+    def mark(self, symbol, status, **fields):
+        job = self.jobs.setdefault(symbol, {"attempts": 0})
+        job.update(status=status, updated=time.time(), **{k: _jsonable(v) for k, v in fields.items()})
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"started": self.started, "jobs": self.jobs}, indent=1), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+def read_watch_list(path=WATCH_LIST_FILE):
+    try:
+        return set(pd.read_csv(path)["symbol"].dropna().astype(str).str.strip())
+    except (OSError, KeyError, ValueError):
+        return set()
+
+def prioritize(symbols, last_dates=None, watch_list=None, stale_before=None):
+    """
+    Sort key per symbol: stale symbols (no data, or last date before
+    `stale_before`) first, then watch-list symbols, then the rest; within a
+    tier watch-list symbols lead and older data goes first.
+    """
+    last_dates = last_dates or {}
+    watch_list = read_watch_list() if watch_list is None else watch_list
+    keys = {}
+    for symbol in symbols:
+        last = last_dates.get(symbol)
+        stale = last is None or (stale_before is not None and last < stale_before)
+        tier = 0 if stale else (1 if symbol in watch_list else 2)
+        keys[symbol] = (tier, symbol not in watch_list, (last or date.min).toordinal(), symbol)
+    return keys
+
+class Scheduler:
+    """
+    Runs `job(symbol)` for many symbols with `concurrency` workers.
+
+    Every attempt takes a token from the shared bucket and is bounded by
+    `timeout` (None: left to the job, e.g. BrowserPool's page_timeout). A falsy result or an exception counts as a failure (consent
+    walls and empty tables look like that): the bucket slows down and the
+    symbol is re-queued after a jittered exponential backoff, up to
+    `max_attempts`. The queue is ordered by `priority` (lowest first).
+    """
+
+    def __init__(self, concurrency=4, rate=0.5, burst=2, max_attempts=4, timeout=120,
+                 backoff_base=5.0, backoff_cap=300.0, state: JobState = None):
+        self.concurrency = max(1, int(concurrency))
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max(1, int(max_attempts))
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.state = state
+
+    async def run(self, symbols, job, priority=None):
+        """Returns {symbol: result or None}."""
+        priority = priority or {}
+        results = {}
+        if self.state is not None:
+            resumed = {s: r for s, r in self.state.done().items() if s in set(symbols)}
+            if resumed:
+                print(f"[scheduler] Resuming: {len(resumed)} of {len(symbols)} symbols already done")
+            results.update(resumed)
+        todo = [s for s in dict.fromkeys(symbols) if s not in results]
+
+        heap = [(priority.get(s, ()), i, s) for i, s in enumerate(todo)]
+        heapq.heapify(heap)
+        ready = asyncio.Condition()
+        remaining = len(todo)
+        finished = asyncio.Event()
+        attempts = {s: 0 for s in todo}
+        if remaining == 0:
+            finished.set()
+        retries = set()     # pending push_later tasks: the loop only keeps weak references
+
+        async def push_later(item, delay):
+            await asyncio.sleep(delay)
+            async with ready:
+                heapq.heappush(heap, item)
+                ready.notify()
+
+        def settle(symbol, result):
+            nonlocal remaining
+            results[symbol] = result
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+        async def worker():
+            while True:
+                async with ready:
+                    await ready.wait_for(lambda: heap)
+                    item = heapq.heappop(heap)
+                symbol = item[2]
+                attempts[symbol] += 1
+                attempt = attempts[symbol]
+                await self.bucket.acquire()
+                try:
+                    result = await asyncio.wait_for(job(symbol), timeout=self.timeout)
+                    error = None if result else "no data"
+                except asyncio.TimeoutError as e:
+                    result, error = None, str(e) or f"timed out after {self.timeout}s"
+                except Exception as e:
+                    result, error = None, repr(e)
+
+                if not error:
+                    self.bucket.speed_up()
+                    if self.state is not None:
+                        self.state.mark(symbol, "done", attempts=attempt, result=result, error=None)
+                    settle(symbol, result)
+                    continue
+
+                self.bucket.slow_down()
+                if attempt < self.max_attempts:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                    print(f"[scheduler] {symbol}: {error} (attempt {attempt}/{self.max_attempts}), "
+                          f"retrying in {delay:.1f}s at {self.bucket.rate:.2f} req/s")
+                    if self.state is not None:
+                        self.state.mark(symbol, "retry", attempts=attempt, error=error)
+                    task = asyncio.create_task(push_later(item, delay))
+                    retries.add(task)
+                    task.add_done_callback(retries.discard)
+                else:
+                    print(f"[scheduler] {symbol}: {error} - giving up after {attempt} attempts")
+                    if self.state is not None:
+                        self.state.mark(symbol, "failed", attempts=attempt, error=error)
+                    settle(symbol, None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await finished.wait()
+        finally:
+            pending = workers + list(retries)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if self.state is not None and all(results.get(s) is not None for s in symbols):
+            self.state.clear()
+        return results
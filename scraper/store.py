@@ -0,0 +1,237 @@
+# scraper/store.py
+# Incremental persistence for the per-symbol price CSVs in data/: a small JSON
+# index of each file's last stored date, and crash-safe writes that append new
+# rows when possible and merge only when the fetched window rewrites history.
+
+import csv
+import io
+import json
+import math
+import os
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from simcore.price_cache import load_price_csv, read_cached, write_cached
+from simcore.corporate_actions import PER_SHARE_COLUMNS
+
+INDEX_FILE = "_index.json"   # not *.csv, so data_loader never picks it up
+ACTIONS_FILE = Path("input") / "corporate_actions.csv"   # splits seen on scraped pages (simcore.corporate_actions)
+TAIL_BYTES = 4096
+
+def _stamp(path: Path):
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+def tail_date(path: Path):
+    """Date of the last row of a CSV, read from the end of the file only."""
+    with path.open("rb") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(max(0, size - TAIL_BYTES))
+        chunk = f.read().decode("utf-8", errors="replace")
+    for line in reversed(chunk.splitlines()):
+        field = line.split(",", 1)[0].strip()
+        if not field or field == "Date":
+            continue
+        try:
+            return pd.Timestamp(field).date()
+        except ValueError:
+            continue
+    return None
+
+class DataIndex:
+    """
+    {symbol: {"last_date", "size", "mtime_ns"}} for the CSVs of one folder.
+
+    An entry is trusted only while the file's size and mtime match what was
+    recorded; otherwise the last date is re-read from the file's tail, so edits
+    made outside the updater never leave the index stale.
+    """
+
+    def __init__(self, folder: Path):
+        self.folder = Path(folder)
+        self.path = self.folder / INDEX_FILE
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def csv_path(self, symbol: str) -> Path:
+        return self.folder / f"{symbol}.csv"
+
+    def symbols(self):
+        return sorted(p.stem for p in self.folder.glob("*.csv"))
+
+    def last_date(self, symbol: str):
+        path = self.csv_path(symbol)
+        if not path.exists():
+            return None
+        size, mtime = _stamp(path)
+        entry = self.entries.get(symbol)
+        if entry and entry.get("size") == size and entry.get("mtime_ns") == mtime and entry.get("last_date"):
+            return date.fromisoformat(entry["last_date"])
+        last = tail_date(path)
+        self.record(symbol, last)
+        return last
+
+    def record(self, symbol: str, last):
+        path = self.csv_path(symbol)
+        size, mtime = _stamp(path)
+        self.entries[symbol] = {"last_date": last.isoformat() if last else None,
+                                "size": size, "mtime_ns": mtime}
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+def _replace_atomically(path: Path, write):
+    """write(tmp_path) then rename over path, so readers see the old or the new file, never a torn one."""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        write(tmp)
+        with tmp.open("rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def _header(path: Path):
+    with path.open("rb") as f:
+        return f.readline().decode("utf-8").strip().split(",")
+
+def append_rows(path: Path, rows) -> int:
+    """
+    Append row dicts to an existing CSV in the order of its own header
+    (files differ, e.g. BA.L.csv has Dividend second). The existing bytes are
+    copied, not re-serialised; the result replaces the file atomically.
+    Returns rows written.
+    """
+    if not rows:
+        return 0
+    header = _header(path)
+    with path.open("rb") as f:
+        f.seek(0, 2)
+        needs_newline = False
+        if f.tell() > 0:
+            f.seek(-1, 2)
+            needs_newline = f.read(1) != b"\n"
+
+    buf = io.StringIO()
+    if needs_newline:
+        buf.write("\n")
+    writer = csv.writer(buf, lineterminator="\n")
+    for row in rows:
+        writer.writerow([_cell(row.get(col)) for col in header])
+
+    def write(tmp):
+        shutil.copyfile(path, tmp)
+        with tmp.open("a", encoding="utf-8", newline="") as f:
+            f.write(buf.getvalue())
+    _replace_atomically(path, write)
+    return len(rows)
+
+def _rows(frame: pd.DataFrame):
+    return [{"Date": d, **row} for d, row in zip(frame.index, frame.to_dict("records"))]
+
+def _changed_dates(fetched: pd.DataFrame, existing: pd.DataFrame) -> pd.Index:
+    """Dates of `fetched` that are missing from `existing` or carry different values."""
+    stored = existing[~existing.index.duplicated(keep="first")].reindex(fetched.index)
+    cols = [c for c in fetched.columns if c in stored.columns]
+    new = fetched[cols].to_numpy(dtype=float)
+    old = stored[cols].to_numpy(dtype=float)
+    # a value the page does not show (NaN) is no correction
+    same = np.isclose(new, old, rtol=1e-9, atol=1e-9, equal_nan=True) | np.isnan(new)
+    missing = stored.isna().all(axis=1).to_numpy()
+    return fetched.index[missing | ~same.all(axis=1)]
+
+def _rescale_before_splits(existing: pd.DataFrame, overlap: pd.DataFrame, splits):
+    """
+    `existing` with the stored rows dated before each split the fetched window
+    crosses rescaled (a copy; `existing` itself when nothing changes). Yahoo
+    serves the window split-adjusted, so merging it over stored pre-split rows
+    would move the price jump from the split date to the start of the window.
+    A split is applied only while the stored rows it overlaps are still ~ratio
+    times the fetched ones (a re-run over the same window leaves them alone).
+    Returns (frame, rows rescaled).
+    """
+    if splits is None or splits.empty or overlap.empty:
+        return existing, 0
+    rescaled = 0
+    for when, ratio in zip(pd.to_datetime(splits["Date"]), splits["Split"].astype(float)):
+        before = overlap.index[overlap.index < when]
+        stored = existing.loc[~existing.index.duplicated(keep="first"), "Close"].reindex(before)
+        level = (stored / overlap.loc[before, "Close"]).replace([np.inf, -np.inf], np.nan).dropna()
+        level = level[level > 0]
+        if level.empty or ratio <= 0:
+            continue
+        # stored values still in pre-split units: closer to the ratio than to the fetched values
+        log_level = np.log(level.median())
+        if abs(log_level - np.log(ratio)) >= abs(log_level):
+            continue
+        if not rescaled:
+            existing = existing.astype({"Volume": float}) if "Volume" in existing.columns else existing.copy()
+        rows = existing.index < when
+        cols = [c for c in PER_SHARE_COLUMNS if c in existing.columns]
+        existing.loc[rows, cols] = existing.loc[rows, cols].to_numpy(float) / ratio
+        if "Volume" in existing.columns:
+            existing.loc[rows, "Volume"] = existing.loc[rows, "Volume"] * ratio
+        rescaled += int(rows.sum())
+    return existing, rescaled
+
+def update_csv(path: Path, fetched: pd.DataFrame, last_date, splits=None):
+    """
+    Bring a data CSV up to date with a parsed page window (Date-indexed frame).
+
+    Rows after `last_date` are appended when every fetched row up to last_date
+    matches what is stored. If the window holds corrected or previously missing
+    older rows, the file is merged instead (fetched values win) and rewritten
+    through a temp file. `splits` (Date/Split rows of the same page) inside the
+    window rescale the stored rows before them first, so the merged file stays
+    continuous. The parsed-price cache of data_loader is refreshed in the same
+    step. Returns (mode, rows) with mode 'append', 'merge' or 'none'.
+    """
+    fetched = fetched.sort_index()
+    fetched = fetched[~fetched.index.duplicated(keep="first")]
+    newer = fetched[fetched.index.date > last_date]
+    overlap = fetched[fetched.index.date <= last_date]
+
+    cached = read_cached(path)
+    existing = cached
+    if not overlap.empty:
+        existing = existing if existing is not None else load_price_csv(path)
+        existing, rescaled = _rescale_before_splits(existing, overlap, splits)
+        changed = _changed_dates(overlap, existing)
+        if len(changed) or rescaled:
+            header = _header(path)
+            cols = [c for c in header if c != "Date"]
+            old = existing[~existing.index.duplicated(keep="first")]
+            merged = fetched.reindex(columns=cols).combine_first(old)[cols].sort_index()
+            merged.index.name = "Date"
+            _replace_atomically(path, lambda tmp: merged.to_csv(tmp, date_format="%Y-%m-%d"))
+            write_cached(path, merged)
+            return "merge", max(len(changed), rescaled) + len(newer)
+
+    if newer.empty:
+        return "none", 0
+    written = append_rows(path, _rows(newer))
+    if cached is not None:
+        cols = list(cached.columns)
+        appended = newer.reindex(columns=cols).astype(cached.dtypes.to_dict(), errors="ignore")
+        write_cached(path, pd.concat([cached, appended]))
+    else:
+        load_price_csv(path)
+    return "append", written
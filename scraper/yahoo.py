@@ -0,0 +1,192 @@
+# scraper/yahoo.py
+# Shared Playwright plumbing for the Yahoo Finance scrapers: one browser, a bounded
+# pool of pages, and a scheduled batch runner (rate limit, timeouts, retries).
+
+import asyncio
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from playwright.async_api import async_playwright
+
+from scraper.scheduler import Scheduler
+
+# YAHOO_BASE_URL (or set_base_url) points both scrapers at a replay server, see scraper/replay.py
+BASE_URL = os.environ.get("YAHOO_BASE_URL", "https://finance.yahoo.com").rstrip("/")
+CONSENT_BUTTON = "button:has-text('Accetta tutto')"
+TABLE_SELECTOR = "table tr th:has-text('Date')"
+
+# Only the HTML document and its scripts are needed to render the history table
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "beacon", "ping"}
+BLOCKED_HOSTS = re.compile(
+    r"doubleclick|googlesyndication|google-analytics|googletagmanager|adservice|amazon-adsystem|"
+    r"scorecardresearch|criteo|taboola|outbrain|casalemedia|adnxs|rubiconproject|pubmatic|"
+    r"analytics\.yahoo|ads\.yahoo|beap\.gemini|opus\.analytics"
+)
+
+# Helper to convert datetime to UNIX timestamp
+def to_unix_timestamp(date_obj):
+    return int(datetime(date_obj.year, date_obj.month, date_obj.day, tzinfo=timezone.utc).timestamp())
+
+def set_base_url(url):
+    global BASE_URL
+    BASE_URL = url.rstrip("/")
+
+def history_url(symbol, start_date, end_date, base_url=None):
+    base_url = base_url or BASE_URL
+    period1 = to_unix_timestamp(start_date)
+    period2 = to_unix_timestamp(end_date)
+    return f"{base_url}/quote/{symbol}/history?frequency=1d&filter=history&period1={period1}&period2={period2}"
+
+
+async def _block_nonessential(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_HOSTS.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """
+    One Chromium instance with `size` isolated contexts/pages, handed out through
+    an asyncio.Queue so at most `size` symbols are in flight at once.
+
+        async with BrowserPool(size=4) as pool:
+            async with pool.page() as page:
+                ...
+    """
+
+    def __init__(self, size=4, headless=True, block_resources=True, page_timeout=None):
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.block_resources = block_resources
+        self.page_timeout = page_timeout
+        self._pw = None
+        self._browser = None
+        self._pages = asyncio.Queue()
+
+    async def __aenter__(self):
+        self._pw = await async_playwright().start()
+        self._browser = await self._pw.chromium.launch(headless=self.headless)
+        for _ in range(self.size):
+            self._pages.put_nowait(await self._new_page())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._browser.close()
+        await self._pw.stop()
+
+    async def _new_page(self):
+        context = await self._browser.new_context()
+        if self.block_resources:
+            await context.route("**/*", _block_nonessential)
+        return await context.new_page()
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        A page for the duration of the block. With `page_timeout`, the block is
+        cancelled with asyncio.TimeoutError that many seconds after the page was
+        handed out: time spent queueing for a free page does not count.
+        A page whose block failed is replaced by a fresh one; if that cannot be
+        opened the pool shrinks, and once empty page() raises RuntimeError.
+        """
+        page = await self._pages.get()
+        if page is None:
+            self._pages.put_nowait(None)     # wake the next waiter too
+            raise RuntimeError("no browser pages left in the pool")
+        good = False
+        try:
+            # page_timeout=None: no deadline
+            async with asyncio.timeout(self.page_timeout) as deadline:
+                yield page
+            good = True
+        except TimeoutError:
+            if deadline.expired():
+                raise asyncio.TimeoutError(f"timed out after {self.page_timeout}s on a page") from None
+            raise
+        finally:
+            if not good:
+                page = await self._replace(page)
+            if page is not None:
+                self._pages.put_nowait(page)
+
+    async def _replace(self, page):
+        """A fresh page for one that may be mid-navigation; None (pool shrunk) if none can be opened."""
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+        try:
+            return await self._new_page()
+        except Exception as e:
+            self.size -= 1
+            print(f"[playwright] Could not replace a page ({e!r}); pool down to {self.size}")
+            if self.size == 0:
+                self._pages.put_nowait(None)
+            return None
+
+
+async def fetch_history_html(page, url, symbol="", table_timeout=15000):
+    """
+    Open a history URL on a pooled page and return its HTML once the table is
+    there (None if not). Waits on whichever shows up first, the consent button
+    or the table, instead of fixed sleeps, and logs where the time went.
+    """
+    timings = {}
+    mark = time.perf_counter()
+
+    def lap(name):
+        nonlocal mark
+        now = time.perf_counter()
+        timings[name] = now - mark
+        mark = now
+
+    try:
+        await page.goto(url, wait_until="domcontentloaded")
+        lap("navigate")
+
+        consent = page.locator(CONSENT_BUTTON)
+        try:
+            await consent.or_(page.locator(TABLE_SELECTOR)).first.wait_for(timeout=table_timeout)
+            if await consent.count():
+                await consent.first.click()
+                print("[playwright] Cookie consent accepted.")
+        except Exception:
+            pass
+        lap("consent")
+
+        try:
+            await page.wait_for_selector(TABLE_SELECTOR, timeout=table_timeout)
+        except Exception:
+            print(f"[playwright] Table did not load in time: {url}")
+            return None
+        lap("table")
+
+        html = await page.content()
+        lap("content")
+        return html
+    finally:
+        steps = " ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+        print(f"[timing] {symbol or url}: {steps} total={sum(timings.values()):.2f}s")
+
+
+async def run_batch(symbols, job, concurrency=4, timeout=120, retries=2, headless=True, block_resources=True,
+                    rate=None, burst=2, priority=None, state=None):
+    """
+    Run `job(pool, symbol)` for every symbol on a shared browser through a
+    Scheduler (see scraper/scheduler.py): at most `concurrency` in flight,
+    `rate` page loads per second (None = unlimited), each attempt's use of a
+    page bounded by `timeout` seconds from when it gets one, failures retried
+    `retries` times with jittered backoff, in `priority` order, with progress
+    kept in `state` for resuming. Returns {symbol: result or None}.
+    """
+    async with BrowserPool(size=concurrency, headless=headless, block_resources=block_resources,
+                           page_timeout=timeout) as pool:
+        # the timeout runs from page acquisition (BrowserPool.page), not from the attempt start
+        scheduler = Scheduler(concurrency=concurrency, rate=rate, burst=burst, max_attempts=retries + 1,
+                              timeout=None, state=state)
+        return await scheduler.run(symbols, lambda symbol: job(pool, symbol), priority)
@@ -1,15 +1,65 @@
+from decimal import Decimal
 from pathlib import Path
+from typing import Dict
 import pandas as pd
 
-def build_monthly_dividends(output_dir: Path):
+class MonthlyDividends:
     """
-    Read output/dividends_events.csv and produce output/monthly_dividends.csv
+    Month × symbol net-dividend matrix maintained incrementally from the ledger.
+
+    Subscribe an instance to a DividendsLedger (ledger.subscribe(agg.add)) and
+    every recorded event is folded in as it happens; to_frame()/to_csv() then
+    just dump the already-built matrix.
+    """
+
+    def __init__(self):
+        self._cells: Dict[str, Dict[str, Decimal]] = {}  # "YYYY-MM" -> {symbol: net}
+        self._symbols = set()
+
+    def add(self, ev):
+        month = ev.date.strftime("%Y-%m")
+        row = self._cells.setdefault(month, {})
+        row[ev.symbol] = row.get(ev.symbol, Decimal("0.0")) + ev.dividend_net
+        self._symbols.add(ev.symbol)
+
+    @property
+    def empty(self) -> bool:
+        return not self._cells
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Wide frame indexed by month ("YYYY-MM"), columns: total,<SYMBOLS...> (sorted).
+        """
+        symbols = sorted(self._symbols)
+        months = sorted(self._cells)
+        data = [[float(self._cells[m].get(s, Decimal("0.0"))) for s in symbols] for m in months]
+        df = pd.DataFrame(data, index=pd.Index(months, name="month"), columns=symbols, dtype=float)
+        df.insert(0, "total", df.sum(axis=1))
+        return df
+
+    def to_csv(self, out_path: Path):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.empty:
+            out_path.write_text("month,total\n", encoding="utf-8")
+            return
+        self.to_frame().to_csv(out_path, float_format="%.2f")
+
+def build_monthly_dividends(output_dir: Path, monthly: MonthlyDividends = None):
+    """
+    Produce output/monthly_dividends.csv
     Columns: month,total,<SYMBOL_1>,<SYMBOL_2>,...
     month format: YYYY-MM
+
+    When an in-memory MonthlyDividends matrix is given it is dumped as is;
+    otherwise output/dividends_events.csv is read back and pivoted.
     """
     events_path = output_dir / "dividends_events.csv"
     out_path = output_dir / "monthly_dividends.csv"
 
+    if monthly is not None:
+        monthly.to_csv(out_path)
+        return
+
     if not events_path.exists():
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_text("month,total\n", encoding="utf-8")
@@ -32,4 +82,4 @@ def build_monthly_dividends(output_dir: Path):
 
     cols = ["month", "total"] + sorted([c for c in result.columns if c not in ("month","total")])
     result = result[cols]
-    result.to_csv(out_path, index=False, float_format="%.2f")
\ No newline at end of file
+    result.to_csv(out_path, index=False, float_format="%.2f")
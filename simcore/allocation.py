@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+def one_hot(symbols, metadata: pd.DataFrame, field: str):
+    """
+    symbols × categories indicator matrix for a metadata field (e.g. 'sector').
+    metadata is indexed by symbol; missing symbols/values map to 'Unknown'.
+    Returns (categories, matrix).
+    """
+    symbols = list(symbols)
+    if metadata is not None and field in metadata.columns:
+        labels = metadata[field].reindex(symbols).fillna("Unknown").astype(str).str.strip()
+    else:
+        labels = pd.Series("Unknown", index=symbols)
+    cats = sorted(labels.unique())
+    codes = pd.Categorical(labels, categories=cats).codes
+    onehot = np.zeros((len(symbols), len(cats)))
+    onehot[np.arange(len(symbols)), codes] = 1.0
+    return cats, onehot
+
+def category_values(values: pd.DataFrame, metadata: pd.DataFrame, field: str) -> pd.DataFrame:
+    """Holdings value per category: (dates × symbols) @ (symbols × categories)."""
+    cats, onehot = one_hot(values.columns, metadata, field)
+    mat = values.fillna(0.0).to_numpy(dtype=float) @ onehot
+    return pd.DataFrame(mat, index=values.index, columns=cats)
+
+def month_end_allocation(values: pd.DataFrame, metadata: pd.DataFrame, field: str) -> pd.DataFrame:
+    """
+    Month-end market value per category, index 'YYYY-MM'.
+    Only the month-end rows enter the matrix product.
+    """
+    if values.empty:
+        return pd.DataFrame(index=pd.Index([], name="month"))
+    month_end = values.groupby(values.index.to_period("M")).last()
+    alloc = category_values(month_end, metadata, field)
+    alloc.index = alloc.index.astype(str).rename("month")
+    return alloc
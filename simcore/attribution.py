@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from simcore.allocation import one_hot
+
+MEASURES = ["start_value", "end_value", "net_flow", "dividends", "fees", "realized_gain", "pnl"]
+
+def _month_matrix(df: pd.DataFrame, value_col: str, months: pd.PeriodIndex, symbols) -> np.ndarray:
+    """Sum `value_col` of a (date, symbol, ...) frame into a months × symbols array."""
+    if df is None or df.empty:
+        return np.zeros((len(months), len(symbols)))
+    m = (df.assign(month=pd.to_datetime(df["date"]).dt.to_period("M"))
+           .pivot_table(index="month", columns="symbol", values=value_col, aggfunc="sum", fill_value=0.0))
+    return m.reindex(index=months, columns=symbols, fill_value=0.0).to_numpy(dtype=float)
+
+def build_attribution(values: pd.DataFrame, trades: pd.DataFrame, monthly_dividends: pd.DataFrame,
+                      metadata: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Monthly return attribution by symbol, sector, country and for the whole portfolio.
+
+    values: daily market value per symbol (index=date, columns=symbols)
+    trades: rows of date, symbol, net_flow (cost of buys +, sell proceeds -), fee, realized_gain
+    monthly_dividends: net dividends, index "YYYY-MM", columns=symbols (MonthlyDividends.to_frame())
+    metadata: symbol metadata indexed by symbol with 'sector' and 'country'
+
+    Per month and key:
+      pnl = end_value - start_value - net_flow + dividends - fees
+      contribution_pct = pnl / (portfolio start value + net flows / 2) * 100   (simple Dietz)
+    so the symbol contributions of a month add up to the portfolio's return.
+    Returns a long table: month, level, key, <MEASURES...>, contribution_pct.
+    """
+    symbols = list(values.columns)
+    if values.empty or not symbols:
+        return pd.DataFrame(columns=["month", "level", "key"] + MEASURES + ["contribution_pct"])
+
+    months = values.index.to_period("M")
+    end_val = values.groupby(months).last()
+    month_idx = end_val.index
+    end = end_val.to_numpy(dtype=float)
+    start = np.vstack([np.zeros((1, len(symbols))), end[:-1]])
+
+    flow = _month_matrix(trades, "net_flow", month_idx, symbols)
+    fees = _month_matrix(trades, "fee", month_idx, symbols)
+    realized = _month_matrix(trades, "realized_gain", month_idx, symbols)
+    if monthly_dividends is not None and not monthly_dividends.empty:
+        md = monthly_dividends.drop(columns=["total"], errors="ignore").copy()
+        md.index = pd.PeriodIndex(md.index.astype(str), freq="M")
+        divs = md.reindex(index=month_idx, columns=symbols, fill_value=0.0).to_numpy(dtype=float)
+    else:
+        divs = np.zeros_like(end)
+    pnl = end - start - flow + divs - fees
+
+    # measures × months × symbols; every grouping below is one matrix product over the last axis
+    cube = np.stack([start, end, flow, divs, fees, realized, pnl])
+    base = start.sum(axis=1) + 0.5 * flow.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(base > 0, 100.0 / base, np.nan)
+
+    frames = []
+    groupings = [("symbol", symbols, np.eye(len(symbols)))]
+    for field in ("sector", "country"):
+        cats, onehot = one_hot(symbols, metadata, field)
+        groupings.append((field, cats, onehot))
+    groupings.append(("portfolio", ["Total"], np.ones((len(symbols), 1))))
+
+    for level, keys, weights in groupings:
+        agg = cube @ weights                               # measures × months × keys
+        contrib = agg[-1] * scale[:, None]
+        n_m, n_k = contrib.shape
+        data = {"month": np.repeat(month_idx.astype(str), n_k),
+                "level": level,
+                "key": np.tile(np.asarray(keys, dtype=object), n_m)}
+        for i, name in enumerate(MEASURES):
+            data[name] = agg[i].ravel()
+        data["contribution_pct"] = contrib.ravel()
+        frames.append(pd.DataFrame(data))
+
+    out = pd.concat(frames, ignore_index=True)
+    # drop keys with no position and no activity in the month
+    active = out[MEASURES].abs().sum(axis=1) > 0
+    return out[active | (out["level"] == "portfolio")].reset_index(drop=True)
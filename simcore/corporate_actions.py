@@ -0,0 +1,168 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ACTION_COLUMNS = ['symbol', 'date', 'type', 'ratio']     # ratio = new shares per old share
+SPLIT_TOLERANCE = 0.03           # a derived split's price jump must be this close to n:1 or 1:n
+MAX_DERIVED_RATIO = 20
+KNOWN_SPLIT_WINDOW_DAYS = 7      # jumps this close to a listed split are that split, not a new one
+PER_SHARE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Dividend']
+
+def _no_events():
+    return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'), 'ratio': pd.Series(dtype=float),
+                         'source': pd.Series(dtype=object), 'in_prices': pd.Series(dtype=bool),
+                         'price_date': pd.Series(dtype='datetime64[ns]')})
+
+@dataclass
+class SplitAdjustment:
+    prices: pd.DataFrame                               # continuous price frame in current-share units
+    share_factor: pd.Series                            # current shares per share held on each price date
+    events: pd.DataFrame = field(default_factory=_no_events)
+    # date, ratio, source ('file' | 'derived'), in_prices (already reflected in the stored Close),
+    # price_date (where the stored Close still jumps: rows before it are rescaled)
+
+    def factor_at(self, dates) -> np.ndarray:
+        return share_factor_at(self.events, dates)
+
+def share_factor_at(events: pd.DataFrame, dates) -> np.ndarray:
+    """Product of the ratios of all splits effective after each date (1.0 with no later split)."""
+    dates = pd.DatetimeIndex(dates).asi8
+    if events.empty:
+        return np.ones(len(dates))
+    ev = events.sort_values('date')
+    suffix = np.r_[np.cumprod(ev['ratio'].to_numpy(float)[::-1])[::-1], 1.0]
+    # a split dated D applies to holdings from before D: events on or before a date do not count
+    return suffix[np.searchsorted(pd.DatetimeIndex(ev['date']).asi8, dates, side='right')]
+
+# ---------------- actions file ----------------
+def load_actions(path) -> dict:
+    """{symbol: DataFrame(date, ratio)} of the splits listed in a corporate-actions CSV."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    df = pd.read_csv(path, parse_dates=['date'])
+    df = df[df['type'].str.lower() == 'split'].dropna(subset=['symbol', 'date', 'ratio'])
+    df = df[df['ratio'] > 0]
+    return {sym: g[['date', 'ratio']].sort_values('date').reset_index(drop=True)
+            for sym, g in df.groupby('symbol')}
+
+def record_splits(path, symbol: str, splits: pd.DataFrame):
+    """Merge the Date/Split rows of a parsed page into the actions file (newest value wins)."""
+    if splits is None or splits.empty:
+        return
+    path = Path(path)
+    new = pd.DataFrame({'symbol': symbol, 'date': pd.to_datetime(splits['Date']),
+                        'type': 'split', 'ratio': splits['Split'].astype(float)})
+    if path.exists():
+        new = pd.concat([pd.read_csv(path, parse_dates=['date']), new], ignore_index=True)
+    merged = (new
+                .drop_duplicates(subset=['symbol', 'date', 'type'], keep='last')
+                .sort_values(['symbol', 'date']))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    merged[ACTION_COLUMNS].to_csv(tmp, index=False, date_format='%Y-%m-%d')
+    os.replace(tmp, path)
+
+# ---------------- price series ----------------
+def _closes(df: pd.DataFrame) -> pd.Series:
+    c = df['Close'].dropna()
+    return c[(c > 0) & ~c.index.duplicated()]
+
+def detect_splits(df: pd.DataFrame, known=None) -> pd.DataFrame:
+    """
+    Splits left unadjusted in a stored series: day-over-day Close jumps of
+    almost exactly 1/n (an n:1 split) or n (a 1:n reverse split). Only integer
+    n are recognised, so ordinary crashes are not mistaken for 3:2 splits;
+    list anything else in the actions file. A crash or spike of almost exactly
+    -50% / +100% is still indistinguishable, hence opt-in (config.DERIVE_SPLITS).
+    """
+    c = _closes(df)
+    if len(c) < 2:
+        return _no_events()
+    r = c.to_numpy()[1:] / c.to_numpy()[:-1]
+    fwd, rev = np.rint(1 / r), np.rint(r)
+    is_fwd = (fwd >= 2) & (fwd <= MAX_DERIVED_RATIO) & (np.abs(1 / r / np.maximum(fwd, 1) - 1) <= SPLIT_TOLERANCE)
+    is_rev = (rev >= 2) & (rev <= MAX_DERIVED_RATIO) & (np.abs(r / np.maximum(rev, 1) - 1) <= SPLIT_TOLERANCE)
+    hit = is_fwd | is_rev
+    events = pd.DataFrame({'date': c.index[1:][hit], 'ratio': np.where(is_fwd, fwd, 1 / np.maximum(rev, 1))[hit]})
+    if known is not None and not known.empty and not events.empty:
+        gap = np.abs(events['date'].to_numpy()[:, None] - pd.DatetimeIndex(known['date']).to_numpy()[None, :])
+        events = events[~(gap <= np.timedelta64(KNOWN_SPLIT_WINDOW_DAYS, 'D')).any(axis=1)]
+    return events.assign(source='derived', in_prices=False, price_date=events['date']).reset_index(drop=True)
+
+def _unadjusted_jumps(c: pd.Series, events: pd.DataFrame) -> pd.Series:
+    """
+    For listed splits: the date on which the stored Close still jumps by ~1/ratio,
+    NaT where it is already split-adjusted. The jump is looked for up to
+    KNOWN_SPLIT_WINDOW_DAYS before the split date too: an update window merged
+    over older pre-split rows (scraper/store.py) moves it to the window start.
+    """
+    idx, values = c.index.asi8, c.to_numpy()
+    out = []
+    for when, ratio in zip(pd.DatetimeIndex(events['date']), events['ratio'].to_numpy(float)):
+        pos = np.searchsorted(idx, when.value, side='left')
+        if pos == 0 or pos >= len(values):
+            out.append(pd.NaT)    # no stored rows on one side of the split: nothing to rescale
+            continue
+        lo = max(np.searchsorted(idx, (when - pd.Timedelta(days=KNOWN_SPLIT_WINDOW_DAYS)).value, side='left'), 1)
+        jumps = np.log(values[lo:pos + 1] / values[lo - 1:pos])
+        k = int(np.argmin(np.abs(jumps + np.log(ratio))))
+        # an unadjusted series jumps by ~1/ratio: closer to the split than to no move at all
+        out.append(c.index[lo + k] if abs(jumps[k] + np.log(ratio)) < abs(jumps[k]) else pd.NaT)
+    return pd.Series(pd.DatetimeIndex(out), index=events.index)
+
+def adjust_for_splits(df: pd.DataFrame, listed: pd.DataFrame = None, derive=False) -> SplitAdjustment:
+    """
+    Split handling for one symbol, computed once at load time.
+
+    Yahoo's Close is split-adjusted at scrape time, but rows appended by the
+    updater before a later split are not; those rows are rescaled here
+    (per-share columns divided, Volume multiplied) so the returned series is
+    continuous in current-share units. The share factor converts quantities
+    and prices traded on a date into those units.
+    """
+    listed = listed if listed is not None else pd.DataFrame(columns=['date', 'ratio'])
+    events = _no_events()
+    if not listed.empty:
+        jumps = _unadjusted_jumps(_closes(df), listed)
+        events = listed.assign(source='file', in_prices=jumps.isna(), price_date=jumps)
+    if derive:
+        events = pd.concat([events, detect_splits(df, listed)], ignore_index=True)
+    events = events.sort_values('date').reset_index(drop=True)
+    if events.empty:
+        return SplitAdjustment(df, pd.Series(1.0, index=df.index, name='share_factor'), events)
+
+    prices = df
+    unadjusted = events[~events['in_prices'].astype(bool)]
+    if not unadjusted.empty:
+        scale = share_factor_at(unadjusted.assign(date=unadjusted['price_date']), df.index)
+        prices = df.copy()
+        cols = [c for c in PER_SHARE_COLUMNS if c in prices.columns]
+        prices[cols] = prices[cols].to_numpy(float) / scale[:, None]
+        if 'Volume' in prices.columns:
+            prices['Volume'] = prices['Volume'] * scale
+    share_factor = pd.Series(share_factor_at(events, df.index), index=df.index, name='share_factor')
+    return SplitAdjustment(prices, share_factor, events)
+
+def adjust_transactions(tx_df: pd.DataFrame, adjustments: dict) -> pd.DataFrame:
+    """Quantities × share factor and prices ÷ share factor at each trade date, one vectorized pass per symbol."""
+    factor = pd.Series(1.0, index=tx_df.index)
+    for sym, idx in tx_df.groupby('symbol').groups.items():
+        adj = adjustments.get(sym)
+        if adj is not None and not adj.events.empty:
+            factor[idx] = adj.factor_at(tx_df.loc[idx, 'date'])
+    changed = factor != 1.0
+    if not changed.any():
+        return tx_df
+    tx_df = tx_df.copy()
+    tx_df['quantity'] = tx_df['quantity'].astype(float)
+    tx_df.loc[changed, 'quantity'] = tx_df.loc[changed, 'quantity'] * factor[changed]
+    price = pd.to_numeric(tx_df['price'], errors='coerce')
+    tx_df['price'] = price.where(~changed, price / factor)
+    for sym in tx_df.loc[changed, 'symbol'].unique():
+        logging.info(f"Split-adjusted {int((changed & (tx_df['symbol'] == sym)).sum())} transactions of {sym}")
+    return tx_df
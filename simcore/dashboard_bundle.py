@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BUNDLE_FILE = "dashboard_bundle.npz"     # in the output folder, next to the CSVs it summarizes
+BUNDLE_VERSION = 1
+MONTH_NAMES = {1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun",
+               7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"}
+
+def _year_month_matrix(values: pd.Series) -> pd.DataFrame:
+    """index=year, columns=1..12 from a Series indexed by month timestamps; empty months are 0.0."""
+    if values.empty:
+        return pd.DataFrame(columns=pd.Index(range(1, 13), name="month"), index=pd.Index([], name="year"), dtype=float)
+    mat = pd.DataFrame({"year": values.index.year.astype(int), "month": values.index.month.astype(int),
+                        "value": values.to_numpy(float)})
+    mat = mat.pivot_table(index="year", columns="month", values="value", aggfunc="sum", fill_value=0.0)
+    return mat.reindex(columns=range(1, 13), fill_value=0.0).sort_index()
+
+def value_calendar(total_value: pd.Series) -> pd.DataFrame:
+    """Month-end portfolio value as a year × 1..12 matrix."""
+    v = total_value.dropna()
+    month_end = v.groupby(v.index.to_period("M")).last()
+    month_end.index = month_end.index.to_timestamp()
+    return _year_month_matrix(month_end)
+
+def build_tables(monthly_wide: pd.DataFrame, total_value: pd.Series) -> dict:
+    """
+    Ready-to-plot dashboard tables from the month × symbol dividend matrix
+    (MonthlyDividends.to_frame(): index "YYYY-MM", columns total,<SYMBOLS...>)
+    and the daily total portfolio value.
+    """
+    monthly_wide = monthly_wide.drop(columns="total", errors="ignore")
+    months = pd.to_datetime(monthly_wide.index.astype(str) + "-01")
+    by_symbol = monthly_wide.set_axis(pd.Index(months, name="month")).astype(float).sort_index()
+    by_symbol.columns.name = "symbol"
+    total = by_symbol.sum(axis=1)
+
+    by_symbol_tidy = (by_symbol.stack().rename("value").reset_index()
+                        .sort_values(["month", "symbol"]).reset_index(drop=True))
+    calendar = _year_month_matrix(total)
+    calendar_tidy = calendar.reset_index().melt(id_vars="year", var_name="month", value_name="value")
+    calendar_tidy["month_name"] = calendar_tidy["month"].map(MONTH_NAMES)
+
+    return {
+        "monthly_total_tidy": pd.DataFrame({"month": total.index, "value": total.to_numpy()}),
+        "monthly_by_symbol_wide": by_symbol,
+        "monthly_by_symbol_tidy": by_symbol_tidy,
+        "calendar_wide": calendar,
+        "calendar_tidy": calendar_tidy,
+        "value_calendar": value_calendar(total_value),
+    }
+
+# ---------------- npz serialization ----------------
+def _column_array(s: pd.Series) -> np.ndarray:
+    if s.dtype != object:
+        return s.to_numpy()
+    # no object arrays: they would need pickle to load (labels such as month numbers stay numeric)
+    arr = np.asarray(s.tolist())
+    return arr.astype(str) if arr.dtype == object else arr
+
+def write_bundle(path, tables: dict):
+    """
+    Store the tables as plain numpy arrays (np.savez, no pickle) plus a JSON
+    manifest of their index and column labels. Uniformly numeric tables are
+    stored as one 2-D block, mixed ones column by column.
+    """
+    arrays, manifest = {}, {"version": BUNDLE_VERSION, "tables": {}}
+    for name, df in tables.items():
+        block = len(df.columns) > 0 and df.dtypes.nunique() == 1 and df.dtypes.iloc[0].kind in "fiu"
+        manifest["tables"][name] = {"index": df.index.name, "columns": df.columns.tolist(),
+                                    "columns_name": df.columns.name, "block": bool(block)}
+        arrays[f"{name}/index"] = _column_array(df.index.to_series())
+        if block:
+            arrays[f"{name}/values"] = df.to_numpy()
+        else:
+            for i, col in enumerate(df.columns):
+                arrays[f"{name}/{i}"] = _column_array(df[col])
+    arrays["manifest"] = np.array(json.dumps(manifest))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:     # a file object keeps np.savez from appending ".npz"
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+def load_bundle(path) -> dict:
+    """{name: DataFrame} as written by write_bundle; None if missing, unreadable or of another version."""
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            manifest = json.loads(str(z["manifest"]))
+            if manifest.get("version") != BUNDLE_VERSION:
+                return None
+            tables = {}
+            for name, spec in manifest["tables"].items():
+                index = pd.Index(z[f"{name}/index"], name=spec["index"])
+                columns = pd.Index(spec["columns"], name=spec["columns_name"])
+                if spec["block"]:
+                    df = pd.DataFrame(z[f"{name}/values"], index=index, columns=columns)
+                else:
+                    df = pd.DataFrame({i: z[f"{name}/{i}"] for i in range(len(columns))}, index=index)
+                    df.columns = columns
+                tables[name] = df
+            return tables
+    except (OSError, ValueError, KeyError):
+        return None
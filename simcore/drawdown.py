@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+EPISODE_COLUMNS = [
+    "peak_date", "trough_date", "recovery_date",
+    "peak_value", "trough_value", "depth",
+    "decline_days", "recovery_days", "duration_days",
+    "underwater_periods", "recovered",
+]
+
+@dataclass
+class DrawdownReport:
+    series: pd.Series                                  # drawdown per date, fraction <= 0
+    episodes: pd.DataFrame                             # one row per peak → trough → recovery cycle
+    stats: dict = field(default_factory=dict)          # max drawdown, underwater-time statistics
+
+def drawdown_series(values: pd.Series) -> pd.Series:
+    """(value - running peak) / running peak; NaN (undefined) while the running peak is not positive."""
+    s = pd.to_numeric(values, errors="coerce")
+    peak = s.cummax()
+    dd = (s - peak) / peak
+    return dd.where(peak > 0).rename("drawdown")
+
+def analyze_drawdowns(values: pd.Series) -> DrawdownReport:
+    """
+    Drawdown series, episode table and underwater statistics in one pass of
+    array operations (no per-element Python loop).
+
+    An episode starts on the first observation below the running peak and ends
+    on the first observation back at (or above) that peak; an episode still
+    open on the last date has recovery_date NaT and recovered False.
+    """
+    values = pd.to_numeric(values, errors="coerce").dropna()
+    dd_series = drawdown_series(values)
+    n = len(dd_series)
+    if n == 0:
+        return DrawdownReport(dd_series, pd.DataFrame(columns=EPISODE_COLUMNS), _stats(dd_series, None))
+
+    dd = dd_series.to_numpy(dtype=float)
+    x = values.to_numpy(dtype=float)
+    dates = dd_series.index
+
+    under = dd < 0
+    prev = np.concatenate(([False], under[:-1]))
+    nxt = np.concatenate((under[1:], [False]))
+    starts = np.flatnonzero(under & ~prev)
+    ends = np.flatnonzero(under & ~nxt)             # last underwater observation of each episode
+    if starts.size == 0:
+        return DrawdownReport(dd_series, pd.DataFrame(columns=EPISODE_COLUMNS), _stats(dd_series, None))
+
+    # depth and first trough position per episode via reduceat over the underwater runs
+    pos = np.flatnonzero(under)
+    seg = np.concatenate(([0], np.cumsum(ends - starts + 1)[:-1]))
+    depth = np.minimum.reduceat(dd[pos], seg)
+    lengths = ends - starts + 1
+    hit = np.where(dd[pos] == np.repeat(depth, lengths), pos, n)
+    troughs = np.minimum.reduceat(hit, seg)
+
+    peaks = np.maximum(starts - 1, 0)
+    recovered = ends + 1 < n
+    recovery_pos = np.where(recovered, ends + 1, n - 1)
+
+    peak_dates = dates[peaks]
+    trough_dates = dates[troughs]
+    last_dates = dates[recovery_pos]
+    recovery_dates = pd.DatetimeIndex(last_dates).where(recovered)
+
+    episodes = pd.DataFrame({
+        "peak_date": peak_dates,
+        "trough_date": trough_dates,
+        "recovery_date": recovery_dates,
+        "peak_value": x[peaks],
+        "trough_value": x[troughs],
+        "depth": depth,
+        "decline_days": (trough_dates - peak_dates).days,
+        "recovery_days": pd.Series((last_dates - trough_dates).days, dtype="Int64").where(recovered),
+        "duration_days": (last_dates - peak_dates).days,
+        "underwater_periods": lengths,
+        "recovered": recovered,
+    })
+    return DrawdownReport(dd_series, episodes, _stats(dd_series, episodes))
+
+def _stats(dd: pd.Series, episodes) -> dict:
+    n = len(dd)
+    if n == 0:
+        return {"max_drawdown": None, "max_drawdown_date": None, "current_drawdown": None,
+                "episodes": 0, "time_underwater_pct": None, "longest_duration_days": 0,
+                "avg_duration_days": None, "current_underwater_days": 0}
+    under = dd.to_numpy() < 0
+    defined = dd.dropna()
+    stats = {
+        "max_drawdown": float(defined.min()) if not defined.empty else None,
+        "max_drawdown_date": defined.idxmin() if not defined.empty else None,
+        "current_drawdown": float(dd.iloc[-1]),
+        "episodes": 0 if episodes is None else len(episodes),
+        "time_underwater_pct": float(under.mean() * 100.0),
+        "longest_duration_days": 0,
+        "avg_duration_days": None,
+        "current_underwater_days": 0,
+    }
+    if episodes is not None and not episodes.empty:
+        stats["longest_duration_days"] = int(episodes["duration_days"].max())
+        stats["avg_duration_days"] = float(episodes["duration_days"].mean())
+        last = episodes.iloc[-1]
+        if not last["recovered"]:
+            stats["current_underwater_days"] = int(last["duration_days"])
+    return stats
+
+def max_drawdown(values) -> float:
+    """Largest peak-to-trough drop as a fraction (<= 0); None when there is no data."""
+    s = pd.Series(np.asarray(values, dtype=float)) if not isinstance(values, pd.Series) else values
+    s = pd.to_numeric(s, errors="coerce").replace([np.inf, -np.inf], np.nan).dropna()
+    if s.empty:
+        return None
+    # no drawdown before the first positive peak (undefined in the series)
+    return float(drawdown_series(s).fillna(0.0).min())
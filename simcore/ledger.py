@@ -1,7 +1,7 @@
 from dataclasses import dataclass, asdict
 from decimal import Decimal, ROUND_HALF_EVEN, getcontext
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import date as date_cls
 import csv
 
@@ -32,10 +32,53 @@ class DividendEvent:
     dividend_net: Optional[Decimal] = None
     notes: str = ""
 
+FIELDNAMES = [
+    "date","symbol","qty","dividend_per_share_gross","currency","fx_to_base",
+    "withholding_rate","domestic_tax_rate","broker_fee",
+    "dividend_gross","withholding_tax","domestic_tax","dividend_net","notes"
+]
+
+def event_row(ev: DividendEvent) -> dict:
+    """CSV row for an event: ISO date, Decimals with 2 decimals."""
+    row = asdict(ev)
+    row["date"] = ev.date.isoformat()
+    for k, v in row.items():
+        if isinstance(v, Decimal):
+            row[k] = f"{v:.2f}"
+    return row
+
+def settle(ev: DividendEvent) -> DividendEvent:
+    """Fill the derived base-currency amounts of an event (gross, taxes, net)."""
+    gross_local = ev.qty * ev.dividend_per_share_gross
+    gross_base  = gross_local * ev.fx_to_base
+    wh = gross_base * ev.withholding_rate
+    dom = (gross_base - wh) * ev.domestic_tax_rate
+    net = gross_base - wh - dom - ev.broker_fee
+
+    ev.dividend_gross   = q2(gross_base)
+    ev.withholding_tax  = q2(wh)
+    ev.domestic_tax     = q2(dom)
+    ev.dividend_net     = q2(net)
+    return ev
+
 class DividendsLedger:
-    def __init__(self, base_currency: str = "EUR"):
+    def __init__(self, base_currency: str = "EUR", store=None):
+        """
+        store: optional simcore.ledger_store.LedgerStore. When given, settled events
+        are streamed to it in batches instead of being held until to_csv().
+        """
         self.base_currency = base_currency
+        self.store = store
         self._events: List[DividendEvent] = []
+        self._listeners: List[Callable[[DividendEvent], None]] = []
+
+    def subscribe(self, listener: Callable[[DividendEvent], None]):
+        """
+        Register a callable invoked with every settled event as it is recorded.
+        Lets aggregators build their views incrementally instead of re-reading
+        the persisted ledger.
+        """
+        self._listeners.append(listener)
 
     def record(
         self,
@@ -54,20 +97,18 @@ class DividendsLedger:
             broker_fee=D(broker_fee),
             notes=notes or ""
         )
-        self._events.append(ev)
+        settle(ev)
+        if self.store is not None:
+            self.store.append(ev)
+        else:
+            self._events.append(ev)
+        for listener in self._listeners:
+            listener(ev)
 
     def finalize(self) -> List[DividendEvent]:
+        # amounts are settled at record time from the unrounded inputs;
+        # here we only round the inputs for presentation (idempotent)
         for ev in self._events:
-            gross_local = ev.qty * ev.dividend_per_share_gross
-            gross_base  = gross_local * ev.fx_to_base
-            wh = gross_base * ev.withholding_rate
-            dom = (gross_base - wh) * ev.domestic_tax_rate
-            net = gross_base - wh - dom - ev.broker_fee
-
-            ev.dividend_gross   = q2(gross_base)
-            ev.withholding_tax  = q2(wh)
-            ev.domestic_tax     = q2(dom)
-            ev.dividend_net     = q2(net)
             ev.fx_to_base       = q2(ev.fx_to_base)
             ev.dividend_per_share_gross = q2(ev.dividend_per_share_gross)
             ev.qty              = q2(ev.qty)
@@ -76,21 +117,16 @@ class DividendsLedger:
             ev.domestic_tax_rate= q2(ev.domestic_tax_rate)
         return self._events
 
+    def close(self):
+        """Flush pending events and the index of the attached store (no-op without one)."""
+        if self.store is not None:
+            self.store.close()
+
     def to_csv(self, out_path: Path):
         out_path.parent.mkdir(parents=True, exist_ok=True)
         events = self.finalize()
-        fieldnames = [
-            "date","symbol","qty","dividend_per_share_gross","currency","fx_to_base",
-            "withholding_rate","domestic_tax_rate","broker_fee",
-            "dividend_gross","withholding_tax","domestic_tax","dividend_net","notes"
-        ]
         with out_path.open("w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
+            w = csv.DictWriter(f, fieldnames=FIELDNAMES)
             w.writeheader()
             for ev in events:
-                row = asdict(ev)
-                row["date"] = ev.date.isoformat()
-                for k, v in row.items():
-                    if isinstance(v, Decimal):
-                        row[k] = f"{v:.2f}"
-                w.writerow(row)
\ No newline at end of file
+                w.writerow(event_row(ev))
\ No newline at end of file
@@ -0,0 +1,199 @@
+import bisect
+import csv
+import io
+import json
+import logging
+from datetime import date as date_cls
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from simcore.ledger import FIELDNAMES, DividendEvent, event_row
+
+INDEX_VERSION = 1
+
+def _iso(d) -> str:
+    return pd.Timestamp(d).date().isoformat()
+
+class LedgerStore:
+    """
+    Append-only CSV persistence for a DividendsLedger.
+
+    Settled events are buffered and appended to the events file in batches of
+    `batch_size`; each row is written exactly once. A small JSON index next to
+    the file (<name>.idx.json) keeps the byte offset of the first row of every
+    date plus per-symbol first/last dates, which allows range reads without
+    parsing the whole file.
+
+    Re-runs resume: if the index matches the file on disk and was produced with
+    the same `run_key`, events dated up to the previous run's end (`through`)
+    are already persisted and are skipped, so only new days are appended.
+    run_key may also be a callable of a date, the key of the inputs up to that
+    date: it is checked at the previous run's `through` and stored for this
+    run's, so inputs that only grew past the persisted events do not force a
+    rewrite.
+    A different run_key, a later-ending previous run, or a file/index mismatch
+    makes the first flush rewrite the file from scratch. With run_key=None the
+    store is a reader over whatever is on disk and never rewrites it.
+    """
+
+    def __init__(self, out_path: Path, run_key: Union[str, Callable[[date_cls], str], None] = None,
+                 through: Optional[date_cls] = None, batch_size: int = 256):
+        self.out_path = Path(out_path)
+        self.index_path = self.out_path.with_name(self.out_path.stem + ".idx.json")
+        self.run_key = run_key
+        self.through = through
+        self.batch_size = max(1, int(batch_size))
+        self._pending: List[DividendEvent] = []
+        self._resume_after: Optional[date_cls] = None
+        self._fresh = False
+        self._index = self._open()
+
+    # ---------------- open / index ----------------
+    def _key(self, through: Optional[date_cls]) -> Optional[str]:
+        return self.run_key(through) if callable(self.run_key) else self.run_key
+
+    def _empty_index(self) -> dict:
+        return {"version": INDEX_VERSION, "run_key": None, "through": None,
+                "rows": 0, "size": 0, "dates": [], "symbols": {}}
+
+    def _open(self) -> dict:
+        index = None
+        if self.index_path.exists() and self.out_path.exists():
+            try:
+                index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logging.warning(f"Unreadable ledger index {self.index_path}: {e}")
+                index = None
+
+        consistent = (
+            index is not None
+            and index.get("version") == INDEX_VERSION
+            and index.get("size") == self.out_path.stat().st_size
+            and index.get("through") is not None
+        )
+        if self.run_key is None:
+            if not consistent:
+                logging.warning(f"No usable index for {self.out_path}; range reads will be empty")
+                return self._empty_index()
+            return index
+
+        reusable = (
+            consistent
+            and (self.through is None or date_cls.fromisoformat(index["through"]) <= self.through)
+            and index.get("run_key") == self._key(date_cls.fromisoformat(index["through"]))
+        )
+        if reusable:
+            self._resume_after = date_cls.fromisoformat(index["through"])
+            logging.info(f"Appending to dividend ledger {self.out_path.name} "
+                         f"({index['rows']} rows persisted through {index['through']})")
+            return index
+
+        self._fresh = True
+        return self._empty_index()
+
+    def _start_file(self):
+        """Truncate the events file to its header (first write of a fresh run)."""
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        header = io.StringIO()
+        csv.DictWriter(header, fieldnames=FIELDNAMES).writeheader()
+        data = header.getvalue().encode("utf-8")
+        self.out_path.write_bytes(data)
+        self._index["size"] = len(data)
+        self._write_index(self._index)
+        self._fresh = False
+
+    def _write_index(self, index: dict):
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index), encoding="utf-8")
+        tmp.replace(self.index_path)
+
+    # ---------------- writing ----------------
+    def append(self, ev: DividendEvent):
+        if self.run_key is None:
+            raise ValueError("LedgerStore opened read-only (run_key=None)")
+        if self._resume_after is not None and ev.date <= self._resume_after:
+            return  # persisted by a previous run
+        self._pending.append(ev)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._fresh:
+            self._start_file()
+        if not self._pending:
+            return
+        index = self._index
+        dates = index["dates"]
+        symbols = index["symbols"]
+        with self.out_path.open("ab") as f:
+            offset = f.tell()
+            for ev in self._pending:
+                buf = io.StringIO()
+                csv.DictWriter(buf, fieldnames=FIELDNAMES).writerow(event_row(ev))
+                data = buf.getvalue().encode("utf-8")
+                day = ev.date.isoformat()
+                if not dates or dates[-1][0] != day:
+                    dates.append([day, offset])
+                sym = symbols.setdefault(ev.symbol, {"first": day, "last": day, "rows": 0})
+                sym["last"] = day
+                sym["rows"] += 1
+                f.write(data)
+                offset += len(data)
+        index["rows"] += len(self._pending)
+        index["size"] = offset
+        self._pending = []
+        # the index is only rewritten on close(); a crash mid-run leaves a size
+        # mismatch, so the next run starts over instead of trusting partial data
+
+    def close(self):
+        if self.run_key is None:
+            return
+        self.flush()
+        if self.through is not None:
+            self._index["through"] = self.through.isoformat()
+        elif self._index["dates"]:
+            self._index["through"] = self._index["dates"][-1][0]
+        through = self._index["through"]
+        self._index["run_key"] = self._key(date_cls.fromisoformat(through) if through else None)
+        self._write_index(self._index)
+
+    # ---------------- reading ----------------
+    def read(self, start=None, end=None, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Events with start <= date <= end (ISO strings or dates), optionally for
+        some symbols only. Only the byte range covering the dates is parsed.
+        """
+        index = self._index
+        dates = index["dates"]
+        if symbols is not None:
+            symbols = {s for s in symbols if s in index["symbols"]}
+            if not symbols:
+                return pd.DataFrame(columns=FIELDNAMES)
+            # narrow the window to where the requested symbols actually have rows
+            first = min(index["symbols"][s]["first"] for s in symbols)
+            last = max(index["symbols"][s]["last"] for s in symbols)
+            start = max(_iso(start), first) if start is not None else first
+            end = min(_iso(end), last) if end is not None else last
+
+        keys = [d for d, _ in dates]
+        lo = bisect.bisect_left(keys, _iso(start)) if start is not None else 0
+        hi = bisect.bisect_right(keys, _iso(end)) if end is not None else len(keys)
+        if lo >= hi:
+            return pd.DataFrame(columns=FIELDNAMES)
+
+        begin = dates[lo][1]
+        stop = dates[hi][1] if hi < len(dates) else index["size"]
+        with self.out_path.open("rb") as f:
+            f.seek(begin)
+            chunk = f.read(stop - begin).decode("utf-8")
+
+        df = pd.DataFrame(list(csv.reader(io.StringIO(chunk))), columns=FIELDNAMES)
+        if symbols is not None:
+            df = df[df["symbol"].isin(symbols)]
+        for col in FIELDNAMES:
+            if col not in ("date", "symbol", "currency", "notes"):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        df["date"] = pd.to_datetime(df["date"])
+        return df.reset_index(drop=True)
@@ -0,0 +1,60 @@
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume', 'Dividend']
+CACHE_DIR = "_cache"   # inside the data folder; a directory, so never mistaken for a *.csv
+
+def _stamp(csv_path: Path):
+    st = csv_path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def cache_path(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / (csv_path.stem + ".pkl")
+
+def parse_price_csv(csv_path: Path) -> pd.DataFrame:
+    df = pd.read_csv(csv_path, parse_dates=['Date'], index_col='Date').sort_index()
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def read_cached(csv_path: Path):
+    """The cached frame if it was built from the CSV exactly as it is on disk now, else None."""
+    path = cache_path(csv_path)
+    try:
+        df = pd.read_pickle(path)
+    except Exception:
+        return None
+    if df.attrs.get("source") != _stamp(Path(csv_path)):
+        return None
+    return df
+
+def write_cached(csv_path: Path, df: pd.DataFrame):
+    """Store df as the parsed form of csv_path (stamped with the CSV's current size/mtime)."""
+    path = cache_path(csv_path)
+    path.parent.mkdir(exist_ok=True)
+    df = df.copy()
+    df.attrs["source"] = _stamp(Path(csv_path))
+    tmp = path.with_suffix(".tmp")
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+def load_price_csv(csv_path: Path) -> pd.DataFrame:
+    """
+    Parsed price frame for one data CSV. A binary copy is kept in data/_cache and
+    reused while the CSV is unchanged, so repeated runs skip CSV/date parsing.
+    """
+    df = read_cached(csv_path)
+    if df is not None:
+        df.attrs.pop("source", None)
+        return df
+    df = parse_price_csv(csv_path)
+    try:
+        write_cached(csv_path, df)
+    except OSError as e:
+        logging.warning(f"Could not cache {csv_path}: {e}")
+    return df
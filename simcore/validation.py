@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from simcore.price_cache import load_price_csv
+
+COVERAGE_FILE = "_coverage.json"      # inside the data folder, next to the CSVs
+GAP_MIN_BDAYS = 4                     # holiday closures are up to 3 business days
+LONG_GAP_BDAYS = 10                   # gaps from this length on make a series "warn"
+PRICE_COLS = ['Open', 'High', 'Low', 'Close']
+
+def _stamp(path: Path):
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _gaps(dates: pd.DatetimeIndex):
+    """Runs of missing business days between the first and last date: (missing count, [[start, end, bdays]])."""
+    if len(dates) < 2:
+        return 0, []
+    missing = pd.bdate_range(dates[0], dates[-1]).difference(dates)
+    if missing.empty:
+        return 0, []
+    # consecutive business days are at most 3 calendar days apart (Fri → Mon)
+    run_id = np.cumsum(np.r_[True, np.diff(missing.asi8) > 3 * 86_400_000_000_000])
+    runs = pd.Series(missing, index=run_id).groupby(level=0).agg(["first", "last", "size"])
+    runs = runs[runs["size"] >= GAP_MIN_BDAYS]
+    return len(missing), [[f.date().isoformat(), l.date().isoformat(), int(n)]
+                          for f, l, n in runs.itertuples(index=False)]
+
+def _unexplained_adjustments(df: pd.DataFrame):
+    """
+    Dates where Adj Close / Close steps (Yahoo's dividend adjustment) with no
+    dividend recorded since the previous trading row: usually a dividend row
+    lost or mis-parsed as a plain Dividend=0.0 price row.
+    """
+    if 'Adj Close' not in df.columns or 'Dividend' not in df.columns:
+        return []
+    p = df[['Close', 'Adj Close']].dropna()
+    p = p[(p['Close'] > 0) & (p['Adj Close'] > 0)]
+    if len(p) < 2:
+        return []
+    close = p['Close'].to_numpy()
+    adj = p['Adj Close'].to_numpy()
+    factor = adj / close
+    step = np.abs(factor[1:] / factor[:-1] - 1)
+    # both columns are rounded to 2 decimals: ignore steps inside that noise
+    noise = 0.0165 / adj[1:] + 0.0165 / close[1:]
+    hits = np.flatnonzero((step > noise) & (step > 0.002)) + 1
+    if hits.size == 0:
+        return []
+    div_dates = np.sort(df.index[df['Dividend'].fillna(0) > 0].asi8)
+    idx = p.index.asi8
+    slack = 3 * 86_400_000_000_000
+    lo = np.searchsorted(div_dates, idx[hits - 1] - slack, side="right")
+    hi = np.searchsorted(div_dates, idx[hits] + slack, side="right")
+    return [d.date().isoformat() for d in p.index[hits[hi <= lo]]]
+
+def validate_frame(df: pd.DataFrame) -> dict:
+    """
+    Vectorized checks of one parsed (sorted, Date-indexed) price frame; returns
+    its coverage entry without the file stamp. Duplicated dates, non-positive
+    prices and implausible dividends make a series 'bad'; long gaps and price
+    adjustments without a dividend make it 'warn'. Short gaps and OHLC
+    mismatches (common in Yahoo's provisional rows) are only counted.
+    """
+    idx = df.index
+    has = [c for c in PRICE_COLS if c in df.columns]
+    prices = df[has]
+    price_rows = prices.notna().any(axis=1).to_numpy() if has else np.zeros(len(df), bool)
+    dates = idx[price_rows]
+    missing, gaps = _gaps(dates.unique().sort_values())
+
+    values = prices.to_numpy(dtype=float) if has else np.empty((len(df), 0))
+    nonpositive = int(np.sum(np.any(values <= 0, axis=1)))
+    ohlc_bad = 0
+    if {'High', 'Low'}.issubset(has):
+        hi, lo = df['High'].to_numpy(float), df['Low'].to_numpy(float)
+        others = df[[c for c in has if c not in ('High', 'Low')]].to_numpy(float)
+        with np.errstate(invalid="ignore"):
+            ohlc_bad = int(np.sum((hi < lo) | np.any(others > hi[:, None] + 1e-9, axis=1)
+                                  | np.any(others < lo[:, None] - 1e-9, axis=1)))
+    div = df['Dividend'] if 'Dividend' in df.columns else pd.Series(0.0, index=idx)
+    dividends = int((div > 0).sum())
+    closes = df['Close'] if 'Close' in df.columns else pd.Series(np.nan, index=idx)
+    # a dividend larger than half the price is a price cell parsed into the Dividend column
+    big_dividends = int((div > 0.5 * closes.ffill()).sum())
+    duplicates = int(idx.duplicated().sum())
+    unexplained = _unexplained_adjustments(df[~idx.duplicated()])
+    long_gaps = sum(1 for g in gaps if g[2] >= LONG_GAP_BDAYS)
+
+    issues, status = [], "ok"
+    if duplicates:
+        issues.append(f"{duplicates} duplicated dates")
+    if nonpositive:
+        issues.append(f"{nonpositive} rows with zero/negative prices")
+    if big_dividends:
+        issues.append(f"{big_dividends} dividends above half the price")
+    if issues:
+        status = "bad"
+    if unexplained:
+        issues.append(f"{len(unexplained)} price adjustments without a dividend")
+    if long_gaps:
+        issues.append(f"{long_gaps} gaps of {LONG_GAP_BDAYS}+ business days")
+    if issues and status == "ok":
+        status = "warn"
+
+    return {
+        "first": dates.min().date().isoformat() if len(dates) else None,
+        "last": dates.max().date().isoformat() if len(dates) else None,
+        "rows": int(len(df)),
+        "price_rows": int(price_rows.sum()),
+        "dividends": dividends,
+        "missing_bdays": missing,
+        "gaps": gaps,
+        "duplicates": duplicates,
+        "nonpositive": nonpositive,
+        "ohlc_inconsistent": ohlc_bad,
+        "unexplained_adjustments": unexplained,
+        "status": status,
+        "issues": issues,
+    }
+
+def validate_file(path) -> dict:
+    path = Path(path)
+    entry = {"symbol": path.stem, **_stamp(path)}
+    try:
+        entry.update(validate_frame(load_price_csv(path)))
+    except Exception as e:
+        entry.update(status="bad", issues=[f"unreadable: {e}"])
+    return entry
+
+# ---------------- coverage index ----------------
+def load_coverage(folder) -> dict:
+    try:
+        return json.loads((Path(folder) / COVERAGE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _save_coverage(folder, coverage: dict):
+    path = Path(folder) / COVERAGE_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(coverage, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+def current_entry(folder, symbol, coverage=None):
+    """The coverage entry of a symbol if it still describes the CSV on disk, else None."""
+    coverage = load_coverage(folder) if coverage is None else coverage
+    entry = coverage.get(symbol)
+    path = Path(folder) / f"{symbol}.csv"
+    if entry is None or not path.exists():
+        return None
+    return entry if {k: entry.get(k) for k in ("size", "mtime_ns")} == _stamp(path) else None
+
+def validate_folder(folder, symbols=None, workers=None, force=False) -> dict:
+    """
+    Validate the CSVs of a data folder (all, or just `symbols`) and update its
+    coverage index. Files unchanged since their entry was written are skipped
+    unless force=True; the rest are checked in parallel worker processes.
+    """
+    folder = Path(folder)
+    coverage = load_coverage(folder)
+    paths = sorted(folder.glob("*.csv")) if symbols is None else [folder / f"{s}.csv" for s in symbols]
+    paths = [p for p in paths if p.exists()]
+    todo = [p for p in paths if force or current_entry(folder, p.stem, coverage) is None]
+
+    workers = workers or min(len(todo), os.cpu_count() or 1)
+    if len(todo) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            entries = list(pool.map(validate_file, todo))
+    else:
+        entries = [validate_file(p) for p in todo]
+
+    for entry in entries:
+        coverage[entry["symbol"]] = entry
+    if symbols is None:
+        present = {p.stem for p in paths}
+        coverage = {s: e for s, e in coverage.items() if s in present}
+    _save_coverage(folder, coverage)
+    return coverage
+
+def report(coverage: dict, only_problems=True):
+    for symbol in sorted(coverage):
+        entry = coverage[symbol]
+        if only_problems and entry.get("status") == "ok":
+            continue
+        span = f"{entry.get('first')} → {entry.get('last')}"
+        logging.warning(f"{symbol}: {entry.get('status')} ({span}): {'; '.join(entry.get('issues', []))}")
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Validate data/*.csv and rebuild the coverage index")
+    parser.add_argument("folder", nargs="?", default="data")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Re-check files that did not change")
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    cov = validate_folder(args.folder, workers=args.workers, force=args.force)
+    counts = pd.Series([e.get("status") for e in cov.values()]).value_counts().to_dict()
+    logging.info(f"Validated {len(cov)} series in {time.perf_counter() - t0:.2f}s: {counts}")
+    report(cov)
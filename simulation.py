@@ -1,5 +1,6 @@
 # simulation.py
 import pandas as pd
+import hashlib
 from datetime import datetime
 from decimal import Decimal
 from dateutil.relativedelta import relativedelta
@@ -7,20 +8,48 @@ import logging
 
 from config import (START_DATE, END_DATE, BROKER_FEE, ENABLE_MONTHLY_REINVESTMENT,
                     TRANSACTION_FILE, INVESTMENT_PLAN_FILE, OUTPUT_FOLDER,
-                    TAX_RATES, TAX_RATE_DEFAULT, REINVESTMENT_THRESHOLD)
-from data_loader import load_price_data, load_symbol_metadata, load_reinvestment_targets
+                    TAX_RATES, TAX_RATE_DEFAULT, REINVESTMENT_THRESHOLD,
+                    DIVIDEND_TARGET_FILE, SYMBOL_METADATA_FILE,
+                    DIVIDEND_LEDGER_PERSISTENCE, DIVIDEND_LEDGER_BATCH_SIZE,
+                    CORPORATE_ACTIONS_FILE, DERIVE_SPLITS, PRICE_VALIDATION)
+from data_loader import load_price_data, apply_corporate_actions, load_symbol_metadata, load_reinvestment_targets
 from utils import align_to_trading_day
 from kpi_exporter import (generate_dividend_yield_by_symbol,
                            generate_additional_kpis,
-                           export_allocation)
+                           export_allocation,
+                           export_attribution)
 
 # NEW: import the ledger and aggregator from simcore (not "simulation.*" to avoid name clash)
 from simcore.ledger import DividendsLedger
-from simcore.aggregators import build_monthly_dividends
+from simcore.ledger_store import LedgerStore
+from simcore.aggregators import MonthlyDividends, build_monthly_dividends
+from simcore.attribution import build_attribution
+from simcore.allocation import month_end_allocation
+from simcore.corporate_actions import adjust_transactions
+from simcore.dashboard_bundle import BUNDLE_FILE, build_tables, write_bundle
 
 def get_dividend_tax_rate(country):
     return TAX_RATES.get(country, TAX_RATE_DEFAULT)
 
+def ledger_run_key(start_date, reinvestment_threshold, price_data, through):
+    """
+    Fingerprint of everything (but the end date) that shapes the dividend events
+    up to `through`, so an append-mode ledger is only extended by runs over the
+    same inputs. Prices count by content up to `through`: merged corrections and
+    split rescaling of past rows rebuild the ledger, newly appended days do not.
+    """
+    h = hashlib.sha1()
+    h.update(f"{start_date.date()}|{reinvestment_threshold}|{sorted(TAX_RATES.items())}|"
+             f"{DERIVE_SPLITS}|{PRICE_VALIDATION}".encode())
+    for path in (TRANSACTION_FILE, INVESTMENT_PLAN_FILE, DIVIDEND_TARGET_FILE, SYMBOL_METADATA_FILE,
+                 CORPORATE_ACTIONS_FILE):
+        h.update(path.read_bytes() if path.exists() else b"-")
+    for symbol in sorted(price_data):
+        past = price_data[symbol].loc[:pd.Timestamp(through)] if through is not None else price_data[symbol]
+        h.update(symbol.encode())
+        h.update(pd.util.hash_pandas_object(past).to_numpy().tobytes())
+    return h.hexdigest()
+
 def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
     logging.info("Starting simulation")
 
@@ -28,9 +57,6 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
     end_date = pd.to_datetime(end_date if end_date else END_DATE)
     reinvestment_threshold = Decimal(reinvestment_threshold if reinvestment_threshold else REINVESTMENT_THRESHOLD)
 
-    # NEW: instantiate the dividends ledger
-    ledger = DividendsLedger(base_currency="EUR")  # keep EUR as base (fx_to_base=1 in this version)
-
     tx_df = pd.read_csv(TRANSACTION_FILE, parse_dates=['date'])
     tx_df['price'] = tx_df.get('price', pd.NA)
     if 'fee' not in tx_df.columns:
@@ -40,9 +66,24 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
     plan_df['fee'] = plan_df['fee'].apply(lambda x: Decimal(str(x)) if pd.notna(x) else BROKER_FEE) if 'fee' in plan_df.columns else BROKER_FEE
 
     reinvest_weights = load_reinvestment_targets()
-    price_data = load_price_data()
+    price_data, split_adjustments = apply_corporate_actions(load_price_data())
+    # traded quantities/prices → current-share units, the units of the split-adjusted Close
+    tx_df = adjust_transactions(tx_df, split_adjustments)
     symbol_metadata = load_symbol_metadata()
 
+    # NEW: instantiate the dividends ledger
+    store = None
+    if DIVIDEND_LEDGER_PERSISTENCE == 'append':
+        store = LedgerStore(OUTPUT_FOLDER / "dividends_events.csv",
+                            run_key=lambda through: ledger_run_key(start_date, reinvestment_threshold,
+                                                                   price_data, through),
+                            through=end_date.date(),
+                            batch_size=DIVIDEND_LEDGER_BATCH_SIZE)
+    ledger = DividendsLedger(base_currency="EUR", store=store)  # keep EUR as base (fx_to_base=1 in this version)
+    # month × symbol net matrix, fed by the ledger as events are recorded
+    monthly_dividends = MonthlyDividends()
+    ledger.subscribe(monthly_dividends.add)
+
     if ENABLE_MONTHLY_REINVESTMENT and not reinvest_weights:
         logging.warning("Monthly reinvestment is enabled, but no reinvestment targets were provided.")
 
@@ -82,12 +123,11 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
     realized_gains = {sym: Decimal("0.0") for sym in all_symbols}
 
     rows = []
+    trade_log = []  # (date, symbol, net_flow, fee, realized_gain) per executed trade, for attribution
     monthly_stats = {}
     monthly_dividends_by_symbol = {}
     current_month = None
     reinvest_day_triggered = False
-    sector_exposure = {}
-    country_exposure = {}
     gross_dividends = {}
     net_dividends = {}
     dividend_taxes_paid = Decimal("0.0")
@@ -109,7 +149,8 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
                 symbol = tx.symbol
                 if symbol not in price_data or day not in price_data[symbol].index:
                     continue
-                qty = int(tx.quantity)
+                # split-adjusted quantities can be fractional (e.g. 3:2 splits)
+                qty = int(tx.quantity) if float(tx.quantity).is_integer() else Decimal(str(tx.quantity))
                 price = Decimal(str(tx.price)) if pd.notna(tx.price) else Decimal(str(price_data[symbol].loc[day, 'Close']))
                 try:
                     fee = Decimal(str(tx.fee)) if pd.notna(tx.fee) else BROKER_FEE
@@ -122,6 +163,7 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
                     avg_price[symbol] = ((avg_price[symbol] * held_before + price * qty) / held[symbol]) if held[symbol] > 0 else price
                     monthly_stats[month_str]['contributions'] += qty * price
                     monthly_stats[month_str]['fees'] += fee
+                    trade_log.append((day, symbol, qty * price, fee, Decimal("0.0")))
                     actions.append(f"buy {qty} {symbol} @ {price:.2f}")
                 elif action == 'sell':
                     if held[symbol] >= qty:
@@ -132,6 +174,7 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
                         monthly_stats[month_str]['realized_gain'] += gain
                         held[symbol] -= qty
                         monthly_stats[month_str]['fees'] += fee
+                        trade_log.append((day, symbol, -proceeds, fee, gain))
                         actions.append(f"sell {qty} {symbol} @ {price:.2f} (gain {gain:.2f})")
 
         if hasattr(plan_df_expanded, 'groups') and day in plan_df_expanded.groups:
@@ -151,6 +194,7 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
                     monthly_stats[month_str]['contributions'] += qty * price
                     monthly_stats[month_str]['fees'] += fee
                     cash_buffers[symbol] += leftover
+                    trade_log.append((day, symbol, qty * price, fee, Decimal("0.0")))
                     actions.append(f"plan buy {qty} {symbol} @ {price:.2f}")
 
         # Process dividends for held symbols
@@ -218,6 +262,7 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
                                 monthly_stats[month_str]['fees'] += reinvest_fee
                                 total -= cost
                                 cash_buffers[tgt] = share_alloc - cost
+                                trade_log.append((day, tgt, qty * price, reinvest_fee, Decimal("0.0")))
                                 actions.append(f"reinvest {qty} {tgt} @ {price:.2f}")
                     dividend_buffers = {s: Decimal("0.0") for s in all_symbols}
 
@@ -272,17 +317,30 @@ def run_simulation(start_date=None, end_date=None, reinvestment_threshold=None):
     monthly_df.to_csv(OUTPUT_FOLDER / "monthly_stats.csv", float_format="%.4f")
 
     # === NEW: write the atomic dividends ledger and build the single monthly file ===
-    # 1) atomic events
-    ledger.to_csv(OUTPUT_FOLDER / "dividends_events.csv")
-
-    # 2) single wide file: month,total,<SYMBOLS...> in YYYY-MM format
-    build_monthly_dividends(OUTPUT_FOLDER)
-
-    # (Keep your legacy dict in memory for KPIs if needed)
-    export_allocation(sector_exposure, 'sector')
-    export_allocation(country_exposure, 'country')
+    # 1) atomic events (append mode has streamed them already; just flush the tail + index)
+    if store is not None:
+        ledger.close()
+    else:
+        ledger.to_csv(OUTPUT_FOLDER / "dividends_events.csv")
+
+    # 2) single wide file: month,total,<SYMBOLS...> in YYYY-MM format (dump of the in-memory matrix)
+    build_monthly_dividends(OUTPUT_FOLDER, monthly_dividends)
+    monthly_dividends_df = monthly_dividends.to_frame()
+
+    # 3) pre-aggregated dashboard tables (monthly/calendar matrices) in one binary file
+    write_bundle(OUTPUT_FOLDER / BUNDLE_FILE, build_tables(monthly_dividends_df, result_df['total_value']))
+
+    # month-end holdings value per sector/country: values matrix @ one-hot metadata
+    values_df = result_df[[f"val_{s}" for s in all_symbols]].set_axis(all_symbols, axis=1)
+    export_allocation(month_end_allocation(values_df, symbol_metadata, 'sector'), 'sector')
+    export_allocation(month_end_allocation(values_df, symbol_metadata, 'country'), 'country')
     generate_dividend_yield_by_symbol(result_df, monthly_dividends_by_symbol)
 
+    # per-symbol / sector / country monthly return contribution (long format)
+    trades_df = pd.DataFrame([(d, s, float(f), float(fee), float(g)) for d, s, f, fee, g in trade_log],
+                             columns=['date', 'symbol', 'net_flow', 'fee', 'realized_gain'])
+    export_attribution(build_attribution(values_df, trades_df, monthly_dividends_df, symbol_metadata))
+
     daily_df = pd.read_csv(OUTPUT_FOLDER / "daily_portfolio.csv", parse_dates=['date'], index_col='date')
     monthly_df = pd.read_csv(OUTPUT_FOLDER / "monthly_stats.csv", parse_dates=['month'], index_col='month')
     generate_additional_kpis(
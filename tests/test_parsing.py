@@ -0,0 +1,33 @@
+# tests/test_parsing.py
+# Parser checks on saved history pages (tests/fixtures/); run with `python -m pytest -q`.
+
+from pathlib import Path
+
+import pandas as pd
+
+from scraper.parsing import parse_history_html, to_numbers
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_integer_separators_are_thousands_marks():
+    volumes = to_numbers(["1.000", "61.132", "61.132.029", "1,234", "6741750", "-"], integer=True)
+    assert volumes[:5].tolist() == [1000, 61132, 61132029, 1234, 6741750]
+    assert pd.isna(volumes.iloc[5])
+
+
+def test_italian_page():
+    result = parse_history_html((FIXTURES / "history_it.html").read_text(encoding="utf-8"))
+    frame = result.frame
+
+    assert list(frame.index.strftime("%Y-%m-%d")) == ["2025-08-12", "2025-08-13", "2025-08-14", "2025-08-15"]
+    assert frame.loc["2025-08-15", "Close"] == 1238.75
+    assert frame.loc["2025-08-14", "Close"] == 2.68
+    assert frame.loc["2025-08-12", "Close"] == 15.0
+    # single-separator volumes are thousands, not decimals
+    assert frame["Volume"].tolist() == [6741750, 1000, 61132, 61132029]
+    assert frame.loc["2025-08-12", "Dividend"] == 0.25
+    assert result.splits["Split"].tolist() == [2.0]
+
+    assert (result.accepted, result.dividends) == (5, 1)
+    assert result.reasons == {"duplicate_date": 1, "price_value": 1}
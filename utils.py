@@ -3,15 +3,15 @@ import pandas as pd
 from scipy.optimize import newton
 from decimal import Decimal
 from config import BROKER_FEE, BROKER_FEES
+from simcore.drawdown import drawdown_series
 
 def align_to_trading_day(date, valid_days):
     valid_after = valid_days[valid_days >= date]
     return valid_after[0] if not valid_after.empty else pd.NaT
 
 def calculate_drawdown(series):
-    peak = series.cummax()
-    drawdown = (series - peak) / peak
-    return drawdown
+    # full episode analysis lives in simcore.drawdown.analyze_drawdowns
+    return drawdown_series(series)
 
 def calculate_xirr(cash_flows):
     def xnpv(rate):